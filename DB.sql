@@ -87,12 +87,72 @@ CREATE TABLE IF NOT EXISTS digests (
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    payload JSONB NOT NULL,
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    locked_by TEXT,
+    started_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    run_after TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS run_after TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    analyzer_version TEXT NOT NULL,
+    result JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS review_daily_rollups (
+    day DATE NOT NULL,
+    source_id UUID NOT NULL,
+    competitor_key UUID NOT NULL,
+    sentiment_label TEXT NOT NULL,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    score_sum NUMERIC(14,2) NOT NULL DEFAULT 0,
+    CONSTRAINT pk_review_daily_rollups PRIMARY KEY (day, source_id, competitor_key, sentiment_label)
+);
+
+CREATE TABLE IF NOT EXISTS topic_daily_rollups (
+    day DATE NOT NULL,
+    topic_label TEXT NOT NULL,
+    source_id UUID NOT NULL,
+    competitor_key UUID NOT NULL,
+    sentiment_label TEXT NOT NULL,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    confidence_sum NUMERIC(14,3) NOT NULL DEFAULT 0,
+    CONSTRAINT pk_topic_daily_rollups PRIMARY KEY (day, topic_label, source_id, competitor_key, sentiment_label)
+);
+
+CREATE TABLE IF NOT EXISTS app_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_reviews_source ON reviews (source_id);
 CREATE INDEX IF NOT EXISTS idx_reviews_created_at ON reviews (created_at);
 CREATE INDEX IF NOT EXISTS idx_reviews_sentiment_label ON reviews (sentiment_label);
+CREATE INDEX IF NOT EXISTS idx_reviews_published_at_id ON reviews (published_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_competitors_created_at_id ON competitors (created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_topics_label ON review_topics (topic_label);
 CREATE INDEX IF NOT EXISTS idx_review_topics_pair ON review_topics (review_id, topic_label);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_digests_timeframe ON digests (timeframe_start DESC, timeframe_end DESC);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_created_at ON analysis_cache (created_at);
+CREATE INDEX IF NOT EXISTS idx_topic_daily_rollups_label_day ON topic_daily_rollups (topic_label, day);
 
 -- Triggers to maintain updated_at timestamps
 CREATE OR REPLACE FUNCTION set_updated_at()
@@ -126,3 +186,11 @@ FOR EACH ROW EXECUTE FUNCTION set_updated_at();
 CREATE TRIGGER trg_digests_updated_at
 BEFORE UPDATE ON digests
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE TRIGGER trg_jobs_updated_at
+BEFORE UPDATE ON jobs
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE TRIGGER trg_app_state_updated_at
+BEFORE UPDATE ON app_state
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -157,7 +157,7 @@ export interface DigestRequest {
 
 export interface TopicSpotlight {
   topic_label: string;
-  change_vs_previous: number;
+  change_vs_previous: number | null; // null when the topic is new this period
   sample_quotes: string[];
 }
 
@@ -174,12 +174,17 @@ export interface DigestResponse {
   timeframe_end: string;
   generated_at: string;
   highlights: string[];
-  key_metrics: Record<string, string | number>;
+  key_metrics: Record<string, string | number | null>;
   sentiment_snapshot?: SentimentSummary;
   topic_spotlight?: TopicSpotlight[];
   competitor_summary?: CompetitorDigestItem[];
 }
 
+export interface DigestListResponse {
+  pagination: Pagination;
+  items: DigestResponse[]; // without sentiment_snapshot, topic_spotlight and competitor_summary
+}
+
 export interface ErrorResponse {
   error: string;
   message: string;
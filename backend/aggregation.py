@@ -0,0 +1,255 @@
+"""Single-pass aggregation of the ``/insights`` dashboard payload.
+
+The sentiment trend, source breakdown, total count and topic distribution are
+all computed over the same filtered review set. Instead of one statement per
+aggregate, the filtered set is expressed once as a CTE and every aggregate is
+read from it in a single round trip:
+
+* PostgreSQL groups the CTE with ``GROUPING SETS ((day, sentiment), (source),
+  ())`` so the trend, breakdown and grand total come out of one scan.
+* Other dialects group at the finest grain (day × sentiment × source) and the
+  coarser aggregates are rolled up in Python, which is equivalent because
+  every measure is a count or a sum.
+
+Topic totals join ``review_topics`` to the same CTE and are appended with
+``UNION ALL``. When the daily rollups are ready the CTE reads
+``review_daily_rollups`` and topics come from ``topic_daily_rollups``.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import func, literal, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from . import rollups
+from .models import Review, ReviewDailyRollup, ReviewTopic, Source, TopicDailyRollup
+
+# ``GROUPING(bucket, source_id)`` bitmask per grouping set; other dialects report FINEST.
+FINEST = -1
+BY_DAY_AND_SENTIMENT = 1
+BY_SOURCE = 2
+GRAND_TOTAL = 3
+
+
+class AggregateRow(NamedTuple):
+    """One row of the combined aggregate statement (also produced by ``backend.columnar``)."""
+
+    kind: str
+    grouping_set: int
+    bucket: Any
+    sentiment_label: Optional[str]
+    source_id: Any
+    source_name: Optional[str]
+    topic_label: Optional[str]
+    review_count: int
+    value_sum: float
+
+
+@dataclass
+class InsightsAggregates:
+    total: int = 0
+    sentiment_trend: List[Dict[str, Any]] = field(default_factory=list)
+    source_breakdown: List[Dict[str, Any]] = field(default_factory=list)
+    topic_distribution: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def insights_aggregates(
+    session: Session, filters, rollup_scope: Optional[Dict[str, Any]] = None
+) -> InsightsAggregates:
+    """Aggregate the reviews matching ``filters`` (or ``rollup_scope``) in one statement."""
+    dialect = session.get_bind().dialect.name
+    stmt = _aggregate_statement(dialect, filters, rollup_scope)
+    return assemble_aggregates(session.execute(stmt))
+
+
+def _aggregate_statement(dialect: str, filters, rollup_scope: Optional[Dict[str, Any]]):
+    if rollup_scope is not None:
+        filtered = (
+            select(
+                ReviewDailyRollup.day.label("bucket"),
+                ReviewDailyRollup.sentiment_label,
+                ReviewDailyRollup.source_id,
+                Source.name.label("source_name"),
+                ReviewDailyRollup.review_count,
+                ReviewDailyRollup.score_sum,
+            )
+            .join(Source, Source.id == ReviewDailyRollup.source_id)
+            .where(*rollups.rollup_filters(ReviewDailyRollup, **rollup_scope))
+            .cte("filtered")
+        )
+        topics = select(
+            TopicDailyRollup.topic_label,
+            TopicDailyRollup.review_count,
+            TopicDailyRollup.confidence_sum,
+        ).where(*rollups.rollup_filters(TopicDailyRollup, **rollup_scope))
+    else:
+        if dialect == "postgresql":
+            bucket = func.date_trunc("day", Review.published_at)
+        else:
+            bucket = func.date(Review.published_at)
+        filtered = (
+            select(
+                Review.id,
+                bucket.label("bucket"),
+                Review.sentiment_label,
+                Review.source_id,
+                Source.name.label("source_name"),
+                literal(1).label("review_count"),
+                Review.sentiment_score.label("score_sum"),
+            )
+            .join(Source, Source.id == Review.source_id)
+            .where(*filters)
+            .cte("filtered")
+        )
+        topics = select(
+            ReviewTopic.topic_label,
+            literal(1).label("review_count"),
+            ReviewTopic.topic_confidence.label("confidence_sum"),
+        ).join(filtered, filtered.c.id == ReviewTopic.review_id)
+
+    columns = filtered.c
+    measures = (
+        func.sum(columns.review_count).label("review_count"),
+        func.sum(columns.score_sum).label("value_sum"),
+    )
+    if dialect == "postgresql":
+        reviews = select(
+            literal("review").label("kind"),
+            func.grouping(columns.bucket, columns.source_id).label("grouping_set"),
+            columns.bucket,
+            columns.sentiment_label,
+            columns.source_id,
+            columns.source_name,
+            null().label("topic_label"),
+            *measures,
+        ).group_by(
+            func.grouping_sets(
+                tuple_(columns.bucket, columns.sentiment_label),
+                tuple_(columns.source_id, columns.source_name),
+                tuple_(),
+            )
+        )
+    else:
+        reviews = select(
+            literal("review").label("kind"),
+            literal(FINEST).label("grouping_set"),
+            columns.bucket,
+            columns.sentiment_label,
+            columns.source_id,
+            columns.source_name,
+            null().label("topic_label"),
+            *measures,
+        ).group_by(columns.bucket, columns.sentiment_label, columns.source_id, columns.source_name)
+
+    topic_rows = topics.subquery("topic_rows")
+    topic_totals = select(
+        literal("topic").label("kind"),
+        literal(FINEST).label("grouping_set"),
+        null().label("bucket"),
+        null().label("sentiment_label"),
+        null().label("source_id"),
+        null().label("source_name"),
+        topic_rows.c.topic_label,
+        func.sum(topic_rows.c.review_count).label("review_count"),
+        func.sum(topic_rows.c.confidence_sum).label("value_sum"),
+    ).group_by(topic_rows.c.topic_label)
+    return union_all(reviews, topic_totals)
+
+
+def assemble_aggregates(rows) -> InsightsAggregates:
+    """Shape ``AggregateRow``-like rows into the insights payload sections."""
+    trend: Dict[str, Dict[str, Any]] = {}
+    sources: Dict[Any, Dict[str, Any]] = {}
+    topics: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+    total = 0
+
+    for row in rows:
+        count = int(row.review_count or 0)
+        value = float(row.value_sum or 0)
+        if row.kind == "topic":
+            topics[row.topic_label][0] += count
+            topics[row.topic_label][1] += value
+            continue
+        if row.grouping_set in (FINEST, BY_DAY_AND_SENTIMENT):
+            bucket = _bucket_key(row.bucket)
+            entry = trend.setdefault(
+                bucket,
+                {"date": bucket, "positive": 0, "neutral": 0, "negative": 0, "_count": 0, "_score": 0.0},
+            )
+            label = (row.sentiment_label or "").lower()
+            if label in ("positive", "neutral", "negative"):
+                entry[label] += count
+            entry["_count"] += count
+            entry["_score"] += value
+        if row.grouping_set in (FINEST, BY_SOURCE):
+            entry = sources.setdefault(
+                row.source_id, {"name": row.source_name, "count": 0, "score": 0.0}
+            )
+            entry["count"] += count
+            entry["score"] += value
+        if row.grouping_set in (FINEST, GRAND_TOTAL):
+            total += count
+
+    sentiment_trend = []
+    for bucket in sorted(trend):
+        entry = trend[bucket]
+        review_count, score_total = entry.pop("_count"), entry.pop("_score")
+        entry["average_score"] = round(score_total / review_count, 2) if review_count else 0.0
+        sentiment_trend.append(entry)
+
+    source_breakdown = [
+        {
+            "source_id": str(source_id),
+            "source_name": entry["name"],
+            "review_count": entry["count"],
+            "average_sentiment_score": round(entry["score"] / entry["count"], 2) if entry["count"] else 0.0,
+        }
+        for source_id, entry in sorted(sources.items(), key=lambda item: (-item[1]["count"], item[1]["name"]))
+    ]
+
+    topic_distribution = [
+        {
+            "topic_label": label,
+            "review_count": count,
+            "average_confidence": round(confidence / count, 2) if count else 0.0,
+        }
+        for label, (count, confidence) in sorted(topics.items(), key=lambda item: (-item[1][0], item[0]))
+    ]
+
+    return InsightsAggregates(
+        total=total,
+        sentiment_trend=sentiment_trend,
+        source_breakdown=source_breakdown,
+        topic_distribution=topic_distribution,
+    )
+
+
+def summarize_sentiment(counts: Dict[str, List[float]]) -> Dict[str, Any]:
+    """Shape ``{sentiment_label: [count, score_sum]}`` as a sentiment snapshot."""
+    summary = {"positive": 0, "neutral": 0, "negative": 0, "average_score": 0.0, "review_count": 0}
+
+    score_total = 0.0
+    for sentiment_label, (count, score_sum) in counts.items():
+        label = sentiment_label.lower()
+        if label in summary:
+            summary[label] = count
+        summary["review_count"] += count
+        score_total += score_sum
+
+    if summary["review_count"]:
+        summary["average_score"] = round(score_total / summary["review_count"], 2)
+
+    return summary
+
+
+def _bucket_key(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import hashlib
 import math
 import re
-from collections import Counter
-from typing import Dict, Iterable, List
+import threading
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
 SentimentResult = Dict[str, float | str]
 TopicResult = Dict[str, float | str]
+AnalysisResult = Dict[str, SentimentResult | List[TopicResult]]
 
 POSITIVE_TERMS = {
     "love",
@@ -50,6 +55,63 @@ TOPIC_KEYWORDS: Dict[str, Iterable[str]] = {
     "Performance": {"slow", "fast", "load"},
 }
 
+# Multi-word entries used by the phrase analyzer in addition to the single terms above.
+SENTIMENT_PHRASES: Dict[str, float] = {
+    "too slow": -1.0,
+    "not helpful": -1.0,
+    "not working": -1.0,
+    "keeps crashing": -1.0,
+    "waste of time": -1.0,
+    "works great": 1.0,
+    "easy to use": 1.0,
+    "game changer": 1.0,
+}
+TOPIC_PHRASES: Dict[str, Iterable[str]] = {
+    "Integrations": {"hubspot sync", "salesforce sync", "csv export"},
+    "Email Digests": {"weekly digest", "daily email"},
+    "Support Response": {"customer support", "response time"},
+    "Performance": {"load time", "too slow"},
+}
+
+NEGATION_TERMS = {
+    "not",
+    "no",
+    "never",
+    "without",
+    "hardly",
+    "cannot",
+    "don't",
+    "doesn't",
+    "didn't",
+    "isn't",
+    "wasn't",
+    "aren't",
+    "weren't",
+    "can't",
+    "won't",
+}
+INTENSIFIER_TERMS = {"very", "really", "extremely", "super", "so", "incredibly", "totally"}
+CLAUSE_BREAK_TERMS = {"but", "however", "although", "though"}
+
+NEGATION_WINDOW = 3
+INTENSIFIER_WINDOW = 2
+INTENSIFIER_WEIGHT = 1.5
+
+ANALYZER_VERSION = "keyword-1"
+PHRASE_ANALYZER_VERSION = "phrase-1"
+
+
+def lexicon_version() -> str:
+    """Version tag for cached results: analyzer revision plus a lexicon fingerprint."""
+    digest = hashlib.sha1()
+    for terms in (POSITIVE_TERMS, NEGATIVE_TERMS):
+        digest.update("\x1f".join(sorted(terms)).encode())
+        digest.update(b"\x1e")
+    for label, keywords in TOPIC_KEYWORDS.items():
+        digest.update(label.encode() + b"\x1d" + "\x1f".join(sorted(keywords)).encode())
+        digest.update(b"\x1e")
+    return f"{ANALYZER_VERSION}:{digest.hexdigest()[:12]}"
+
 
 def analyze_sentiment(text: str) -> SentimentResult:
     """Return a naive sentiment analysis result in OpenAPI format."""
@@ -62,15 +124,7 @@ def analyze_sentiment(text: str) -> SentimentResult:
 
     raw_score = (pos_hits - neg_hits) / max(len(tokens), 1)
     score = max(-1.0, min(1.0, round(raw_score, 2)))
-
-    if score > 0.15:
-        label = "Positive"
-    elif score < -0.15:
-        label = "Negative"
-    else:
-        label = "Neutral"
-
-    return {"label": label, "score": score}
+    return {"label": _label_for(score), "score": score}
 
 
 def extract_topics(text: str) -> List[TopicResult]:
@@ -99,5 +153,355 @@ def extract_topics(text: str) -> List[TopicResult]:
     return matched_topics
 
 
+def analyze_batch(
+    texts: Sequence[str], titles: Optional[Sequence[Optional[str]]] = None
+) -> List[AnalysisResult]:
+    """Analyse many texts at once with results identical to the single-text functions.
+
+    Each text is tokenized exactly once. Lexicon hits are collected into a
+    sparse (document, term) hit list against the union of the sentiment and
+    topic vocabularies, and per-document sentiment and topic counts are then
+    reduced with NumPy ``bincount``s. When ``titles`` are given, sentiment is
+    scored over ``title + body`` (as ingest does) while topics use the body.
+    """
+    if not texts:
+        return []
+    titles = titles if titles is not None else [None] * len(texts)
+
+    vocabulary, polarity, topic_labels, term_topics = _batch_lexicon()
+    n_docs = len(texts)
+
+    hit_docs: List[int] = []
+    hit_terms: List[int] = []
+    title_docs: List[int] = []
+    title_terms: List[int] = []
+    body_lengths = np.zeros(n_docs, dtype=np.int64)
+    title_lengths = np.zeros(n_docs, dtype=np.int64)
+
+    for doc_index, (text, title) in enumerate(zip(texts, titles)):
+        tokens = _tokenize(text)
+        body_lengths[doc_index] = len(tokens)
+        for token in tokens:
+            term_index = vocabulary.get(token)
+            if term_index is not None:
+                hit_docs.append(doc_index)
+                hit_terms.append(term_index)
+        if title:
+            title_tokens = _tokenize(title)
+            title_lengths[doc_index] = len(title_tokens)
+            for token in title_tokens:
+                term_index = vocabulary.get(token)
+                if term_index is not None:
+                    title_docs.append(doc_index)
+                    title_terms.append(term_index)
+
+    docs = np.asarray(hit_docs + title_docs, dtype=np.int64)
+    terms = np.asarray(hit_terms + title_terms, dtype=np.int64)
+    sentiment_lengths = body_lengths + title_lengths
+    hit_polarity = polarity[terms] if terms.size else np.zeros(0, dtype=np.int64)
+    pos_hits = np.bincount(docs, weights=hit_polarity == 1, minlength=n_docs)
+    neg_hits = np.bincount(docs, weights=hit_polarity == -1, minlength=n_docs)
+    raw_scores = (pos_hits - neg_hits) / np.maximum(sentiment_lengths, 1)
+
+    # Topics are scored on body tokens only; expand each hit to the topics its term belongs to.
+    n_topics = len(topic_labels)
+    body_docs = docs[: len(hit_docs)]
+    body_terms = terms[: len(hit_docs)]
+    topic_counts = np.zeros((n_docs, n_topics), dtype=np.int64)
+    if body_terms.size and n_topics:
+        per_term = term_topics[body_terms]
+        doc_idx, topic_idx = np.nonzero(per_term)
+        flat = body_docs[doc_idx] * n_topics + topic_idx
+        topic_counts = np.bincount(flat, minlength=n_docs * n_topics).reshape(n_docs, n_topics)
+    confidences = 0.5 + np.minimum(0.5, topic_counts / np.maximum(body_lengths, 1)[:, None])
+
+    results: List[AnalysisResult] = []
+    for doc_index in range(n_docs):
+        if sentiment_lengths[doc_index]:
+            score = max(-1.0, min(1.0, round(float(raw_scores[doc_index]), 2)))
+            sentiment: SentimentResult = {"label": _label_for(score), "score": score}
+        else:
+            sentiment = {"label": "Neutral", "score": 0.0}
+
+        topics: List[TopicResult] = []
+        if body_lengths[doc_index]:
+            for topic_index in np.flatnonzero(topic_counts[doc_index]):
+                topics.append(
+                    {
+                        "topic_label": topic_labels[topic_index],
+                        "topic_confidence": round(float(confidences[doc_index, topic_index]), 2),
+                    }
+                )
+        if not topics:
+            topics.append({"topic_label": "General Feedback", "topic_confidence": 0.5})
+        results.append({"sentiment": sentiment, "topics": topics})
+    return results
+
+
+def _batch_lexicon() -> Tuple[Dict[str, int], np.ndarray, List[str], np.ndarray]:
+    """Index the union vocabulary; rebuilt per call so lexicon edits apply immediately."""
+    topic_labels = list(TOPIC_KEYWORDS)
+    terms = set(POSITIVE_TERMS) | set(NEGATIVE_TERMS)
+    for keywords in TOPIC_KEYWORDS.values():
+        terms.update(keywords)
+    vocabulary = {term: index for index, term in enumerate(sorted(terms))}
+
+    polarity = np.zeros(len(vocabulary), dtype=np.int64)
+    for term in POSITIVE_TERMS:
+        polarity[vocabulary[term]] += 1
+    for term in NEGATIVE_TERMS:
+        polarity[vocabulary[term]] -= 1
+
+    term_topics = np.zeros((len(vocabulary), len(topic_labels)), dtype=bool)
+    for topic_index, label in enumerate(topic_labels):
+        for keyword in set(TOPIC_KEYWORDS[label]):
+            term_topics[vocabulary[keyword], topic_index] = True
+    return vocabulary, polarity, topic_labels, term_topics
+
+
+class PhraseLexicon:
+    """Token-level Aho-Corasick automaton over sentiment and topic phrases.
+
+    All phrases are compiled into one trie with failure links, so matching a
+    text is a single pass over its tokens whose cost depends on the text
+    length and the number of matches, not on the lexicon size. Overlapping
+    matches are resolved leftmost-longest ("not helpful" wins over
+    "helpful"). A sentiment match is flipped when a negator occurs within
+    ``negation_window`` preceding tokens and scaled by ``intensifier_weight``
+    when an intensifier occurs within ``intensifier_window``; both windows
+    stop at clause breaks ("but") and at the previous match.
+    """
+
+    def __init__(
+        self,
+        sentiment: Mapping[str, float],
+        topics: Mapping[str, Iterable[str]],
+        *,
+        negators: Iterable[str] = NEGATION_TERMS,
+        intensifiers: Iterable[str] = INTENSIFIER_TERMS,
+        negation_window: int = NEGATION_WINDOW,
+        intensifier_window: int = INTENSIFIER_WINDOW,
+        intensifier_weight: float = INTENSIFIER_WEIGHT,
+    ) -> None:
+        self.negators = frozenset(negators)
+        self.intensifiers = frozenset(intensifiers)
+        self.negation_window = negation_window
+        self.intensifier_window = intensifier_window
+        self.intensifier_weight = intensifier_weight
+        self.topic_labels: List[str] = []
+
+        entries: Dict[Tuple[str, ...], List[Any]] = {}
+        for phrase, weight in sentiment.items():
+            key = tuple(_tokenize(phrase))
+            if key:
+                entries.setdefault(key, [0.0, set()])[0] += float(weight)
+        for label, phrases in topics.items():
+            topic_index = len(self.topic_labels)
+            self.topic_labels.append(label)
+            for phrase in phrases:
+                key = tuple(_tokenize(phrase))
+                if key:
+                    entries.setdefault(key, [0.0, set()])[1].add(topic_index)
+
+        self.phrases: List[Tuple[str, ...]] = sorted(entries)
+        self._weights = [entries[phrase][0] for phrase in self.phrases]
+        self._topics = [tuple(sorted(entries[phrase][1])) for phrase in self.phrases]
+        self._compile()
+        self.fingerprint = self._fingerprint()
+
+    @classmethod
+    def default(cls) -> "PhraseLexicon":
+        """The built-in lexicon: single keyword terms plus the phrase tables."""
+        sentiment: Dict[str, float] = {term: 1.0 for term in POSITIVE_TERMS}
+        for term in NEGATIVE_TERMS:
+            sentiment[term] = sentiment.get(term, 0.0) - 1.0
+        sentiment.update(SENTIMENT_PHRASES)
+        topics: Dict[str, set] = {label: set(keywords) for label, keywords in TOPIC_KEYWORDS.items()}
+        for label, phrases in TOPIC_PHRASES.items():
+            topics.setdefault(label, set()).update(phrases)
+        return cls(sentiment, topics)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "PhraseLexicon":
+        """Build from a JSON-style document.
+
+        ``{"positive": [...], "negative": [...], "sentiment": {phrase: weight},
+        "topics": {label: [...]}, "negators": [...], "intensifiers": [...]}``;
+        every key is optional.
+        """
+        sentiment: Dict[str, float] = {}
+        for phrase in data.get("positive", ()):
+            sentiment[phrase] = 1.0
+        for phrase in data.get("negative", ()):
+            sentiment[phrase] = -1.0
+        sentiment.update({phrase: float(weight) for phrase, weight in data.get("sentiment", {}).items()})
+        return cls(
+            sentiment,
+            data.get("topics", {}),
+            negators=data.get("negators", NEGATION_TERMS),
+            intensifiers=data.get("intensifiers", INTENSIFIER_TERMS),
+        )
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[int, int, int]]:
+        """Return every ``(start, end, phrase_index)`` occurrence in ``tokens``."""
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        matches: List[Tuple[int, int, int]] = []
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for phrase_index in output[state]:
+                matches.append((position + 1 - lengths[phrase_index], position + 1, phrase_index))
+        return matches
+
+    def analyze(self, text: str, title: Optional[str] = None) -> AnalysisResult:
+        """Score ``title + text`` for sentiment and ``text`` for topics, like ``analyze_batch``."""
+        body_tokens = _tokenize(text)
+        body_weight, topic_hits = self._score(body_tokens)
+        title_tokens = _tokenize(title) if title else []
+        title_weight = self._score(title_tokens)[0] if title_tokens else 0.0
+
+        length = len(body_tokens) + len(title_tokens)
+        if length:
+            score = max(-1.0, min(1.0, round((body_weight + title_weight) / length, 2)))
+            sentiment: SentimentResult = {"label": _label_for(score), "score": score}
+        else:
+            sentiment = {"label": "Neutral", "score": 0.0}
+
+        topics: List[TopicResult] = [
+            {
+                "topic_label": self.topic_labels[topic_index],
+                "topic_confidence": round(0.5 + min(0.5, hits / len(body_tokens)), 2),
+            }
+            for topic_index, hits in sorted(topic_hits.items())
+        ]
+        if not topics:
+            topics.append({"topic_label": "General Feedback", "topic_confidence": 0.5})
+        return {"sentiment": sentiment, "topics": topics}
+
+    def analyze_batch(
+        self, texts: Sequence[str], titles: Optional[Sequence[Optional[str]]] = None
+    ) -> List[AnalysisResult]:
+        titles = titles if titles is not None else [None] * len(texts)
+        return [self.analyze(text, title) for text, title in zip(texts, titles)]
+
+    def _score(self, tokens: Sequence[str]) -> Tuple[float, Counter]:
+        weight = 0.0
+        topic_hits: Counter = Counter()
+        boundary = 0  # tokens before this index belong to an earlier match or clause
+        for start, end, phrase_index in self._select(self.find(tokens)):
+            phrase_weight = self._weights[phrase_index]
+            if phrase_weight:
+                window_start = max(boundary, start - max(self.negation_window, self.intensifier_window))
+                negated = intensified = False
+                for position in range(start - 1, window_start - 1, -1):
+                    token = tokens[position]
+                    if token in CLAUSE_BREAK_TERMS:
+                        break
+                    if token in self.negators and start - position <= self.negation_window:
+                        negated = True
+                    elif token in self.intensifiers and start - position <= self.intensifier_window:
+                        intensified = True
+                if intensified:
+                    phrase_weight *= self.intensifier_weight
+                weight += -phrase_weight if negated else phrase_weight
+            for topic_index in self._topics[phrase_index]:
+                topic_hits[topic_index] += 1
+            boundary = end
+        return weight, topic_hits
+
+    @staticmethod
+    def _select(matches: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+        """Keep non-overlapping matches, preferring the leftmost then the longest."""
+        selected: List[Tuple[int, int, int]] = []
+        covered = 0
+        for match in sorted(matches, key=lambda item: (item[0], -item[1])):
+            if match[0] >= covered:
+                selected.append(match)
+                covered = match[1]
+        return selected
+
+    def _compile(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        own_output: List[List[int]] = [[]]
+        for phrase_index, phrase in enumerate(self.phrases):
+            state = 0
+            for token in phrase:
+                next_state = goto[state].get(token)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][token] = next_state
+                    goto.append({})
+                    own_output.append([])
+                state = next_state
+            own_output[state].append(phrase_index)
+
+        fail = [0] * len(goto)
+        output: List[Tuple[int, ...]] = [()] * len(goto)
+        queue = deque(goto[0].values())
+        for state in queue:
+            output[state] = tuple(own_output[state])
+        while queue:
+            state = queue.popleft()
+            for token, child in goto[state].items():
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(token, 0)
+                output[child] = tuple(own_output[child]) + output[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+        self._lengths = [len(phrase) for phrase in self.phrases]
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha1()
+        for phrase, weight, topics in zip(self.phrases, self._weights, self._topics):
+            labels = ",".join(self.topic_labels[index] for index in topics)
+            digest.update(f"{' '.join(phrase)}\x1f{weight}\x1f{labels}\x1e".encode())
+        for terms in (self.negators, self.intensifiers):
+            digest.update("\x1f".join(sorted(terms)).encode() + b"\x1e")
+        digest.update(f"{self.negation_window}:{self.intensifier_window}:{self.intensifier_weight}".encode())
+        return digest.hexdigest()[:12]
+
+
+_default_phrase_lexicon: Optional[Tuple[str, PhraseLexicon]] = None
+_phrase_lexicon_lock = threading.Lock()
+
+
+def default_phrase_lexicon() -> PhraseLexicon:
+    """Compiled built-in lexicon, recompiled only when the module lexicons change."""
+    global _default_phrase_lexicon
+    version = lexicon_version() + repr(sorted(SENTIMENT_PHRASES.items()))
+    version += repr(sorted((label, sorted(phrases)) for label, phrases in TOPIC_PHRASES.items()))
+    cached = _default_phrase_lexicon
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _phrase_lexicon_lock:
+        lexicon = PhraseLexicon.default()
+        _default_phrase_lexicon = (version, lexicon)
+    return lexicon
+
+
+def analyze_phrases(
+    texts: Sequence[str],
+    titles: Optional[Sequence[Optional[str]]] = None,
+    lexicon: Optional[PhraseLexicon] = None,
+) -> List[AnalysisResult]:
+    """Phrase-aware counterpart of ``analyze_batch`` (negation, intensifiers, multi-word entries)."""
+    return (lexicon or default_phrase_lexicon()).analyze_batch(texts, titles)
+
+
+def _label_for(score: float) -> str:
+    if score > 0.15:
+        return "Positive"
+    if score < -0.15:
+        return "Negative"
+    return "Neutral"
+
+
 def _tokenize(text: str) -> List[str]:
     return re.findall(r"[a-zA-Z']+", text.lower())
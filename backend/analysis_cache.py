@@ -0,0 +1,251 @@
+"""Content-addressed cache for sentiment/topic analysis results.
+
+Results are keyed by a SHA-256 of the analyzer/lexicon version and the
+whitespace- and case-normalised title and body, so cross-posted or
+re-ingested reviews are analysed once. The in-process tier is an LRU bounded
+by entry count and TTL; an optional persistent tier in the ``analysis_cache``
+table lets hits survive restarts and be shared across gunicorn workers.
+Writers prune that table at most every ``PRUNE_INTERVAL_SECONDS``: rows past
+the TTL, and rows written by a different version of the active analyzer, are
+deleted so it stays bounded by what is still servable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .analysis import AnalysisResult, lexicon_version
+from .analyzers import get_analyzer
+from .models import AnalysisCacheEntry
+
+BatchAnalyzer = Callable[[Sequence[str], Optional[Sequence[Optional[str]]]], List[AnalysisResult]]
+
+LOOKUP_CHUNK_SIZE = 1000
+PRUNE_INTERVAL_SECONDS = 300.0
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case-fold and collapse whitespace; analysis output is invariant under both."""
+    return " ".join((text or "").lower().split())
+
+
+def cache_key(version: str, body: str, title: Optional[str] = None) -> str:
+    payload = "\x00".join((version, normalize_text(title), normalize_text(body)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Thread-safe LRU + TTL cache with an optional database-backed tier."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400.0, persist: bool = False) -> None:
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, AnalysisResult]]" = OrderedDict()
+        self.configure(max_entries=max_entries, ttl_seconds=ttl_seconds, persist=persist)
+
+    def configure(self, *, max_entries: int, ttl_seconds: float, persist: bool) -> None:
+        with self._lock:
+            self.max_entries = max(0, max_entries)
+            self.ttl_seconds = ttl_seconds
+            self.persist = persist
+            self.hits = 0
+            self.misses = 0
+            self.persistent_hits = 0
+            self.evictions = 0
+            self.pruned = 0
+            self._entries.clear()
+            self._last_prune: Optional[float] = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "pruned": self.pruned,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def analyze(
+        self,
+        texts: Sequence[str],
+        titles: Optional[Sequence[Optional[str]]] = None,
+        *,
+        session: Optional[Session] = None,
+        compute: Optional[BatchAnalyzer] = None,
+        version: Optional[str] = None,
+    ) -> List[AnalysisResult]:
+        """Return analyses for ``texts``, computing only cache misses.
+
+        ``compute``/``version`` default to the active analyzer backend.
+        ``session`` enables the persistent tier (when configured); new rows
+        are written in the caller's transaction. Degraded results (produced by
+        a fallback analyzer) are returned but never cached.
+        """
+        titles = titles if titles is not None else [None] * len(texts)
+        backend = "custom"
+        active_version: Optional[str] = None
+        if compute is None:
+            analyzer = get_analyzer()
+            compute = analyzer.analyze_batch
+            version = version or analyzer.version()
+            backend = analyzer.name
+            active_version = version
+        version = version or lexicon_version()
+        keys = [cache_key(version, text, title) for text, title in zip(texts, titles)]
+        results: List[Optional[AnalysisResult]] = [None] * len(keys)
+
+        misses = self._lookup_memory(keys, results)
+        if misses and self.persist and session is not None:
+            found = _load_persistent(session, [keys[index] for index in misses], self.ttl_seconds)
+            if found:
+                with self._lock:
+                    self.persistent_hits += len(found)
+                self._store_memory(found)
+                for index in misses:
+                    if keys[index] in found:
+                        results[index] = _copy(found[keys[index]])
+                misses = [index for index in misses if results[index] is None]
+
+        if misses:
+            # Identical texts inside one batch are computed once.
+            unique: Dict[str, int] = {}
+            for index in misses:
+                unique.setdefault(keys[index], index)
+            order = list(unique.values())
+            started = time.perf_counter()
+            computed = compute([texts[index] for index in order], [titles[index] for index in order])
+            metrics.observe_analysis(backend, len(order), time.perf_counter() - started)
+            fresh = {keys[index]: result for index, result in zip(order, computed)}
+            for index in misses:
+                results[index] = _copy(fresh[keys[index]])
+            cacheable = {key: result for key, result in fresh.items() if not result.get("degraded")}
+            self._store_memory(cacheable)
+            if cacheable and self.persist and session is not None:
+                _store_persistent(session, cacheable, version)
+                self._maybe_prune(session, active_version)
+
+        return [result for result in results if result is not None]
+
+    def _maybe_prune(self, session: Session, active_version: Optional[str]) -> None:
+        """Delete expired persistent rows, and those of other analyzer versions, once per interval.
+
+        Other versions are only pruned when ``active_version`` is the configured
+        analyzer's, so a caller passing a custom ``compute`` never evicts it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_prune is not None and now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+                return
+            self._last_prune = now
+        deleted = _prune_persistent(session, self.ttl_seconds, active_version)
+        with self._lock:
+            self.pruned += deleted
+
+    def _lookup_memory(self, keys: List[str], results: List[Optional[AnalysisResult]]) -> List[int]:
+        now = time.monotonic()
+        misses: List[int] = []
+        with self._lock:
+            for index, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    results[index] = _copy(entry[1])
+                    self.hits += 1
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                misses.append(index)
+                self.misses += 1
+        return misses
+
+    def _store_memory(self, entries: Dict[str, AnalysisResult]) -> None:
+        if not self.max_entries:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for key, result in entries.items():
+                self._entries[key] = (now, result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+def _copy(result: AnalysisResult) -> AnalysisResult:
+    return {
+        "sentiment": dict(result["sentiment"]),
+        "topics": [dict(topic) for topic in result["topics"]],
+    }
+
+
+def _load_persistent(session: Session, keys: List[str], ttl_seconds: float) -> Dict[str, AnalysisResult]:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    found: Dict[str, AnalysisResult] = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        stmt = select(AnalysisCacheEntry.cache_key, AnalysisCacheEntry.result).where(
+            AnalysisCacheEntry.cache_key.in_(keys[start : start + LOOKUP_CHUNK_SIZE]),
+            AnalysisCacheEntry.created_at >= cutoff,
+        )
+        found.update({row.cache_key: row.result for row in session.execute(stmt)})
+    return found
+
+
+def _prune_persistent(session: Session, ttl_seconds: float, active_version: Optional[str]) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    stale = AnalysisCacheEntry.created_at < cutoff
+    if active_version is not None:
+        stale = or_(stale, AnalysisCacheEntry.analyzer_version != active_version)
+    result = session.execute(delete(AnalysisCacheEntry).where(stale).execution_options(synchronize_session=False))
+    return result.rowcount or 0
+
+
+def _store_persistent(session: Session, entries: Dict[str, AnalysisResult], version: str) -> None:
+    rows = [
+        {"cache_key": key, "analyzer_version": version, "result": result}
+        for key, result in entries.items()
+    ]
+    table = AnalysisCacheEntry.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Expired rows are refreshed in place so the TTL restarts.
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"result": stmt.excluded.result, "created_at": stmt.excluded.created_at},
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"result": stmt.excluded.result, "created_at": stmt.excluded.created_at},
+        )
+    else:
+        existing = set(
+            session.execute(select(table.c.cache_key).where(table.c.cache_key.in_(list(entries)))).scalars()
+        )
+        rows = [row for row in rows if row["cache_key"] not in existing]
+        stmt = insert(table)
+    now = datetime.now(timezone.utc)
+    for row in rows:
+        row["created_at"] = now
+    if rows:
+        session.execute(stmt, rows)
+
+
+analysis_cache = AnalysisCache()
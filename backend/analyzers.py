@@ -0,0 +1,376 @@
+"""Pluggable analyzer backends and a micro-batching scheduler for remote models.
+
+The keyword and phrase analyzers in ``analysis.py`` run in-process. Remote model
+backends (``HTTPModelAnalyzer``) are wrapped in a ``MicroBatchScheduler`` that
+coalesces concurrent analyze calls arriving within a few milliseconds into one
+batched request, bounds in-flight requests, retries with exponential backoff
+and falls back to the keyword analyzer when the model is unavailable.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .analysis import (
+    PHRASE_ANALYZER_VERSION,
+    AnalysisResult,
+    PhraseLexicon,
+    analyze_batch,
+    default_phrase_lexicon,
+    lexicon_version,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyzerError(RuntimeError):
+    """Raised when an analyzer backend cannot produce results."""
+
+
+class AnalyzerBackend:
+    """Interface every analyzer backend implements."""
+
+    name = "base"
+
+    def version(self) -> str:
+        """Identifier folded into analysis cache keys; change it when output changes."""
+        raise NotImplementedError
+
+    def analyze_batch(
+        self, texts: Sequence[str], titles: Optional[Sequence[Optional[str]]] = None
+    ) -> List[AnalysisResult]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release background resources (threads, connections)."""
+
+
+class KeywordAnalyzer(AnalyzerBackend):
+    """The built-in lexicon analyzer."""
+
+    name = "keyword"
+
+    def version(self) -> str:
+        return lexicon_version()
+
+    def analyze_batch(self, texts, titles=None):
+        return analyze_batch(texts, titles)
+
+
+class PhraseAnalyzer(AnalyzerBackend):
+    """Aho-Corasick phrase matcher with negation and intensifier handling.
+
+    Uses the built-in phrase lexicon unless a custom ``PhraseLexicon`` (for
+    example a per-customer lexicon loaded from JSON) is supplied.
+    """
+
+    name = "phrase"
+
+    def __init__(self, lexicon: Optional[PhraseLexicon] = None) -> None:
+        self.lexicon = lexicon
+
+    @classmethod
+    def from_file(cls, path: str) -> "PhraseAnalyzer":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls(PhraseLexicon.from_mapping(json.load(handle)))
+
+    def version(self) -> str:
+        return f"{PHRASE_ANALYZER_VERSION}:{self._lexicon().fingerprint}"
+
+    def analyze_batch(self, texts, titles=None):
+        return self._lexicon().analyze_batch(texts, titles)
+
+    def _lexicon(self) -> PhraseLexicon:
+        return self.lexicon or default_phrase_lexicon()
+
+
+class HTTPModelAnalyzer(AnalyzerBackend):
+    """Calls a remote model service that analyses a batch per request.
+
+    Request body: ``{"model": ..., "items": [{"text": ..., "title": ...}]}``.
+    Expected response: ``{"results": [{"sentiment": {...}, "topics": [...]}]}``
+    in request order, using the same shapes as ``/analyze``.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: float = 10.0,
+    ) -> None:
+        if not url:
+            raise ValueError("ANALYZER_HTTP_URL must be set for the http analyzer.")
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+
+    def version(self) -> str:
+        return f"http:{self.model or self.url}"
+
+    def analyze_batch(self, texts, titles=None):
+        titles = titles if titles is not None else [None] * len(texts)
+        body = json.dumps(
+            {
+                "model": self.model,
+                "items": [{"text": text, "title": title} for text, title in zip(texts, titles)],
+            }
+        ).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.loads(response.read())
+        except (OSError, ValueError) as exc:
+            raise AnalyzerError(f"Model request failed: {exc}") from exc
+
+        results = payload.get("results") if isinstance(payload, dict) else None
+        if not isinstance(results, list) or len(results) != len(texts):
+            raise AnalyzerError("Model response did not contain one result per item.")
+        return [_validate_result(result) for result in results]
+
+
+SENTIMENT_LABELS = {label.lower(): label for label in ("Positive", "Neutral", "Negative")}
+
+
+def _validate_result(result: Any) -> AnalysisResult:
+    """Coerce one model result to the shapes the ``reviews``/``review_topics`` columns accept.
+
+    Labels are matched case-insensitively; scores must lie in [-1, 1] and
+    confidences in [0, 1]. Anything else raises ``AnalyzerError`` so the
+    scheduler retries and then falls back instead of failing the ingest.
+    """
+    try:
+        sentiment = result["sentiment"]
+        topics = result["topics"]
+        label = SENTIMENT_LABELS.get(str(sentiment["label"]).strip().lower())
+        if label is None:
+            raise ValueError(f"unknown sentiment label {sentiment['label']!r}")
+        score = _bounded(sentiment["score"], -1.0, 1.0, "sentiment score")
+        return {
+            "sentiment": {"label": label, "score": score},
+            "topics": [
+                {
+                    "topic_label": str(topic["topic_label"]),
+                    "topic_confidence": _bounded(topic["topic_confidence"], 0.0, 1.0, "topic confidence"),
+                }
+                for topic in topics
+            ],
+        }
+    except (KeyError, TypeError, ValueError) as exc:
+        raise AnalyzerError(f"Malformed model result: {exc}") from exc
+
+
+def _bounded(value: Any, low: float, high: float, name: str) -> float:
+    number = float(value)
+    if not low <= number <= high:  # also rejects NaN
+        raise ValueError(f"{name} {number} outside [{low}, {high}]")
+    return number
+
+
+_Pending = Tuple[str, Optional[str], Future]
+
+
+class MicroBatchScheduler(AnalyzerBackend):
+    """Coalesces concurrent calls to a slow backend into batched requests."""
+
+    def __init__(
+        self,
+        backend: AnalyzerBackend,
+        *,
+        fallback: Optional[AnalyzerBackend] = None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_concurrency: int = 4,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.1,
+    ) -> None:
+        self.backend = backend
+        self.name = backend.name
+        self.fallback = fallback or KeywordAnalyzer()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.stats = {"batches": 0, "items": 0, "retries": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()
+
+        self._queue: List[_Pending] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="analyzer")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="analyzer-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def version(self) -> str:
+        return self.backend.version()
+
+    def analyze_batch(self, texts, titles=None):
+        titles = titles if titles is not None else [None] * len(texts)
+        futures: List[Future] = []
+        with self._condition:
+            for text, title in zip(texts, titles):
+                future: Future = Future()
+                self._queue.append((text, title, future))
+                futures.append(future)
+            self._condition.notify()
+
+        deadline = time.monotonic() + self.timeout
+        results: List[AnalysisResult] = []
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                future.cancel()
+                self._bump("fallbacks")
+                (fallback,) = self.fallback.analyze_batch([texts[index]], [titles[index]])
+                results.append({**fallback, "degraded": True})
+        return results
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join(timeout=1.0)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Give concurrent callers a short window to join this batch.
+                window_end = time.monotonic() + self.max_wait
+                while len(self._queue) < self.max_batch_size and not self._closed:
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._queue[: self.max_batch_size]
+                del self._queue[: self.max_batch_size]
+            live = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+            if live:
+                self._executor.submit(self._run_batch, live)
+
+    def _run_batch(self, batch: List[_Pending]) -> None:
+        texts = [text for text, _, _ in batch]
+        titles = [title for _, title, _ in batch]
+        self._bump("batches")
+        self._bump("items", len(batch))
+        try:
+            results = self._call_with_retry(texts, titles)
+        except Exception as exc:  # noqa: BLE001 - any backend failure degrades to the fallback
+            logger.warning("Analyzer %s failed, using %s fallback: %s", self.backend.name, self.fallback.name, exc)
+            self._bump("fallbacks", len(batch))
+            try:
+                results = [{**result, "degraded": True} for result in self.fallback.analyze_batch(texts, titles)]
+            except Exception as fallback_exc:  # noqa: BLE001
+                for _, _, future in batch:
+                    future.set_exception(fallback_exc)
+                return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _call_with_retry(self, texts: List[str], titles: List[Optional[str]]) -> List[AnalysisResult]:
+        attempt = 0
+        while True:
+            try:
+                return self.backend.analyze_batch(texts, titles)
+            except AnalyzerError:
+                if attempt >= self.max_retries:
+                    raise
+                self._bump("retries")
+                time.sleep(self.backoff_seconds * (2**attempt))
+                attempt += 1
+
+
+AnalyzerFactory = Callable[[Mapping[str, Any]], AnalyzerBackend]
+
+_registry: Dict[str, AnalyzerFactory] = {}
+_active: AnalyzerBackend = KeywordAnalyzer()
+_active_lock = threading.Lock()
+
+
+def register_analyzer(name: str, factory: AnalyzerFactory) -> None:
+    """Register a backend factory that builds an analyzer from app config."""
+    _registry[name] = factory
+
+
+def available_analyzers() -> List[str]:
+    return sorted(_registry)
+
+
+def get_analyzer() -> AnalyzerBackend:
+    return _active
+
+
+def create_analyzer(name: str, config: Optional[Mapping[str, Any]] = None) -> AnalyzerBackend:
+    """Build a registered backend without activating it."""
+    factory = _registry.get(name.lower())
+    if factory is None:
+        raise RuntimeError(f"Unknown ANALYZER_BACKEND '{name}'. Available: {', '.join(available_analyzers())}.")
+    return factory(config or {})
+
+
+def configure_analyzer(config: Mapping[str, Any]) -> AnalyzerBackend:
+    """Build the backend named by ``ANALYZER_BACKEND`` and make it the active analyzer."""
+    global _active
+    backend = create_analyzer(config.get("ANALYZER_BACKEND") or "keyword", config)
+    with _active_lock:
+        previous, _active = _active, backend
+    if previous is not backend:
+        previous.close()
+    return backend
+
+
+def _keyword_factory(config: Mapping[str, Any]) -> AnalyzerBackend:
+    return KeywordAnalyzer()
+
+
+def _phrase_factory(config: Mapping[str, Any]) -> AnalyzerBackend:
+    path = config.get("ANALYZER_PHRASE_LEXICON")
+    return PhraseAnalyzer.from_file(path) if path else PhraseAnalyzer()
+
+
+def _http_factory(config: Mapping[str, Any]) -> AnalyzerBackend:
+    backend = HTTPModelAnalyzer(
+        config.get("ANALYZER_HTTP_URL") or "",
+        api_key=config.get("ANALYZER_HTTP_API_KEY"),
+        model=config.get("ANALYZER_HTTP_MODEL"),
+        timeout=float(config.get("ANALYZER_TIMEOUT_SECONDS", 10.0)),
+    )
+    return MicroBatchScheduler(
+        backend,
+        max_batch_size=int(config.get("ANALYZER_BATCH_SIZE", 64)),
+        max_wait_ms=float(config.get("ANALYZER_BATCH_WAIT_MS", 5.0)),
+        max_concurrency=int(config.get("ANALYZER_MAX_CONCURRENCY", 4)),
+        timeout=float(config.get("ANALYZER_TIMEOUT_SECONDS", 10.0)) * (int(config.get("ANALYZER_MAX_RETRIES", 2)) + 2),
+        max_retries=int(config.get("ANALYZER_MAX_RETRIES", 2)),
+    )
+
+
+register_analyzer("keyword", _keyword_factory)
+register_analyzer("phrase", _phrase_factory)
+register_analyzer("http", _http_factory)
@@ -10,7 +10,14 @@ from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from werkzeug.exceptions import HTTPException
 
+from . import metrics, profiling, query_stats, rollups
+from .analysis_cache import analysis_cache
+from .analyzers import configure_analyzer
+from .columnar import columnar_store
+from .dimensions import dimension_cache
+from .jobs import JobWorkerPool
 from .models import init_app as init_models
+from .response_cache import response_cache
 from .routes.analyze import bp as analyze_bp
 from .routes.auth import bp as auth_bp
 from .routes.competitors import bp as competitors_bp
@@ -47,8 +54,71 @@ def create_app() -> Flask:
     app.config["AUTH_TOKEN_TTL_SECONDS"] = int(os.environ.get("AUTH_TOKEN_TTL_SECONDS", "604800"))
     app.config["AUTH_PASSWORD_MIN_LENGTH"] = int(os.environ.get("AUTH_PASSWORD_MIN_LENGTH", "8"))
     app.config["ADMIN_INVITE_CODE"] = os.environ.get("ADMIN_INVITE_CODE", "")
+    app.config["INGEST_CHUNK_SIZE"] = int(os.environ.get("INGEST_CHUNK_SIZE", "500"))
+    app.config["INGEST_ASYNC"] = _env_flag("INGEST_ASYNC")
+    app.config["DIGEST_ASYNC"] = _env_flag("DIGEST_ASYNC")
+    app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", "2"))
+    app.config["JOB_POLL_INTERVAL_SECONDS"] = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "2"))
+    app.config["ANALYSIS_CACHE_SIZE"] = int(os.environ.get("ANALYSIS_CACHE_SIZE", "10000"))
+    app.config["ANALYSIS_CACHE_TTL_SECONDS"] = float(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", "86400"))
+    app.config["ANALYSIS_CACHE_PERSIST"] = _env_flag("ANALYSIS_CACHE_PERSIST")
+    app.config["INSIGHTS_CACHE_ENABLED"] = _env_flag("INSIGHTS_CACHE_ENABLED", default=True)
+    app.config["INSIGHTS_CACHE_PATH"] = os.environ.get("INSIGHTS_CACHE_PATH")
+    app.config["INSIGHTS_CACHE_TTL_SECONDS"] = float(os.environ.get("INSIGHTS_CACHE_TTL_SECONDS", "300"))
+    app.config["INSIGHTS_CACHE_MAX_ENTRIES"] = int(os.environ.get("INSIGHTS_CACHE_MAX_ENTRIES", "500"))
+    app.config["INSIGHTS_CACHE_MAX_AGE"] = int(os.environ.get("INSIGHTS_CACHE_MAX_AGE", "0"))
+    app.config["INSIGHTS_CACHE_STALE_SECONDS"] = int(os.environ.get("INSIGHTS_CACHE_STALE_SECONDS", "30"))
+    app.config["COLUMNAR_CACHE_ENABLED"] = _env_flag("COLUMNAR_CACHE_ENABLED")
+    app.config["COLUMNAR_CACHE_MAX_ROWS"] = int(os.environ.get("COLUMNAR_CACHE_MAX_ROWS", "5000000"))
+    app.config["COLUMNAR_CACHE_REFRESH_SECONDS"] = float(os.environ.get("COLUMNAR_CACHE_REFRESH_SECONDS", "5"))
+    app.config["COLUMNAR_CACHE_VERIFY_SECONDS"] = float(os.environ.get("COLUMNAR_CACHE_VERIFY_SECONDS", "300"))
+    app.config["COLUMNAR_CACHE_LAG_SECONDS"] = float(os.environ.get("COLUMNAR_CACHE_LAG_SECONDS", "120"))
+    app.config["QUERY_STATS_ENABLED"] = _env_flag("QUERY_STATS_ENABLED", default=True)
+    app.config["QUERY_REPEAT_THRESHOLD"] = int(os.environ.get("QUERY_REPEAT_THRESHOLD", "5"))
+    app.config["METRICS_ENABLED"] = _env_flag("METRICS_ENABLED", default=True)
+    app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN", "")
+    app.config["PROFILING_ENABLED"] = _env_flag("PROFILING_ENABLED", default=True)
+    app.config["PROFILE_DIR"] = os.environ.get("PROFILE_DIR")
+    app.config["PROFILE_SAMPLE_INTERVAL_MS"] = float(os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+    app.config["PROFILE_KEEP"] = int(os.environ.get("PROFILE_KEEP", "50"))
+    app.config["ANALYZER_BACKEND"] = os.environ.get("ANALYZER_BACKEND", "keyword")
+    app.config["ANALYZER_PHRASE_LEXICON"] = os.environ.get("ANALYZER_PHRASE_LEXICON")
+    app.config["ANALYZER_HTTP_URL"] = os.environ.get("ANALYZER_HTTP_URL", "")
+    app.config["ANALYZER_HTTP_MODEL"] = os.environ.get("ANALYZER_HTTP_MODEL")
+    app.config["ANALYZER_HTTP_API_KEY"] = os.environ.get("ANALYZER_HTTP_API_KEY")
+    app.config["ANALYZER_BATCH_SIZE"] = int(os.environ.get("ANALYZER_BATCH_SIZE", "64"))
+    app.config["ANALYZER_BATCH_WAIT_MS"] = float(os.environ.get("ANALYZER_BATCH_WAIT_MS", "5"))
+    app.config["ANALYZER_MAX_CONCURRENCY"] = int(os.environ.get("ANALYZER_MAX_CONCURRENCY", "4"))
+    app.config["ANALYZER_TIMEOUT_SECONDS"] = float(os.environ.get("ANALYZER_TIMEOUT_SECONDS", "10"))
+    app.config["ANALYZER_MAX_RETRIES"] = int(os.environ.get("ANALYZER_MAX_RETRIES", "2"))
 
     init_models(app)
+    dimension_cache.warm()
+    rollups.initialize()
+    configure_analyzer(app.config)
+    analysis_cache.configure(
+        max_entries=app.config["ANALYSIS_CACHE_SIZE"],
+        ttl_seconds=app.config["ANALYSIS_CACHE_TTL_SECONDS"],
+        persist=app.config["ANALYSIS_CACHE_PERSIST"],
+    )
+    response_cache.configure(
+        enabled=app.config["INSIGHTS_CACHE_ENABLED"],
+        path=app.config["INSIGHTS_CACHE_PATH"],
+        ttl_seconds=app.config["INSIGHTS_CACHE_TTL_SECONDS"],
+        max_entries=app.config["INSIGHTS_CACHE_MAX_ENTRIES"],
+    )
+    columnar_store.configure(
+        enabled=app.config["COLUMNAR_CACHE_ENABLED"],
+        max_rows=app.config["COLUMNAR_CACHE_MAX_ROWS"],
+        refresh_seconds=app.config["COLUMNAR_CACHE_REFRESH_SECONDS"],
+        verify_seconds=app.config["COLUMNAR_CACHE_VERIFY_SECONDS"],
+        lag_seconds=app.config["COLUMNAR_CACHE_LAG_SECONDS"],
+    )
+    columnar_store.warm()
+    app.extensions["job_workers"] = JobWorkerPool(
+        size=app.config["JOB_WORKERS"],
+        poll_interval=app.config["JOB_POLL_INTERVAL_SECONDS"],
+    )
 
     CORS(
         app,
@@ -62,6 +132,12 @@ def create_app() -> Flask:
     register_blueprints(app)
     register_routes(app)
     register_error_handlers(app)
+    if app.config["QUERY_STATS_ENABLED"]:
+        query_stats.init_app(app)
+    if app.config["METRICS_ENABLED"]:
+        metrics.init_app(app)
+    if app.config["PROFILING_ENABLED"]:
+        profiling.init_app(app)
 
     return app
 
@@ -140,6 +216,14 @@ def register_error_handlers(app: Flask) -> None:
         return jsonify(payload), 500
 
 
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Interpret an environment variable as a boolean switch."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _extract_retry_after(exc: HTTPException, default: int = 60) -> int:
     """Derive a Retry-After value from an exception or default."""
     retry_after = None
@@ -0,0 +1,525 @@
+"""Optional in-process columnar copy of the review fact table.
+
+When ``COLUMNAR_CACHE_ENABLED`` is set, every API process keeps the columns
+the dashboard aggregates over in NumPy arrays:
+
+* ``published_at`` (int64 microseconds), ``sentiment_score`` (int16
+  hundredths), sentiment label code, source index and competitor index per
+  review;
+* one entry per review-topic link (review row, topic index, confidence in
+  int16 thousandths).
+
+Scores and confidences are stored at the precision of their ``NUMERIC``
+columns, so sums are exact and match the database to the last digit.
+
+Insights, competitor comparisons and digests then filter with vectorized
+boolean masks and aggregate with ``np.bincount`` instead of querying the
+database. The store is loaded at startup and extended from new rows using a
+``created_at`` high-water mark (re-reading a short lag window so rows from
+transactions that committed late are not missed). Commits in this process
+that update or delete reviews trigger a full reload; a periodic consistency
+check against the database catches edits made by other processes. Each
+snapshot records the response-cache data generation it was built at, and a
+reader that sees a newer generation (a commit from another worker on this
+host) waits for an append first, so cached responses never pair a stale
+snapshot with a newer generation. The store
+disables itself rather than grow past ``COLUMNAR_CACHE_MAX_ROWS``, and any
+database error makes callers fall back to SQL aggregation.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import models
+from .aggregation import BY_DAY_AND_SENTIMENT, BY_SOURCE, FINEST, GRAND_TOTAL, AggregateRow
+from .models import Review, ReviewTopic, Source
+from .response_cache import ResponseCache, add_data_change_listener, response_cache
+from .rollups import ANY_COMPETITOR
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("Positive", "Neutral", "Negative")
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+MICROS_PER_DAY = 86_400_000_000
+SCORE_SCALE = 100  # reviews.sentiment_score is NUMERIC(3, 2)
+CONFIDENCE_SCALE = 1000  # review_topics.topic_confidence is NUMERIC(4, 3)
+FETCH_BATCH_SIZE = 50_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_DAY = date(1970, 1, 1)
+
+
+def to_micros(value: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+class _Column:
+    """Append-only array with amortised growth; ``view()`` is safe to hand to readers."""
+
+    def __init__(self, dtype) -> None:
+        self._data = np.empty(0, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values: np.ndarray) -> None:
+        needed = self._size + values.size
+        if needed > self._data.size:
+            grown = np.empty(max(needed, self._data.size * 2, 1024), dtype=self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+        # Readers only see ``[:size]`` of earlier views, so writing past it is safe.
+        self._data[self._size : needed] = values
+        self._size = needed
+
+    def view(self) -> np.ndarray:
+        return self._data[: self._size]
+
+
+@dataclass(frozen=True)
+class ColumnarSnapshot:
+    """Immutable view of the columns; each refresh publishes a new snapshot."""
+
+    published_at: np.ndarray
+    sentiment_score: np.ndarray
+    sentiment_code: np.ndarray
+    source_index: np.ndarray
+    competitor_index: np.ndarray
+    link_review: np.ndarray
+    link_topic: np.ndarray
+    link_confidence: np.ndarray
+    sources: Tuple[uuid.UUID, ...]
+    source_names: Tuple[str, ...]
+    # Index 0 is our own product (``competitor_id IS NULL``).
+    competitors: Tuple[Optional[uuid.UUID], ...]
+    topics: Tuple[str, ...]
+
+    @property
+    def size(self) -> int:
+        return int(self.published_at.size)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.published_at,
+            self.sentiment_score,
+            self.sentiment_code,
+            self.source_index,
+            self.competitor_index,
+            self.link_review,
+            self.link_topic,
+            self.link_confidence,
+        )
+        return int(sum(array.nbytes for array in arrays))
+
+    def mask(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        source_id: Optional[uuid.UUID] = None,
+        sentiment: Optional[str] = None,
+        competitor: Any = ANY_COMPETITOR,
+    ) -> np.ndarray:
+        """Boolean row mask mirroring the raw review filters (``start``/``end`` inclusive)."""
+        selected = np.ones(self.size, dtype=bool)
+        if start is not None:
+            selected &= self.published_at >= to_micros(start)
+        if end is not None:
+            selected &= self.published_at <= to_micros(end)
+        if source_id is not None:
+            selected &= self.source_index == _index_of(self.sources, source_id)
+        if sentiment is not None:
+            selected &= self.sentiment_code == LABEL_CODES.get(sentiment, -1)
+        if competitor is not ANY_COMPETITOR:
+            selected &= self.competitor_index == _index_of(self.competitors, competitor)
+        return selected
+
+    def sentiment_counts(self, selected: np.ndarray) -> Dict[str, List[float]]:
+        """``{sentiment_label: [review_count, score_sum]}`` like ``rollups.sentiment_counts``."""
+        codes = self.sentiment_code[selected]
+        counts = np.bincount(codes, minlength=len(LABELS))
+        sums = np.bincount(codes, weights=self.sentiment_score[selected], minlength=len(LABELS))
+        return {
+            LABELS[code]: [int(counts[code]), float(sums[code]) / SCORE_SCALE] for code in np.flatnonzero(counts)
+        }
+
+    def sentiment_counts_by_competitor(self, selected: np.ndarray) -> Dict[uuid.UUID, Dict[str, List[float]]]:
+        """``{competitor_id: sentiment_counts}`` for every competitor with selected reviews."""
+        cells = self.competitor_index[selected].astype(np.int64) * len(LABELS) + self.sentiment_code[selected]
+        size = len(self.competitors) * len(LABELS)
+        counts = np.bincount(cells, minlength=size)
+        sums = np.bincount(cells, weights=self.sentiment_score[selected], minlength=size)
+        totals: Dict[uuid.UUID, Dict[str, List[float]]] = {}
+        for cell in np.flatnonzero(counts):
+            competitor, code = divmod(int(cell), len(LABELS))
+            if competitor == 0:
+                continue
+            totals.setdefault(self.competitors[competitor], {})[LABELS[code]] = [
+                int(counts[cell]),
+                float(sums[cell]) / SCORE_SCALE,
+            ]
+        return totals
+
+    def topic_totals(self, selected: np.ndarray) -> Dict[str, List[float]]:
+        """``{topic_label: [link_count, confidence_sum]}`` over the selected reviews."""
+        links = selected[self.link_review]
+        codes = self.link_topic[links]
+        counts = np.bincount(codes, minlength=len(self.topics))
+        sums = np.bincount(codes, weights=self.link_confidence[links], minlength=len(self.topics))
+        return {
+            self.topics[code]: [int(counts[code]), float(sums[code]) / CONFIDENCE_SCALE]
+            for code in np.flatnonzero(counts)
+        }
+
+    def topic_counts(self, selected: np.ndarray) -> Dict[str, int]:
+        return {label: count for label, (count, _) in self.topic_totals(selected).items()}
+
+    def source_ids(self, selected: np.ndarray) -> Set[uuid.UUID]:
+        return {self.sources[index] for index in np.unique(self.source_index[selected])}
+
+    def aggregate_rows(self, selected: np.ndarray) -> List[AggregateRow]:
+        """The rows of ``aggregation``'s combined statement, computed from the columns."""
+        codes = self.sentiment_code[selected].astype(np.int64)
+        scores = self.sentiment_score[selected]
+        days = self.published_at[selected] // MICROS_PER_DAY
+        first_day = int(days.min()) if days.size else 0
+        cells = (days - first_day) * len(LABELS) + codes
+        counts = np.bincount(cells)
+        sums = np.bincount(cells, weights=scores)
+
+        rows = []
+        for cell in np.flatnonzero(counts):
+            day = _EPOCH_DAY + timedelta(days=first_day + int(cell // len(LABELS)))
+            label = LABELS[cell % len(LABELS)]
+            rows.append(
+                AggregateRow(
+                    "review", BY_DAY_AND_SENTIMENT, day, label, None, None, None, int(counts[cell]), float(sums[cell]) / SCORE_SCALE
+                )
+            )
+
+        sources = self.source_index[selected]
+        counts = np.bincount(sources, minlength=len(self.sources))
+        sums = np.bincount(sources, weights=scores, minlength=len(self.sources))
+        for index in np.flatnonzero(counts):
+            rows.append(
+                AggregateRow(
+                    "review",
+                    BY_SOURCE,
+                    None,
+                    None,
+                    self.sources[index],
+                    self.source_names[index],
+                    None,
+                    int(counts[index]),
+                    float(sums[index]) / SCORE_SCALE,
+                )
+            )
+        total = float(scores.sum(dtype=np.int64)) / SCORE_SCALE
+        rows.append(AggregateRow("review", GRAND_TOTAL, None, None, None, None, None, int(codes.size), total))
+
+        for label, (count, confidence) in self.topic_totals(selected).items():
+            rows.append(AggregateRow("topic", FINEST, None, None, None, None, label, count, confidence))
+        return rows
+
+    def cell_totals(self) -> Dict[Tuple[uuid.UUID, Optional[uuid.UUID], str], Tuple[int, float]]:
+        """Count and score sum per (source, competitor, sentiment), for consistency checks."""
+        width = len(self.competitors) * len(LABELS)
+        cells = (
+            self.source_index.astype(np.int64) * width
+            + self.competitor_index.astype(np.int64) * len(LABELS)
+            + self.sentiment_code
+        )
+        counts = np.bincount(cells, minlength=len(self.sources) * width)
+        sums = np.bincount(cells, weights=self.sentiment_score, minlength=len(self.sources) * width)
+        totals = {}
+        for cell in np.flatnonzero(counts):
+            source, rest = divmod(int(cell), width)
+            competitor, code = divmod(rest, len(LABELS))
+            totals[(self.sources[source], self.competitors[competitor], LABELS[code])] = (
+                int(counts[cell]),
+                float(sums[cell]) / SCORE_SCALE,
+            )
+        return totals
+
+
+class ColumnarStore:
+    """Process-wide holder of the current ``ColumnarSnapshot``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(
+        self,
+        *,
+        enabled: bool = False,
+        max_rows: int = 5_000_000,
+        refresh_seconds: float = 5.0,
+        verify_seconds: float = 300.0,
+        lag_seconds: float = 120.0,
+    ) -> None:
+        with self._lock:
+            self.enabled = enabled
+            self.max_rows = max_rows
+            self.refresh_seconds = refresh_seconds
+            self.verify_seconds = verify_seconds
+            self.lag = timedelta(seconds=lag_seconds)
+            self._reset(None)
+
+    def _reset(self, url: Optional[str]) -> None:
+        self._url = url
+        self._snapshot: Optional[ColumnarSnapshot] = None
+        self._columns = {
+            "published_at": _Column(np.int64),
+            "sentiment_score": _Column(np.int16),
+            "sentiment_code": _Column(np.int8),
+            "source_index": _Column(np.int32),
+            "competitor_index": _Column(np.int32),
+            "link_review": _Column(np.int32),
+            "link_topic": _Column(np.int16),
+            "link_confidence": _Column(np.int16),
+        }
+        self._sources: Dict[uuid.UUID, int] = {}
+        self._source_names: List[str] = []
+        self._competitors: Dict[Optional[uuid.UUID], int] = {None: 0}
+        self._topics: Dict[str, int] = {}
+        self._high_water: Optional[datetime] = None
+        # Ids read inside the lag window, so re-reading it does not duplicate rows.
+        self._recent: Dict[uuid.UUID, datetime] = {}
+        self._pending: Optional[str] = None
+        # Response-cache generation read just before the last append started.
+        self._generation: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._verified_at = time.monotonic()
+
+    # --- lifecycle --------------------------------------------------------- #
+
+    def warm(self, session: Optional[Session] = None) -> None:
+        """Load the columns at application startup (no-op when disabled)."""
+        if not self.enabled:
+            return
+        owns_session = session is None
+        session = session or models.get_session()
+        try:
+            snapshot = self.snapshot(session)
+            if snapshot is not None:
+                logger.info("Columnar cache loaded %d reviews (%d bytes).", snapshot.size, snapshot.nbytes)
+        finally:
+            if owns_session:
+                session.close()
+
+    def data_changed(self, url: Any, inserts_only: bool) -> None:
+        """Data change listener: append new rows, or reload after updates/deletes."""
+        if str(url) != self._url:
+            return
+        if not inserts_only:
+            self._pending = "reload"
+        elif self._pending is None:
+            self._pending = "append"
+
+    def snapshot(self, session: Session) -> Optional[ColumnarSnapshot]:
+        """Current snapshot for the session's database, refreshed when due; ``None`` means use SQL."""
+        if not self.enabled:
+            return None
+        url = str(session.get_bind().url)
+        generation = response_cache.generation(ResponseCache.scope_for(url))
+        # Readers never queue behind a routine refresh once a snapshot exists; they use the
+        # previous one. A snapshot older than the current generation is never handed out.
+        blocking = self._snapshot is None or self._url != url or self._generation != generation
+        if not self._lock.acquire(blocking=blocking):
+            return self._snapshot
+        try:
+            now = time.monotonic()
+            if self._url != url or self._snapshot is None or self._pending == "reload":
+                self._reset(url)
+                self._append(session, generation)
+            elif (
+                self._pending == "append"
+                or self._generation != generation
+                or now - self._refreshed_at >= self.refresh_seconds
+            ):
+                self._append(session, generation)
+            if self._snapshot is not None and now - self._verified_at >= self.verify_seconds:
+                self._verify(session)
+            return self._snapshot
+        except SQLAlchemyError:
+            logger.warning("Columnar cache refresh failed; aggregating in SQL.", exc_info=True)
+            session.rollback()
+            self._reset(None)
+            return None
+        finally:
+            self._lock.release()
+
+    # --- loading ----------------------------------------------------------- #
+
+    def _append(self, session: Session, generation: Optional[int] = None) -> None:
+        self._pending = None
+        self._refreshed_at = time.monotonic()
+        if generation is not None:
+            self._generation = generation
+        since = self._high_water - self.lag if self._high_water is not None else None
+        stmt = select(
+            Review.id,
+            Review.created_at,
+            Review.published_at,
+            Review.sentiment_score,
+            Review.sentiment_label,
+            Review.source_id,
+            Review.competitor_id,
+        )
+        if since is not None:
+            stmt = stmt.where(Review.created_at >= since)
+
+        base = self._columns["published_at"].view().size
+        new_rows: Dict[uuid.UUID, int] = {}
+        for batch in session.execute(stmt.execution_options(yield_per=FETCH_BATCH_SIZE)).partitions():
+            fresh = [row for row in batch if row.id not in self._recent and row.id not in new_rows]
+            if base + len(new_rows) + len(fresh) > self.max_rows:
+                logger.warning(
+                    "Columnar cache disabled: more than %d reviews (COLUMNAR_CACHE_MAX_ROWS).", self.max_rows
+                )
+                self.enabled = False
+                self._reset(None)
+                return
+            for row in fresh:
+                new_rows[row.id] = base + len(new_rows)
+                self._recent[row.id] = row.created_at
+                if self._high_water is None or row.created_at > self._high_water:
+                    self._high_water = row.created_at
+            self._extend_reviews(fresh)
+
+        if new_rows:
+            links = select(ReviewTopic.review_id, ReviewTopic.topic_label, ReviewTopic.topic_confidence)
+            if since is not None:
+                links = links.join(Review, Review.id == ReviewTopic.review_id).where(Review.created_at >= since)
+            for batch in session.execute(links.execution_options(yield_per=FETCH_BATCH_SIZE)).partitions():
+                self._extend_links([row for row in batch if row.review_id in new_rows], new_rows)
+            if len(self._source_names) < len(self._sources):
+                names = dict(session.execute(select(Source.id, Source.name)).all())
+                self._source_names = [names.get(source_id, "") for source_id in self._sources]
+
+        if self._high_water is not None:
+            cutoff = self._high_water - self.lag
+            self._recent = {key: created for key, created in self._recent.items() if created >= cutoff}
+        if new_rows or self._snapshot is None:
+            self._publish()
+
+    def _extend_reviews(self, rows: List[Any]) -> None:
+        if not rows:
+            return
+        columns = self._columns
+        columns["published_at"].extend(np.fromiter((to_micros(row.published_at) for row in rows), np.int64, len(rows)))
+        columns["sentiment_score"].extend(
+            np.fromiter((_scaled(row.sentiment_score, SCORE_SCALE) for row in rows), np.int16, len(rows))
+        )
+        columns["sentiment_code"].extend(
+            np.fromiter((LABEL_CODES.get(row.sentiment_label, 1) for row in rows), np.int8, len(rows))
+        )
+        columns["source_index"].extend(
+            np.fromiter((_code(self._sources, row.source_id) for row in rows), np.int32, len(rows))
+        )
+        columns["competitor_index"].extend(
+            np.fromiter((_code(self._competitors, row.competitor_id) for row in rows), np.int32, len(rows))
+        )
+
+    def _extend_links(self, rows: List[Any], positions: Dict[uuid.UUID, int]) -> None:
+        if not rows:
+            return
+        columns = self._columns
+        columns["link_review"].extend(np.fromiter((positions[row.review_id] for row in rows), np.int32, len(rows)))
+        columns["link_topic"].extend(
+            np.fromiter((_code(self._topics, row.topic_label) for row in rows), np.int16, len(rows))
+        )
+        columns["link_confidence"].extend(
+            np.fromiter((_scaled(row.topic_confidence, CONFIDENCE_SCALE) for row in rows), np.int16, len(rows))
+        )
+
+    def _publish(self) -> None:
+        views = {name: column.view() for name, column in self._columns.items()}
+        self._snapshot = ColumnarSnapshot(
+            **views,
+            sources=tuple(self._sources),
+            source_names=tuple(self._source_names),
+            competitors=tuple(self._competitors),
+            topics=tuple(self._topics),
+        )
+
+    # --- consistency ------------------------------------------------------- #
+
+    def _verify(self, session: Session) -> None:
+        """Compare per-cell totals with the database; reload on a persistent mismatch."""
+        self._verified_at = time.monotonic()
+        for attempt in range(2):
+            if self._matches_database(session):
+                return
+            if attempt == 0:
+                # Rows committed since the last refresh look like a mismatch; catch up once.
+                self._append(session)
+        logger.warning("Columnar cache diverged from the database; reloading.")
+        url = self._url
+        self._reset(url)
+        self._append(session)
+
+    def _matches_database(self, session: Session) -> bool:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        stmt = select(
+            Review.source_id,
+            Review.competitor_id,
+            Review.sentiment_label,
+            func.count(Review.id),
+            func.sum(Review.sentiment_score),
+        ).group_by(Review.source_id, Review.competitor_id, Review.sentiment_label)
+        expected = {
+            (source_id, competitor_id, label): (int(count), float(total or 0))
+            for source_id, competitor_id, label, count, total in session.execute(stmt)
+        }
+        actual = snapshot.cell_totals()
+        if expected.keys() != actual.keys():
+            return False
+        for key, (count, total) in expected.items():
+            if actual[key][0] != count or abs(actual[key][1] - total) > 1e-6 * max(1.0, abs(total)):
+                return False
+        topics = dict(
+            session.execute(
+                select(ReviewTopic.topic_label, func.count(ReviewTopic.review_id)).group_by(ReviewTopic.topic_label)
+            ).all()
+        )
+        return topics == snapshot.topic_counts(np.ones(snapshot.size, dtype=bool))
+
+
+def _scaled(value: Any, scale: int) -> int:
+    return int(round(float(value or 0) * scale))
+
+
+def _code(vocabulary: Dict[Any, int], value: Any) -> int:
+    code = vocabulary.get(value)
+    if code is None:
+        code = vocabulary[value] = len(vocabulary)
+    return code
+
+
+def _index_of(values: Iterable[Any], value: Any) -> int:
+    for index, candidate in enumerate(values):
+        if candidate == value:
+            return index
+    return -1
+
+
+columnar_store = ColumnarStore()
+add_data_change_listener(columnar_store.data_changed)
@@ -0,0 +1,159 @@
+"""Process-wide cache of small dimension tables (topics, sources) used on ingest.
+
+Topic label -> id and known source ids are shared by every request thread.
+Entries created inside a transaction are staged on the session and only
+published to the shared cache once that transaction commits, so a rollback
+can never leave the cache pointing at rows that do not exist. Rows deleted
+outside the app are evicted by the ingest path when their foreign key fails
+(``invalidate_topics``/``invalidate_sources``).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from typing import Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import models
+from .models import Source, Topic
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "dimension_cache_pending"
+
+
+class DimensionCache:
+    """Thread-safe label->id map for topics plus the set of known source ids."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bind = None
+        self._topics: Dict[str, UUID] = {}
+        self._sources: Set[UUID] = set()
+
+    # --- lifecycle --------------------------------------------------------- #
+
+    def warm(self, session: Optional[Session] = None) -> None:
+        """Load every topic and source id; called once at application startup."""
+        owns_session = session is None
+        session = session or models.get_session()
+        try:
+            topics = {row.topic_label: row.id for row in session.execute(select(Topic.topic_label, Topic.id))}
+            sources = set(session.execute(select(Source.id)).scalars())
+        except SQLAlchemyError as exc:
+            logger.warning("Dimension cache warm-up skipped: %s", exc)
+            session.rollback()
+            self.clear()
+            return
+        finally:
+            if owns_session:
+                session.close()
+        with self._lock:
+            self._bind = session.get_bind()
+            self._topics = topics
+            self._sources = sources
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bind = None
+            self._topics = {}
+            self._sources = set()
+
+    def invalidate_topics(self, labels: Iterable[str]) -> None:
+        with self._lock:
+            for label in labels:
+                self._topics.pop(label, None)
+
+    def invalidate_sources(self, source_ids: Iterable[UUID]) -> None:
+        with self._lock:
+            self._sources.difference_update(source_ids)
+
+    # --- lookups ----------------------------------------------------------- #
+
+    def topic_ids(self, session: Session, labels: Iterable[str]) -> Dict[str, UUID]:
+        """Resolve labels to topic ids, inserting missing topics conflict-safely."""
+        self._check_bind(session)
+        wanted = set(labels)
+        pending = _pending(session)["topics"]
+        resolved = {label: self._topics[label] for label in wanted if label in self._topics}
+        resolved.update({label: pending[label] for label in wanted - set(resolved) if label in pending})
+
+        missing = sorted(wanted - set(resolved))
+        if missing:
+            created = _resolve_topics_in_db(session, missing)
+            pending.update(created)
+            resolved.update(created)
+        return resolved
+
+    def has_source(self, session: Session, source_id: UUID) -> bool:
+        self._check_bind(session)
+        return source_id in self._sources or source_id in _pending(session)["sources"]
+
+    def remember_source(self, session: Session, source_id: UUID) -> None:
+        _pending(session)["sources"].add(source_id)
+
+    # --- transaction hooks ------------------------------------------------- #
+
+    def _publish(self, session: Session) -> None:
+        staged = session.info.pop(_PENDING_KEY, None)
+        if not staged:
+            return
+        with self._lock:
+            if self._bind is not None and self._bind is not session.get_bind():
+                return
+            self._topics.update(staged["topics"])
+            self._sources.update(staged["sources"])
+
+    def _check_bind(self, session: Session) -> None:
+        bind = session.get_bind()
+        if self._bind is not bind:
+            with self._lock:
+                if self._bind is not bind:
+                    self._bind = bind
+                    self._topics = {}
+                    self._sources = set()
+
+
+def _pending(session: Session) -> Dict[str, dict]:
+    return session.info.setdefault(_PENDING_KEY, {"topics": {}, "sources": set()})
+
+
+def _resolve_topics_in_db(session: Session, labels: list[str]) -> Dict[str, UUID]:
+    """Insert-if-absent then read back, tolerating concurrent inserts of the same label."""
+    rows = [{"id": uuid.uuid4(), "topic_label": label} for label in labels]
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = pg_insert(Topic.__table__).values(rows).on_conflict_do_nothing(index_elements=["topic_label"])
+        session.execute(stmt)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(Topic.__table__).on_conflict_do_nothing(index_elements=["topic_label"])
+        session.execute(stmt, rows)
+    else:
+        existing = set(session.execute(select(Topic.topic_label).where(Topic.topic_label.in_(labels))).scalars())
+        fresh = [row for row in rows if row["topic_label"] not in existing]
+        if fresh:
+            session.execute(insert(Topic.__table__), fresh)
+
+    stmt = select(Topic.topic_label, Topic.id).where(Topic.topic_label.in_(labels))
+    return {row.topic_label: row.id for row in session.execute(stmt)}
+
+
+dimension_cache = DimensionCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    dimension_cache._publish(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,237 @@
+"""Set-based bulk ingest engine shared by the ingest API and loaders.
+
+Reviews are deduplicated against the database in one query per batch, then
+written with multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` on
+PostgreSQL. Other dialects (SQLite in tests) fall back to ``executemany``
+inserts guarded by the same up-front dedupe.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import metrics, rollups
+from .analysis_cache import analysis_cache
+from .dimensions import dimension_cache
+from .models import Review, ReviewTopic, Source
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .routes.ingest import ReviewIngestItemModel, SourceMetadataModel
+
+# Keeps multi-row statements well below PostgreSQL's 65535 bind parameter cap.
+INSERT_CHUNK_SIZE = 1000
+# Upper bound for a single ``IN (...)`` dedupe lookup (SQLite allows 32766 binds).
+LOOKUP_CHUNK_SIZE = 5000
+
+
+@dataclass
+class IngestResult:
+    """Outcome of a bulk ingest call, in request order."""
+
+    review_ids: List[str] = field(default_factory=list)
+    duplicate_count: int = 0
+
+    @property
+    def ingested_count(self) -> int:
+        return len(self.review_ids)
+
+
+def ensure_source(
+    session: Session,
+    source_id: UUID,
+    source_metadata: Optional["SourceMetadataModel"] = None,
+    overwrite: bool = False,
+) -> None:
+    """Make sure the ingest source exists, refreshing metadata when requested.
+
+    Known source ids are answered from the dimension cache without a query.
+    """
+    if not overwrite and dimension_cache.has_source(session, source_id):
+        return
+
+    source = session.get(Source, source_id)
+    if not source:
+        source = Source(
+            id=source_id,
+            name=source_metadata.name if source_metadata and source_metadata.name else "Unnamed Source",
+            platform=source_metadata.platform if source_metadata else None,
+            external_id=source_metadata.external_id if source_metadata else None,
+            url=source_metadata.url if source_metadata else None,
+        )
+        session.add(source)
+        session.flush()
+    elif overwrite and source_metadata:
+        source.name = source_metadata.name or source.name
+        source.platform = source_metadata.platform or source.platform
+        source.external_id = source_metadata.external_id or source.external_id
+        source.url = source_metadata.url or source.url
+    dimension_cache.remember_source(session, source_id)
+
+
+def bulk_ingest_reviews(
+    session: Session,
+    source_id: UUID,
+    items: Sequence["ReviewIngestItemModel"],
+) -> IngestResult:
+    """Insert validated review items for one source using set-based statements.
+
+    The caller owns the transaction; nothing is committed here.
+    """
+    result = IngestResult()
+
+    unique_items: Dict[str, "ReviewIngestItemModel"] = {}
+    for item in items:
+        if item.source_review_id in unique_items:
+            result.duplicate_count += 1
+            continue
+        unique_items[item.source_review_id] = item
+
+    existing = existing_review_ids(session, source_id, list(unique_items))
+    result.duplicate_count += len(existing)
+    pending = [item for key, item in unique_items.items() if key not in existing]
+    if not pending:
+        metrics.observe_ingest(0, result.duplicate_count)
+        return result
+
+    analyses = analysis_cache.analyze(
+        [item.body for item in pending],
+        [item.title for item in pending],
+        session=session,
+    )
+
+    review_rows: List[Dict[str, Any]] = []
+    topic_rows: List[Dict[str, Any]] = []
+    for item, analysis in zip(pending, analyses):
+        review_id = uuid.uuid4()
+        published_at = item.published_at
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+
+        sentiment = analysis["sentiment"]
+        review_rows.append(
+            {
+                "id": review_id,
+                "source_id": source_id,
+                "source_review_id": item.source_review_id,
+                "title": item.title,
+                "body": item.body,
+                "rating": item.rating,
+                "language": item.language,
+                "location": item.location,
+                "sentiment_label": sentiment["label"],
+                "sentiment_score": Decimal(str(sentiment["score"])),
+                "published_at": published_at,
+            }
+        )
+        for topic_result in analysis["topics"]:
+            topic_rows.append(
+                {
+                    "review_id": review_id,
+                    "topic_label": topic_result["topic_label"],
+                    "topic_confidence": Decimal(str(topic_result["topic_confidence"])),
+                }
+            )
+
+    inserted = insert_review_rows(session, review_rows, topic_rows)
+    # Rows that lost an ON CONFLICT race with a concurrent ingest are duplicates too.
+    result.duplicate_count += len(review_rows) - len(inserted)
+    result.review_ids = [str(row["id"]) for row in review_rows if row["id"] in inserted]
+    metrics.observe_ingest(result.ingested_count, result.duplicate_count)
+    return result
+
+
+def insert_review_rows(
+    session: Session,
+    review_rows: List[Dict[str, Any]],
+    topic_rows: List[Dict[str, Any]],
+) -> Set[UUID]:
+    """Write analysed review rows and their topic links; returns inserted review ids.
+
+    ``review_rows`` are ``reviews`` column dicts with client-generated ids and
+    ``topic_rows`` carry ``review_id``, ``topic_label`` and ``topic_confidence``.
+    Reviews skipped by ``ON CONFLICT`` drop their topic rows as well. The daily
+    rollups are incremented in the same transaction.
+
+    A foreign-key failure means a cached source or topic id was deleted outside
+    the app; those ids are evicted from the dimension cache before re-raising
+    so the next attempt resolves them from the database again.
+    """
+    if not review_rows:
+        return set()
+    try:
+        inserted = _insert_reviews(session, review_rows)
+
+        topic_rows = [dict(row) for row in topic_rows if row["review_id"] in inserted]
+        if topic_rows:
+            topic_ids = dimension_cache.topic_ids(session, {row["topic_label"] for row in topic_rows})
+            for row in topic_rows:
+                row["topic_id"] = topic_ids[row["topic_label"]]
+            _insert_review_topics(session, topic_rows)
+    except IntegrityError:
+        dimension_cache.invalidate_sources({row["source_id"] for row in review_rows})
+        dimension_cache.invalidate_topics({row["topic_label"] for row in topic_rows})
+        raise
+    rollups.record_inserted_reviews(
+        session, [row for row in review_rows if row["id"] in inserted], topic_rows
+    )
+    return inserted
+
+
+def existing_review_ids(session: Session, source_id: UUID, source_review_ids: List[str]) -> Set[str]:
+    """Return which ``source_review_ids`` already exist for ``source_id``."""
+    existing: Set[str] = set()
+    for chunk in _chunks(source_review_ids, LOOKUP_CHUNK_SIZE):
+        stmt = select(Review.source_review_id).where(
+            Review.source_id == source_id,
+            Review.source_review_id.in_(chunk),
+        )
+        existing.update(session.execute(stmt).scalars())
+    return existing
+
+
+def _insert_reviews(session: Session, rows: List[Dict[str, Any]]) -> Set[UUID]:
+    if _dialect(session) != "postgresql":
+        session.execute(insert(Review.__table__), rows)
+        return {row["id"] for row in rows}
+
+    inserted: Set[UUID] = set()
+    for chunk in _chunks(rows, INSERT_CHUNK_SIZE):
+        stmt = (
+            pg_insert(Review.__table__)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=["source_id", "source_review_id"])
+            .returning(Review.__table__.c.id)
+        )
+        inserted.update(session.execute(stmt).scalars())
+    return inserted
+
+
+def _insert_review_topics(session: Session, rows: List[Dict[str, Any]]) -> None:
+    if _dialect(session) != "postgresql":
+        session.execute(insert(ReviewTopic.__table__), rows)
+        return
+
+    for chunk in _chunks(rows, INSERT_CHUNK_SIZE):
+        session.execute(
+            pg_insert(ReviewTopic.__table__).values(chunk).on_conflict_do_nothing()
+        )
+
+
+def _dialect(session: Session) -> str:
+    bind = session.get_bind()
+    return bind.dialect.name if bind is not None else "postgresql"
+
+
+def _chunks(values: Sequence[Any], size: int):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
@@ -0,0 +1,301 @@
+"""DB-backed background job queue with an in-process worker pool.
+
+Jobs are rows in the ``jobs`` table. Workers claim them with
+``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL so any number of threads
+and gunicorn processes can drain the queue without double-processing. Other
+dialects fall back to polling with a compare-and-set ``UPDATE``.
+
+A running job holds a lease that its worker renews with a heartbeat; a job
+whose heartbeat stops (worker crash) is claimed again once the lease runs
+out. The worker's final status update only applies while it still owns the
+claim, so a job re-claimed after a lost lease is never recorded twice.
+Failed attempts are retried after an exponential backoff.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import models
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, Dict[str, Any]], Dict[str, Any]]
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+DEFAULT_LEASE_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+# Retry n waits RETRY_BACKOFF_SECONDS * 2 ** (n - 1).
+RETRY_BACKOFF_SECONDS = 30
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def register_job_handler(kind: str, handler: JobHandler) -> None:
+    """Register the function that processes jobs of ``kind``.
+
+    Handlers receive the worker's session and the stored payload, run inside
+    the same transaction that marks the job succeeded, and return the result
+    document persisted on the job.
+    """
+    _handlers[kind] = handler
+
+
+def enqueue_job(session: Session, kind: str, payload: Dict[str, Any]) -> Job:
+    """Add a queued job to the session; the caller commits."""
+    job = Job(kind=kind, status="queued", payload=payload, attempts=0)
+    session.add(job)
+    session.flush()
+    return job
+
+
+def serialize_job(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def claim_next_job(
+    session: Session,
+    worker_id: str,
+    kinds: Optional[Iterable[str]] = None,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+) -> Optional[Job]:
+    """Atomically move the oldest runnable job to ``running`` and commit.
+
+    Queued jobs become runnable at ``run_after``. Jobs left ``running`` with no
+    heartbeat for ``lease_seconds`` (for example after a worker crash) are
+    runnable again.
+    """
+    now = datetime.now(timezone.utc)
+    expired = now - timedelta(seconds=lease_seconds)
+    runnable = or_(
+        and_(Job.status == "queued", or_(Job.run_after.is_(None), Job.run_after <= now)),
+        and_(Job.status == "running", func.coalesce(Job.heartbeat_at, Job.started_at) < expired),
+    )
+    kinds = list(kinds or _handlers)
+    stmt = select(Job).where(runnable, Job.kind.in_(kinds)).order_by(Job.created_at).limit(1)
+
+    if session.get_bind().dialect.name == "postgresql":
+        job = session.execute(stmt.with_for_update(skip_locked=True)).scalar_one_or_none()
+        if job is None:
+            session.rollback()
+            return None
+        job.status = "running"
+        job.locked_by = worker_id
+        job.started_at = now
+        job.heartbeat_at = now
+        job.attempts += 1
+        session.commit()
+        return job
+
+    # Polling fallback: pick a candidate, then compare-and-set on its state.
+    for _ in range(3):
+        candidate = session.execute(stmt).scalar_one_or_none()
+        if candidate is None:
+            session.rollback()
+            return None
+        claimed = session.execute(
+            update(Job)
+            .where(
+                Job.id == candidate.id,
+                Job.status == candidate.status,
+                Job.attempts == candidate.attempts,
+            )
+            .values(
+                status="running",
+                locked_by=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=candidate.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        if claimed.rowcount == 1:
+            session.refresh(candidate)
+            return candidate
+    return None
+
+
+class LeaseHeartbeat:
+    """Renews a claimed job's lease from a side thread while its handler runs."""
+
+    def __init__(self, engine, job_id: UUID, worker_id: str, attempts: int, interval: float) -> None:
+        self.engine = engine
+        self.claim = _owned_by(job_id, worker_id, attempts)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        update(Job).where(*self.claim).values(heartbeat_at=datetime.now(timezone.utc))
+                    )
+            except SQLAlchemyError:
+                logger.warning("Could not renew the lease of a running job", exc_info=True)
+
+
+def _owned_by(job_id: UUID, worker_id: Optional[str], attempts: int) -> List[Any]:
+    return [Job.id == job_id, Job.status == "running", Job.locked_by == worker_id, Job.attempts == attempts]
+
+
+def run_job(
+    session: Session,
+    job: Job,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+) -> None:
+    """Execute a claimed job and record its outcome while this worker still owns it."""
+    handler = _handlers.get(job.kind)
+    job_id, attempts = job.id, job.attempts
+    claim = _owned_by(job_id, job.locked_by, attempts)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'.")
+        heartbeat = LeaseHeartbeat(session.get_bind(), job_id, job.locked_by, attempts, max(lease_seconds / 3, 0.05))
+        with heartbeat:
+            result = handler(session, job.payload)
+        finished = _finish(
+            session,
+            claim,
+            status="succeeded",
+            result=result,
+            error=None,
+            finished_at=datetime.now(timezone.utc),
+        )
+        if finished:
+            session.commit()
+        else:
+            # Another worker re-claimed the job after our lease ran out; drop this run's writes.
+            session.rollback()
+            logger.warning("Job %s lost its lease before attempt %s finished; discarded", job_id, attempts)
+    except Exception as exc:  # noqa: BLE001 - job failures are persisted, not raised
+        session.rollback()
+        logger.exception("Job %s (%s) failed on attempt %s", job_id, job.kind, attempts)
+        retry = handler is not None and attempts < max_attempts
+        now = datetime.now(timezone.utc)
+        _finish(
+            session,
+            claim,
+            status="queued" if retry else "failed",
+            error=str(exc),
+            run_after=now + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)) if retry else None,
+            finished_at=None if retry else now,
+        )
+        session.commit()
+    session.expire(job)
+
+
+def _finish(session: Session, claim: List[Any], **values: Any) -> bool:
+    outcome = session.execute(update(Job).where(*claim).values(**values).execution_options(synchronize_session=False))
+    return outcome.rowcount == 1
+
+
+def run_next_job(worker_id: str, kinds: Optional[Iterable[str]] = None) -> Optional[UUID]:
+    """Claim and run a single job in the current thread; returns its id."""
+    session = models.get_session()
+    try:
+        job = claim_next_job(session, worker_id, kinds)
+        if job is None:
+            return None
+        run_job(session, job)
+        return job.id
+    finally:
+        session.close()
+
+
+def get_job(session: Session, job_id: UUID, kind: Optional[str] = None) -> Optional[Job]:
+    job = session.get(Job, job_id)
+    if job is None or (kind and job.kind != kind):
+        return None
+    return job
+
+
+class JobWorkerPool:
+    """Daemon threads that poll for and execute queued jobs in this process."""
+
+    def __init__(self, size: int = 2, poll_interval: float = 2.0) -> None:
+        self.size = size
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def ensure_started(self) -> None:
+        """Start worker threads on first use (after gunicorn has forked)."""
+        if self.size <= 0 or self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            prefix = f"{socket.gethostname()}:{os.getpid()}"
+            self._threads = [
+                threading.Thread(
+                    target=self._work, args=(f"{prefix}:{index}",), name=f"job-worker-{index}", daemon=True
+                )
+                for index in range(self.size)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def notify(self) -> None:
+        """Wake idle workers immediately instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self, worker_id: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = run_next_job(worker_id)
+            except Exception:  # noqa: BLE001 - keep the worker alive across DB hiccups
+                logger.exception("Job worker %s crashed while claiming work", worker_id)
+                job_id = None
+            finally:
+                if models.SessionLocal:
+                    models.SessionLocal.remove()
+            if job_id is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
@@ -0,0 +1,155 @@
+"""Prometheus metrics and the ``/metrics`` endpoint.
+
+Each gunicorn worker is a separate process with its own counters, so a scrape
+served by one worker would only see that worker's share. When
+``PROMETHEUS_MULTIPROC_DIR`` is set (``gunicorn.conf.py`` sets it before the
+app is imported) ``prometheus_client`` writes every sample to memory-mapped
+files in that directory and ``/metrics`` merges the files of all workers.
+Gauges use ``livesum`` so values of exited workers drop out; ``child_exit`` in
+``gunicorn.conf.py`` removes their files.
+
+Without the variable (tests, ``flask run``) the default in-process registry is
+exported.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import weakref
+
+from flask import Flask, Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from werkzeug.exceptions import Unauthorized
+
+from . import models
+from .security import extract_bearer_token
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the SQLAlchemy pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond the SQLAlchemy pool size (negative while the pool is not full).",
+    multiprocess_mode="livesum",
+)
+ANALYZER_SECONDS = Histogram(
+    "analyzer_batch_seconds",
+    "Time spent computing analyzer batches (cache misses only).",
+    ["backend"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ANALYZED_REVIEWS = Counter(
+    "analyzer_reviews",
+    "Reviews analyzed by the analyzer backend (cache misses only).",
+    ["backend"],
+)
+INGESTED_REVIEWS = Counter(
+    "ingest_reviews",
+    "Reviews processed by ingest, by outcome.",
+    ["outcome"],
+)
+DIGEST_SECONDS = Histogram(
+    "digest_generation_seconds",
+    "Time spent assembling digests.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+
+def observe_analysis(backend: str, review_count: int, seconds: float) -> None:
+    ANALYZER_SECONDS.labels(backend).observe(seconds)
+    ANALYZED_REVIEWS.labels(backend).inc(review_count)
+
+
+def observe_ingest(inserted: int, duplicates: int) -> None:
+    if inserted:
+        INGESTED_REVIEWS.labels("inserted").inc(inserted)
+    if duplicates:
+        INGESTED_REVIEWS.labels("duplicate").inc(duplicates)
+
+
+_instrumented_pools: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def render() -> bytes:
+    """Exposition text for this process, or for every worker in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def instrument_pool(engine) -> None:
+    """Track checked-out and overflow connections of ``engine``'s pool."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+
+    def _update(*_args) -> None:
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            DB_POOL_OVERFLOW.set(pool.overflow())
+
+    if pool not in _instrumented_pools:
+        _instrumented_pools.add(pool)
+        event.listen(pool, "checkout", _update)
+        event.listen(pool, "checkin", _update)
+    _update()
+
+
+def init_app(app: Flask) -> None:
+    """Time every request and serve ``GET /metrics``."""
+    if models.engine is not None:
+        instrument_pool(models.engine)
+
+    @app.before_request
+    def _start_request_metrics() -> None:
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get("metrics_started")
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_SECONDS.labels(request.method, route, str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exception=None) -> None:
+        if g.pop("metrics_started", None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
+
+    @app.get("/metrics")
+    def metrics() -> Response:
+        """Prometheus scrape endpoint (bearer-protected when METRICS_TOKEN is set)."""
+        expected = current_app.config.get("METRICS_TOKEN")
+        if expected and extract_bearer_token(request.headers.get("Authorization")) != expected:
+            raise Unauthorized(description="Invalid bearer token.")
+        return Response(render(), content_type=CONTENT_TYPE_LATEST)
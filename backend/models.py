@@ -6,7 +6,7 @@ import contextlib
 import logging
 import os
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Generator, Iterable, Optional
 
 from alembic import command
@@ -16,9 +16,11 @@ from sqlalchemy import (
     Boolean,
     CheckConstraint,
     Column,
+    Date,
     DateTime,
     ForeignKey,
     Index,
+    Integer,
     JSON,
     Numeric,
     PrimaryKeyConstraint,
@@ -176,6 +178,7 @@ class Source(Base):
 
 class Competitor(Base):
     __tablename__ = "competitors"
+    __table_args__ = (Index("idx_competitors_created_at_id", "created_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
@@ -205,6 +208,7 @@ class Review(Base):
         Index("idx_reviews_source", "source_id"),
         Index("idx_reviews_created_at", "created_at"),
         Index("idx_reviews_sentiment_label", "sentiment_label"),
+        Index("idx_reviews_published_at_id", "published_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
@@ -289,6 +293,7 @@ class ReviewTopic(Base):
 
 class Digest(Base):
     __tablename__ = "digests"
+    __table_args__ = (Index("idx_digests_timeframe", "timeframe_start", "timeframe_end"),)
 
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     timeframe_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -316,6 +321,115 @@ class Digest(Base):
     )
 
 
+class Job(Base):
+    """Durable background job (e.g. an accepted ingest batch) claimed by workers."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'succeeded', 'failed')",
+            name="ck_jobs_status",
+        ),
+        Index("idx_jobs_claim", "status", "kind", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    payload: Mapped[dict] = mapped_column(JSONB().with_variant(JSON, "sqlite"), nullable=False)
+    result: Mapped[Optional[dict]] = mapped_column(
+        JSONB().with_variant(JSON, "sqlite"), nullable=True
+    )
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    locked_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Renewed by the running worker; the lease expires this long after the last heartbeat.
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Retries are not claimed before this time.
+    run_after: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AnalysisCacheEntry(Base):
+    """Persistent tier of the analysis cache, shared across workers and restarts."""
+
+    __tablename__ = "analysis_cache"
+    __table_args__ = (Index("idx_analysis_cache_created_at", "created_at"),)
+
+    cache_key: Mapped[str] = mapped_column(CHAR(64), primary_key=True)
+    analyzer_version: Mapped[str] = mapped_column(String, nullable=False)
+    result: Mapped[dict] = mapped_column(JSONB().with_variant(JSON, "sqlite"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ReviewDailyRollup(Base):
+    """Review counts and sentiment score sums per UTC day, source, competitor and sentiment.
+
+    ``competitor_key`` holds ``rollups.NO_COMPETITOR`` (the nil UUID) for our
+    own reviews so the composite primary key never contains NULL.
+    """
+
+    __tablename__ = "review_daily_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "day", "source_id", "competitor_key", "sentiment_label", name="pk_review_daily_rollups"
+        ),
+    )
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    source_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    competitor_key: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    sentiment_label: Mapped[str] = mapped_column(String, nullable=False)
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+
+class TopicDailyRollup(Base):
+    """Topic link counts and confidence sums per UTC day, topic and review dimensions."""
+
+    __tablename__ = "topic_daily_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "day",
+            "topic_label",
+            "source_id",
+            "competitor_key",
+            "sentiment_label",
+            name="pk_topic_daily_rollups",
+        ),
+        Index("idx_topic_daily_rollups_label_day", "topic_label", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    topic_label: Mapped[str] = mapped_column(String, nullable=False)
+    source_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    competitor_key: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    sentiment_label: Mapped[str] = mapped_column(String, nullable=False)
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    confidence_sum: Mapped[float] = mapped_column(Numeric(14, 3), nullable=False, default=0)
+
+
+class AppState(Base):
+    """Small key/value table for deployment-wide flags (e.g. rollup readiness)."""
+
+    __tablename__ = "app_state"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[dict] = mapped_column(JSONB().with_variant(JSON, "sqlite"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
 # --- Alembic helpers -------------------------------------------------------- #
 
 
@@ -0,0 +1,130 @@
+"""Keyset (cursor) pagination and cheap row-count strategies for list endpoints.
+
+Cursors are opaque, URL-safe tokens wrapping the sort key of the last row on
+a page, e.g. ``(published_at, id)``. The next page is fetched with a row-value
+comparison against that key, which a matching composite index answers
+without scanning skipped rows, so page 10,000 costs the same as page 1.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ("exact", "capped", "estimate", "none")
+# ``capped`` counts stop here; ``estimate`` falls back to it off PostgreSQL.
+COUNT_CAP = 10000
+
+CursorKey = Tuple[datetime, UUID]
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> CursorKey:
+    """Parse a cursor produced by ``encode_cursor``; raises ``ValueError`` when malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError("cursor is invalid") from exc
+
+
+def after_cursor(sort_column, id_column, cursor: CursorKey):
+    """Condition selecting rows after ``cursor`` in ``sort_column DESC, id DESC`` order."""
+    sort_value, row_id = cursor
+    return tuple_(sort_column, id_column) < tuple_(
+        literal(sort_value, sort_column.type), literal(row_id, id_column.type)
+    )
+
+
+def next_cursor(rows: Sequence[Any], page_size: int, sort_attr: str) -> Optional[str]:
+    """Cursor for the page after ``rows`` (fetched with ``limit(page_size + 1)``)."""
+    if len(rows) <= page_size:
+        return None
+    last = rows[page_size - 1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
+
+
+def count_rows(
+    session: Session,
+    stmt,
+    mode: str,
+    cap: Optional[int] = None,
+    known_total: Optional[int] = None,
+) -> Tuple[Optional[int], bool]:
+    """Count rows of ``stmt`` according to ``mode``; returns ``(count, is_exact)``.
+
+    ``exact`` runs ``COUNT(*)``; ``capped`` stops counting after ``cap`` rows;
+    ``estimate`` reads the planner's row estimate (PostgreSQL only, capped
+    elsewhere); ``none`` skips counting. Callers that already computed the
+    exact total pass it as ``known_total`` and no query is issued.
+    """
+    if mode == "none":
+        return None, False
+    if known_total is not None:
+        if mode == "capped":
+            cap = COUNT_CAP if cap is None else cap
+            return min(known_total, cap), known_total <= cap
+        return known_total, True
+    if mode == "exact":
+        total = session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar_one()
+        return total, True
+    if mode == "estimate" and session.get_bind().dialect.name == "postgresql":
+        estimate = _planner_estimate(session, stmt)
+        if estimate is not None:
+            return estimate, False
+
+    cap = COUNT_CAP if cap is None else cap
+    limited = stmt.order_by(None).limit(cap + 1).subquery()
+    total = session.execute(select(func.count()).select_from(limited)).scalar_one()
+    return min(total, cap), total <= cap
+
+
+def pagination_payload(
+    *,
+    page: int,
+    page_size: int,
+    total_items: Optional[int],
+    exact: bool,
+    count_mode: str,
+    cursor: Optional[str],
+) -> Dict[str, Any]:
+    return {
+        "page": page,
+        "page_size": page_size,
+        "total_items": total_items,
+        "total_pages": (total_items + page_size - 1) // page_size if total_items is not None else None,
+        "count_mode": count_mode,
+        "total_items_exact": exact,
+        "next_cursor": cursor,
+    }
+
+
+def _planner_estimate(session: Session, stmt) -> Optional[int]:
+    connection = session.connection()
+    compiled = stmt.order_by(None).compile(dialect=connection.dialect)
+    try:
+        # A savepoint keeps a failed EXPLAIN from aborting the caller's transaction.
+        with connection.begin_nested():
+            plan: List[Dict[str, Any]] = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:  # noqa: BLE001 - an estimate is best effort
+        logger.warning("Planner row estimate failed; counting with a cap instead.", exc_info=True)
+        return None
@@ -0,0 +1,203 @@
+"""On-demand request profiling for admins.
+
+A request carrying ``X-Profile: 1`` (or ``?profile=1``) from an admin runs
+under ``cProfile`` while a sampler thread records the handler thread's stack
+every ``PROFILE_SAMPLE_INTERVAL_MS``. Every SQL statement is captured with
+its duration. The results are written to ``PROFILE_DIR`` under a new id,
+which is returned in the ``X-Profile-Id`` response header, and can be
+downloaded from ``GET /admin/profiles/<id>``:
+
+* ``format=json`` (default): request summary and the SQL statements.
+* ``format=pstats``: binary profile for ``pstats``/snakeviz.
+* ``format=text``: the 40 most expensive functions by cumulative time.
+* ``format=collapsed``: sampled stacks in the collapsed format read by
+  ``flamegraph.pl`` and speedscope.
+
+Requests without the flag only pay for one header and one argument lookup.
+One request is profiled at a time per process.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, current_app, g, jsonify, request
+from werkzeug.exceptions import BadRequest, Conflict, NotFound
+
+from . import query_stats
+from .security import authenticate_request, require_auth
+
+PROFILE_FORMATS = {
+    "json": ("json", "application/json"),
+    "pstats": ("prof", "application/octet-stream"),
+    "text": ("prof", "text/plain; charset=utf-8"),
+    "collapsed": ("collapsed", "text/plain; charset=utf-8"),
+}
+
+_profiling = threading.Lock()
+
+
+def profile_requested() -> bool:
+    return request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1"
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _profile_path(profile_id: uuid.UUID, extension: str) -> str:
+    return os.path.join(current_app.config["PROFILE_DIR"], f"{profile_id.hex}.{extension}")
+
+
+def _start_profile() -> None:
+    if not profile_requested():
+        return
+    user = authenticate_request(admin=True)
+    if not _profiling.acquire(blocking=False):
+        raise Conflict(description="Another request is being profiled; retry shortly.")
+
+    stack = ExitStack()
+    stack.callback(_profiling.release)
+    g.profile_stack = stack
+    g.profile_user_id = str(user.id)
+    g.profile_sql = stack.enter_context(query_stats.capture())
+    interval = current_app.config.get("PROFILE_SAMPLE_INTERVAL_MS", 1) / 1000
+    sampler = StackSampler(threading.get_ident(), interval)
+    sampler.start()
+    stack.callback(sampler.stop)
+    g.profile_sampler = sampler
+    profiler = cProfile.Profile()
+    g.profile_started = time.perf_counter()
+    profiler.enable()
+    stack.callback(profiler.disable)
+    g.profile_profiler = profiler
+
+
+def _finish_profile(response):
+    stack: Optional[ExitStack] = g.pop("profile_stack", None)
+    if stack is None:
+        return response
+    elapsed = time.perf_counter() - g.profile_started
+    stack.close()
+
+    profile_id = uuid.uuid4()
+    directory = current_app.config["PROFILE_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    g.profile_profiler.dump_stats(_profile_path(profile_id, "prof"))
+    with open(_profile_path(profile_id, "collapsed"), "w", encoding="utf-8") as handle:
+        handle.write(g.profile_sampler.collapsed())
+    sql = g.profile_sql
+    summary: Dict[str, Any] = {
+        "profile_id": str(profile_id),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "user_id": g.profile_user_id,
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 3),
+        "sample_count": sum(g.profile_sampler.stacks.values()),
+        "query_count": sql.count,
+        "db_ms": round(sql.duration * 1000, 3),
+        "queries": [
+            {"statement": statement, "duration_ms": round(duration * 1000, 3)}
+            for statement, duration in zip(sql.statements, sql.durations)
+        ],
+    }
+    with open(_profile_path(profile_id, "json"), "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2)
+    _prune(directory, current_app.config.get("PROFILE_KEEP", 50))
+
+    response.headers["X-Profile-Id"] = str(profile_id)
+    return response
+
+
+def _abandon_profile(exception=None) -> None:
+    stack: Optional[ExitStack] = g.pop("profile_stack", None)
+    if stack is not None:
+        stack.close()
+
+
+def _prune(directory: str, keep: int) -> None:
+    summaries = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in summaries[: max(len(summaries) - keep, 0)]:
+        stem = entry.name[: -len(".json")]
+        for extension in ("json", "prof", "collapsed"):
+            try:
+                os.remove(os.path.join(directory, f"{stem}.{extension}"))
+            except FileNotFoundError:
+                pass
+
+
+def init_app(app: Flask) -> None:
+    """Register the profiling hooks and ``GET /admin/profiles/<id>``."""
+    if not app.config.get("PROFILE_DIR"):
+        app.config["PROFILE_DIR"] = os.path.join(tempfile.gettempdir(), "customer-voice-profiles")
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+
+    @app.get("/admin/profiles/<uuid:profile_id>")
+    @require_auth(admin=True)
+    def get_profile(profile_id: uuid.UUID) -> Response:
+        """Download a stored request profile."""
+        output = request.args.get("format", "json")
+        if output not in PROFILE_FORMATS:
+            raise BadRequest(description=f"format must be one of: {', '.join(PROFILE_FORMATS)}.")
+        extension, content_type = PROFILE_FORMATS[output]
+        path = _profile_path(profile_id, extension)
+        if not os.path.exists(path):
+            raise NotFound(description="Profile not found.")
+
+        if output == "text":
+            buffer = io.StringIO()
+            pstats.Stats(path, stream=buffer).sort_stats("cumulative").print_stats(40)
+            return Response(buffer.getvalue(), content_type=content_type)
+        if output == "json":
+            with open(path, encoding="utf-8") as handle:
+                return jsonify(json.load(handle))
+        with open(path, "rb") as handle:
+            return Response(handle.read(), content_type=content_type)
@@ -0,0 +1,134 @@
+"""Per-request database instrumentation: statement count, DB time and N+1 hints.
+
+Engine-wide cursor events add every executed statement to the collectors
+active in the current context. ``init_app`` opens one collector per Flask
+request, reports it in a ``Server-Timing`` header and logs a warning when the
+same statement shape runs many times in one request, which is the usual sign
+of a per-row (N+1) query. Tests open their own collector with ``capture``
+(see the ``query_budget`` fixture in ``backend/tests/conftest.py``).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from flask import Flask, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_collectors: contextvars.ContextVar[Tuple["QueryStats", ...]] = contextvars.ContextVar(
+    "query_stats_collectors", default=()
+)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s)(?:\s*,\s*(?:\?|%\(\w+\)s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals and placeholder lists collapsed."""
+    shape = _LITERALS.sub("?", statement)
+    shape = _IN_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    # Raw statements are only kept when asked for (tests); requests keep counts.
+    keep_statements: bool = False
+    statements: List[str] = field(default_factory=list)
+    durations: List[float] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+        if self.keep_statements:
+            self.statements.append(statement)
+            self.durations.append(elapsed)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.fingerprints.most_common() if count >= threshold]
+
+
+@contextmanager
+def capture() -> Iterator[QueryStats]:
+    """Collect statements executed in this context (nested collectors all see them)."""
+    stats = QueryStats(keep_statements=True)
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _collectors.get():
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    collectors = _collectors.get()
+    started = conn.info.get("query_stats_started")
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for stats in collectors:
+        stats.record(statement, elapsed)
+
+
+def init_app(app: Flask) -> None:
+    """Measure every request and expose the totals as ``Server-Timing``."""
+    threshold = app.config.get("QUERY_REPEAT_THRESHOLD", 5)
+
+    @app.before_request
+    def _start_query_stats() -> None:
+        g.query_stats = QueryStats()
+        g.query_stats_started = time.perf_counter()
+        g.query_stats_token = _collectors.set(_collectors.get() + (g.query_stats,))
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.get("query_stats")
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - g.query_stats_started) * 1000
+        db_ms = stats.duration * 1000
+        response.headers.add(
+            "Server-Timing", f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+        )
+        response.headers.setdefault("Timing-Allow-Origin", app.config.get("ALLOWED_ORIGIN", "*"))
+        logger.debug(
+            "%s %s: %d queries, %.1f ms in database, %.1f ms total",
+            request.method,
+            request.path,
+            stats.count,
+            db_ms,
+            total_ms,
+        )
+        for shape, count in stats.repeated(threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: statement ran %d times: %.200s", request.method, request.path, count, shape
+            )
+        return response
+
+    @app.teardown_request
+    def _stop_query_stats(exception=None) -> None:
+        token = g.pop("query_stats_token", None)
+        if token is not None:
+            _collectors.reset(token)
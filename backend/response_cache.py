@@ -0,0 +1,194 @@
+"""Host-local response cache shared by every worker process.
+
+Rendered responses (currently ``/insights``) are stored in a small SQLite
+file so all gunicorn workers on a host share hits, and a repeat dashboard
+load is answered without touching the application database. Each entry
+records the data generation it was rendered at; writers bump the generation
+of their database on commit (see ``mark_data_changed``), which invalidates
+every entry at once. A TTL bounds staleness for writes made on other hosts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Mapping, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "customer-voice-response-cache.sqlite3")
+PENDING_KEY = "response_cache_data_changed"
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS generations (scope TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL,
+        etag TEXT NOT NULL,
+        body BLOB NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries (created_at)",
+)
+
+
+@dataclass
+class CachedResponse:
+    generation: int
+    etag: str
+    body: bytes
+    created_at: float
+
+
+class ResponseCache:
+    """Generation-invalidated response store backed by a local SQLite file.
+
+    Every operation degrades to a cache miss (and a logged warning) if the
+    file cannot be used, so the cache can never fail a request.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self.configure()
+
+    def configure(
+        self,
+        *,
+        enabled: bool = True,
+        path: Optional[str] = None,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 500,
+    ) -> None:
+        self.enabled = enabled
+        self.path = path or DEFAULT_PATH
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._local = threading.local()
+
+    @staticmethod
+    def scope_for(database_url: Any) -> str:
+        """Namespace for one application database (credentials are hashed away)."""
+        return hashlib.sha256(str(database_url).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def key_for(scope: str, name: str, params: Mapping[str, Any]) -> str:
+        normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{scope}\x00{name}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def generation(self, scope: str) -> int:
+        if not self.enabled:
+            return 0
+        row = self._execute("SELECT value FROM generations WHERE scope = ?", (scope,), fetch=True)
+        return int(row[0]) if row else 0
+
+    def bump_generation(self, scope: str) -> None:
+        if not self.enabled:
+            return
+        self._execute(
+            "INSERT INTO generations (scope, value) VALUES (?, 1) "
+            "ON CONFLICT(scope) DO UPDATE SET value = value + 1",
+            (scope,),
+        )
+
+    def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        """Return the entry for ``key`` if it was rendered at ``generation`` and is within the TTL."""
+        if not self.enabled:
+            return None
+        row = self._execute(
+            "SELECT generation, etag, body, created_at FROM entries WHERE key = ?", (key,), fetch=True
+        )
+        if not row:
+            return None
+        entry = CachedResponse(int(row[0]), row[1], bytes(row[2]), float(row[3]))
+        if entry.generation != generation or time.time() - entry.created_at > self.ttl_seconds:
+            return None
+        return entry
+
+    def put(self, key: str, generation: int, etag: str, body: bytes) -> None:
+        if not self.enabled:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO entries (key, generation, etag, body, created_at) VALUES (?, ?, ?, ?, ?)",
+            (key, generation, etag, sqlite3.Binary(body), time.time()),
+        )
+        self._execute(
+            "DELETE FROM entries WHERE key IN "
+            "(SELECT key FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM entries", ())
+        self._execute("DELETE FROM generations", ())
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections are per thread and per process (gunicorn forks after import).
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid() or getattr(local, "path", None) != self.path:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            local.connection, local.pid, local.path = connection, os.getpid(), self.path
+        return local.connection
+
+    def _execute(self, sql: str, params: tuple, fetch: bool = False):
+        try:
+            cursor = self._connection().execute(sql, params)
+            return cursor.fetchone() if fetch else None
+        except sqlite3.Error:
+            logger.warning("Response cache unavailable at %s", self.path, exc_info=True)
+            self._local = threading.local()
+            return None
+
+
+response_cache = ResponseCache()
+
+# Callbacks run after a commit that changed review data: ``fn(database_url, inserts_only)``.
+_data_change_listeners: List[Callable[[Any, bool], None]] = []
+
+
+def mark_data_changed(session: Session, *, inserts_only: bool = True) -> None:
+    """Invalidate cached responses for this session's database once it commits.
+
+    Pass ``inserts_only=False`` when existing reviews were updated or deleted
+    so listeners that only follow appends know to resynchronise.
+    """
+    session.info[PENDING_KEY] = session.info.get(PENDING_KEY, True) and inserts_only
+
+
+def add_data_change_listener(listener: Callable[[Any, bool], None]) -> None:
+    if listener not in _data_change_listeners:
+        _data_change_listeners.append(listener)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    inserts_only = session.info.pop(PENDING_KEY, None)
+    if inserts_only is None:
+        return
+    url = session.get_bind().url
+    response_cache.bump_generation(ResponseCache.scope_for(url))
+    for listener in _data_change_listeners:
+        try:
+            listener(url, inserts_only)
+        except Exception:  # noqa: BLE001 - listeners must not break the committing request
+            logger.warning("Data change listener failed", exc_info=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,679 @@
+"""Daily rollups of reviews and topic links for insights and digests.
+
+``review_daily_rollups`` holds review counts and sentiment score sums per UTC
+day x source x competitor x sentiment; ``topic_daily_rollups`` holds topic link
+counts and confidence sums per day x topic with the same review dimensions.
+Both are maintained in the writer's transaction: bulk ingest calls
+``record_inserted_reviews`` and ORM writes are picked up by an ``after_flush``
+hook. ``rebuild_rollups`` recomputes them from the raw tables and marks them
+ready; until then readers fall back to raw scans.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, cast, delete, event, func, insert, literal, or_, select, text
+from sqlalchemy import Date as SQLDate
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.orm.util import identity_key
+
+from . import models
+from .models import AppState, Review, ReviewDailyRollup, ReviewTopic, TopicDailyRollup
+from .response_cache import mark_data_changed
+
+logger = logging.getLogger(__name__)
+
+# Stored in ``competitor_key`` for reviews of our own product (competitor_id IS NULL).
+NO_COMPETITOR = uuid.UUID(int=0)
+# Passed as ``competitor`` to include reviews of every competitor and our own.
+ANY_COMPETITOR = object()
+
+READY_STATE_KEY = "rollups_ready"
+READY_PENDING_KEY = "rollups_ready_pending"
+# How long a "not ready" answer is trusted before the flag is re-read.
+READY_RECHECK_SECONDS = 60.0
+
+REVIEW_DIMENSIONS = ("source_id", "competitor_id", "sentiment_label", "published_at")
+
+ReviewKey = Tuple[date, uuid.UUID, uuid.UUID, str]
+TopicKey = Tuple[date, str, uuid.UUID, uuid.UUID, str]
+
+
+class RollupDelta:
+    """Signed increments for both rollup tables, applied in one upsert per table."""
+
+    def __init__(self) -> None:
+        self.reviews: Dict[ReviewKey, List[Decimal]] = defaultdict(lambda: [Decimal(0), Decimal(0)])
+        self.topics: Dict[TopicKey, List[Decimal]] = defaultdict(lambda: [Decimal(0), Decimal(0)])
+
+    def __bool__(self) -> bool:
+        return bool(self.reviews or self.topics)
+
+    def add_review(self, dims: Dict[str, Any], sign: int = 1) -> None:
+        entry = self.reviews[_review_key(dims)]
+        entry[0] += sign
+        entry[1] += sign * _decimal(dims["sentiment_score"])
+
+    def add_topic(self, dims: Dict[str, Any], topic_label: str, confidence: Any, sign: int = 1) -> None:
+        day, source_id, competitor_key, sentiment_label = _review_key(dims)
+        entry = self.topics[(day, topic_label, source_id, competitor_key, sentiment_label)]
+        entry[0] += sign
+        entry[1] += sign * _decimal(confidence)
+
+    def apply(self, connection) -> None:
+        review_rows = [
+            {
+                "day": key[0],
+                "source_id": key[1],
+                "competitor_key": key[2],
+                "sentiment_label": key[3],
+                "review_count": int(count),
+                "score_sum": total,
+            }
+            for key, (count, total) in self.reviews.items()
+            if count or total
+        ]
+        topic_rows = [
+            {
+                "day": key[0],
+                "topic_label": key[1],
+                "source_id": key[2],
+                "competitor_key": key[3],
+                "sentiment_label": key[4],
+                "review_count": int(count),
+                "confidence_sum": total,
+            }
+            for key, (count, total) in self.topics.items()
+            if count or total
+        ]
+        _upsert_increments(connection, ReviewDailyRollup.__table__, review_rows, ("review_count", "score_sum"))
+        _upsert_increments(
+            connection, TopicDailyRollup.__table__, topic_rows, ("review_count", "confidence_sum")
+        )
+
+
+def record_inserted_reviews(
+    session: Session, review_rows: Iterable[Dict[str, Any]], topic_rows: Iterable[Dict[str, Any]]
+) -> None:
+    """Add freshly inserted ``reviews``/``review_topics`` column dicts to the rollups."""
+    delta = RollupDelta()
+    dims_by_review: Dict[uuid.UUID, Dict[str, Any]] = {}
+    for row in review_rows:
+        delta.add_review(row)
+        dims_by_review[row["id"]] = row
+    for row in topic_rows:
+        dims = dims_by_review.get(row["review_id"])
+        if dims is not None:
+            delta.add_topic(dims, row["topic_label"], row["topic_confidence"])
+    if delta:
+        delta.apply(session.connection())
+        mark_data_changed(session)
+
+
+def reassign_competitor(session: Session, competitor_id: uuid.UUID) -> None:
+    """Fold a deleted competitor's rollup rows into our own (``competitor_id`` becomes NULL)."""
+    connection = session.connection()
+    for model, measures in (
+        (ReviewDailyRollup, ("review_count", "score_sum")),
+        (TopicDailyRollup, ("review_count", "confidence_sum")),
+    ):
+        table = model.__table__
+        rows = [dict(row._mapping) for row in connection.execute(select(table).where(table.c.competitor_key == competitor_id))]
+        if not rows:
+            continue
+        connection.execute(delete(table).where(table.c.competitor_key == competitor_id))
+        for row in rows:
+            row["competitor_key"] = NO_COMPETITOR
+        _upsert_increments(connection, table, rows, measures)
+    mark_data_changed(session, inserts_only=False)
+
+
+def rebuild_rollups(session: Session, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+    """Recompute rollups from raw rows for ``[start, end]`` (inclusive days, all when omitted).
+
+    Runs in the caller's transaction. A full rebuild (no ``start``/``end``)
+    marks the rollups ready; a partial one only repairs its days. On
+    PostgreSQL, concurrent review writers are blocked until commit so no
+    increment is lost between the delete and the re-aggregation.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        session.execute(text("LOCK TABLE reviews, review_topics IN SHARE MODE"))
+
+    day = review_day_expression(dialect)
+    review_filters = []
+    rollup_filters: Dict[str, List[Any]] = {"review": [], "topic": []}
+    if start:
+        review_filters.append(Review.published_at >= _day_start(start))
+        rollup_filters["review"].append(ReviewDailyRollup.day >= start)
+        rollup_filters["topic"].append(TopicDailyRollup.day >= start)
+    if end:
+        review_filters.append(Review.published_at < _day_start(end + timedelta(days=1)))
+        rollup_filters["review"].append(ReviewDailyRollup.day <= end)
+        rollup_filters["topic"].append(TopicDailyRollup.day <= end)
+
+    session.execute(delete(ReviewDailyRollup).where(*rollup_filters["review"]))
+    session.execute(delete(TopicDailyRollup).where(*rollup_filters["topic"]))
+
+    competitor_key = func.coalesce(Review.competitor_id, literal(NO_COMPETITOR, type_=models.GUID()))
+    review_select = (
+        select(
+            day,
+            Review.source_id,
+            competitor_key,
+            Review.sentiment_label,
+            func.count(Review.id),
+            func.coalesce(func.sum(Review.sentiment_score), 0),
+        )
+        .where(*review_filters)
+        .group_by(day, Review.source_id, competitor_key, Review.sentiment_label)
+    )
+    review_result = session.execute(
+        insert(ReviewDailyRollup).from_select(
+            ["day", "source_id", "competitor_key", "sentiment_label", "review_count", "score_sum"],
+            review_select,
+        )
+    )
+    topic_select = (
+        select(
+            day,
+            ReviewTopic.topic_label,
+            Review.source_id,
+            competitor_key,
+            Review.sentiment_label,
+            func.count(ReviewTopic.review_id),
+            func.coalesce(func.sum(ReviewTopic.topic_confidence), 0),
+        )
+        .join(Review, Review.id == ReviewTopic.review_id)
+        .where(*review_filters)
+        .group_by(day, ReviewTopic.topic_label, Review.source_id, competitor_key, Review.sentiment_label)
+    )
+    topic_result = session.execute(
+        insert(TopicDailyRollup).from_select(
+            ["day", "topic_label", "source_id", "competitor_key", "sentiment_label", "review_count", "confidence_sum"],
+            topic_select,
+        )
+    )
+    if start is None and end is None:
+        mark_ready(session)
+    return {"review_rows": review_result.rowcount or 0, "topic_rows": topic_result.rowcount or 0}
+
+
+def review_day_expression(dialect: str):
+    """SQL expression for a review's UTC publication day."""
+    if dialect == "postgresql":
+        return cast(func.timezone("UTC", Review.published_at), SQLDate)
+    return func.date(Review.published_at)
+
+
+# --- Readiness -------------------------------------------------------------- #
+
+
+class _ReadyState:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ready: Dict[str, bool] = {}
+        self._checked_at: Dict[str, float] = {}
+
+    def get(self, session: Session) -> bool:
+        url = str(session.get_bind().url)
+        with self._lock:
+            if self._ready.get(url) or time.monotonic() - self._checked_at.get(url, -1e9) < READY_RECHECK_SECONDS:
+                return self._ready.get(url, False)
+        try:
+            ready = session.get(AppState, READY_STATE_KEY) is not None
+        except SQLAlchemyError:
+            logger.warning("Could not read rollup state; using raw aggregation.", exc_info=True)
+            ready = False
+        self.set(url, ready)
+        return ready
+
+    def set(self, url: str, ready: bool) -> None:
+        with self._lock:
+            self._ready[url] = ready
+            self._checked_at[url] = time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ready.clear()
+            self._checked_at.clear()
+
+
+ready_state = _ReadyState()
+
+
+def rollups_ready(session: Session) -> bool:
+    """Whether the rollups are known to be complete for this database."""
+    return ready_state.get(session)
+
+
+def mark_ready(session: Session) -> None:
+    """Record the rollups as complete; this process trusts the flag once the session commits."""
+    state = session.get(AppState, READY_STATE_KEY)
+    value = {"rebuilt_at": datetime.now(timezone.utc).isoformat()}
+    if state is None:
+        session.add(AppState(key=READY_STATE_KEY, value=value))
+    else:
+        state.value = value
+    session.flush()
+    session.info[READY_PENDING_KEY] = str(session.get_bind().url)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_ready(session: Session) -> None:
+    url = session.info.pop(READY_PENDING_KEY, None)
+    if url is not None:
+        ready_state.set(url, True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_ready(session: Session, previous_transaction) -> None:
+    session.info.pop(READY_PENDING_KEY, None)
+
+
+def initialize(session: Optional[Session] = None) -> None:
+    """Mark rollups ready on an empty database; log a hint when a rebuild is due."""
+    owns_session = session is None
+    session = session or models.get_session()
+    try:
+        if session.get(AppState, READY_STATE_KEY) is not None:
+            ready_state.set(str(session.get_bind().url), True)
+            return
+        if session.execute(select(Review.id).limit(1)).first() is None:
+            mark_ready(session)
+            session.commit()
+        else:
+            logger.warning(
+                "Daily rollups are not built; insights use raw scans until "
+                "`python -m backend.scripts.rebuild_rollups` runs."
+            )
+    except SQLAlchemyError:
+        session.rollback()
+        logger.warning("Skipping rollup initialisation; database unavailable.", exc_info=True)
+    finally:
+        if owns_session:
+            session.close()
+
+
+# --- Reading ---------------------------------------------------------------- #
+
+
+def rollup_filters(
+    model,
+    *,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+    source_id: Optional[uuid.UUID] = None,
+    sentiment: Optional[str] = None,
+    competitor: Any = ANY_COMPETITOR,
+) -> List[Any]:
+    """WHERE conditions on a rollup model mirroring the raw review filters."""
+    filters = [model.review_count > 0]
+    if start_day:
+        filters.append(model.day >= start_day)
+    if end_day:
+        filters.append(model.day <= end_day)
+    if source_id:
+        filters.append(model.source_id == source_id)
+    if sentiment:
+        filters.append(model.sentiment_label == sentiment)
+    if competitor is not ANY_COMPETITOR:
+        filters.append(model.competitor_key == (competitor or NO_COMPETITOR))
+    return filters
+
+
+@dataclass
+class WindowPlan:
+    """How to aggregate a datetime window: whole days from rollups, partial days raw."""
+
+    start: datetime
+    end: datetime
+    days: Optional[Tuple[date, date]]
+    raw_condition: Optional[Any]
+
+
+def plan_window(session: Session, start: datetime, end: datetime) -> WindowPlan:
+    """Split ``[start, end]`` (inclusive) into full UTC days and raw edge ranges."""
+    start = _as_utc(start)
+    end = _as_utc(end)
+    whole = and_(Review.published_at >= start, Review.published_at <= end)
+    if not rollups_ready(session):
+        return WindowPlan(start, end, None, whole)
+
+    first_day = start.date() if start == _day_start(start.date()) else start.date() + timedelta(days=1)
+    last_day = end.date() - timedelta(days=1)
+    if first_day > last_day:
+        return WindowPlan(start, end, None, whole)
+
+    edges = []
+    if start < _day_start(first_day):
+        edges.append(and_(Review.published_at >= start, Review.published_at < _day_start(first_day)))
+    tail_start = _day_start(last_day + timedelta(days=1))
+    if tail_start <= end:
+        edges.append(and_(Review.published_at >= tail_start, Review.published_at <= end))
+    return WindowPlan(start, end, (first_day, last_day), or_(*edges) if edges else None)
+
+
+def sentiment_counts(session: Session, plan: WindowPlan, competitor: Any = ANY_COMPETITOR) -> Dict[str, List[float]]:
+    """``{sentiment_label: [review_count, score_sum]}`` over the window."""
+    totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+    if plan.raw_condition is not None:
+        stmt = (
+            select(Review.sentiment_label, func.count(Review.id), func.sum(Review.sentiment_score))
+            .where(plan.raw_condition, *_raw_competitor_filter(competitor))
+            .group_by(Review.sentiment_label)
+        )
+        _accumulate(totals, session.execute(stmt))
+    if plan.days:
+        stmt = (
+            select(
+                ReviewDailyRollup.sentiment_label,
+                func.sum(ReviewDailyRollup.review_count),
+                func.sum(ReviewDailyRollup.score_sum),
+            )
+            .where(*rollup_filters(ReviewDailyRollup, start_day=plan.days[0], end_day=plan.days[1], competitor=competitor))
+            .group_by(ReviewDailyRollup.sentiment_label)
+        )
+        _accumulate(totals, session.execute(stmt))
+    return dict(totals)
+
+
+def sentiment_counts_by_competitor(session: Session, plan: WindowPlan) -> Dict[uuid.UUID, Dict[str, List[float]]]:
+    """``{competitor_id: {sentiment_label: [review_count, score_sum]}}`` for every competitor with reviews."""
+    totals: Dict[uuid.UUID, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+    if plan.raw_condition is not None:
+        stmt = (
+            select(
+                Review.competitor_id,
+                Review.sentiment_label,
+                func.count(Review.id),
+                func.sum(Review.sentiment_score),
+            )
+            .where(plan.raw_condition, Review.competitor_id.is_not(None))
+            .group_by(Review.competitor_id, Review.sentiment_label)
+        )
+        for competitor_id, label, count, total in session.execute(stmt):
+            _accumulate(totals[competitor_id], [(label, count, total)])
+    if plan.days:
+        stmt = (
+            select(
+                ReviewDailyRollup.competitor_key,
+                ReviewDailyRollup.sentiment_label,
+                func.sum(ReviewDailyRollup.review_count),
+                func.sum(ReviewDailyRollup.score_sum),
+            )
+            .where(
+                *rollup_filters(ReviewDailyRollup, start_day=plan.days[0], end_day=plan.days[1]),
+                ReviewDailyRollup.competitor_key != NO_COMPETITOR,
+            )
+            .group_by(ReviewDailyRollup.competitor_key, ReviewDailyRollup.sentiment_label)
+        )
+        for competitor_id, label, count, total in session.execute(stmt):
+            _accumulate(totals[competitor_id], [(label, count, total)])
+    return {competitor_id: dict(counts) for competitor_id, counts in totals.items()}
+
+
+def topic_counts(session: Session, plan: WindowPlan, competitor: Any = ANY_COMPETITOR) -> Dict[str, int]:
+    """``{topic_label: review_count}`` over the window."""
+    totals: Dict[str, int] = defaultdict(int)
+    if plan.raw_condition is not None:
+        stmt = (
+            select(ReviewTopic.topic_label, func.count(ReviewTopic.review_id))
+            .join(Review, Review.id == ReviewTopic.review_id)
+            .where(plan.raw_condition, *_raw_competitor_filter(competitor))
+            .group_by(ReviewTopic.topic_label)
+        )
+        for label, count in session.execute(stmt):
+            totals[label] += int(count or 0)
+    if plan.days:
+        stmt = (
+            select(TopicDailyRollup.topic_label, func.sum(TopicDailyRollup.review_count))
+            .where(*rollup_filters(TopicDailyRollup, start_day=plan.days[0], end_day=plan.days[1], competitor=competitor))
+            .group_by(TopicDailyRollup.topic_label)
+        )
+        for label, count in session.execute(stmt):
+            totals[label] += int(count or 0)
+    return dict(totals)
+
+
+def window_totals(session: Session, plan: WindowPlan) -> Dict[str, float]:
+    """Review count, score sum, topic link count and confidence sum over the window, all competitors.
+
+    Whole days come from the rollups and only the edge ranges touch raw rows,
+    so this stays cheap enough to run as a change check before every digest.
+    """
+    totals = {"reviews": 0, "score_sum": 0.0, "topic_links": 0, "topic_confidence_sum": 0.0}
+    if plan.raw_condition is not None:
+        count, score = session.execute(
+            select(func.count(Review.id), func.sum(Review.sentiment_score)).where(plan.raw_condition)
+        ).one()
+        links, confidence = session.execute(
+            select(func.count(ReviewTopic.review_id), func.sum(ReviewTopic.topic_confidence))
+            .join(Review, Review.id == ReviewTopic.review_id)
+            .where(plan.raw_condition)
+        ).one()
+        _add_totals(totals, count, score, links, confidence)
+    if plan.days:
+        count, score = session.execute(
+            select(func.sum(ReviewDailyRollup.review_count), func.sum(ReviewDailyRollup.score_sum)).where(
+                *rollup_filters(ReviewDailyRollup, start_day=plan.days[0], end_day=plan.days[1])
+            )
+        ).one()
+        links, confidence = session.execute(
+            select(func.sum(TopicDailyRollup.review_count), func.sum(TopicDailyRollup.confidence_sum)).where(
+                *rollup_filters(TopicDailyRollup, start_day=plan.days[0], end_day=plan.days[1])
+            )
+        ).one()
+        _add_totals(totals, count, score, links, confidence)
+    return totals
+
+
+def _add_totals(totals: Dict[str, float], count: Any, score: Any, links: Any, confidence: Any) -> None:
+    totals["reviews"] += int(count or 0)
+    totals["score_sum"] += float(score or 0)
+    totals["topic_links"] += int(links or 0)
+    totals["topic_confidence_sum"] += float(confidence or 0)
+
+
+def source_ids(session: Session, plan: WindowPlan, competitor: Any = ANY_COMPETITOR) -> Set[uuid.UUID]:
+    """Distinct sources with reviews in the window."""
+    found: Set[uuid.UUID] = set()
+    if plan.raw_condition is not None:
+        stmt = select(Review.source_id).where(plan.raw_condition, *_raw_competitor_filter(competitor)).distinct()
+        found.update(session.execute(stmt).scalars())
+    if plan.days:
+        stmt = (
+            select(ReviewDailyRollup.source_id)
+            .where(*rollup_filters(ReviewDailyRollup, start_day=plan.days[0], end_day=plan.days[1], competitor=competitor))
+            .distinct()
+        )
+        found.update(session.execute(stmt).scalars())
+    return found
+
+
+def _raw_competitor_filter(competitor: Any) -> List[Any]:
+    if competitor is ANY_COMPETITOR:
+        return []
+    if competitor is None:
+        return [Review.competitor_id.is_(None)]
+    return [Review.competitor_id == competitor]
+
+
+def _accumulate(totals: Dict[str, List[float]], rows) -> None:
+    for label, count, total in rows:
+        totals[label][0] += int(count or 0)
+        totals[label][1] += float(total or 0)
+
+
+# --- ORM maintenance -------------------------------------------------------- #
+
+
+@event.listens_for(Session, "after_flush")
+def _track_orm_changes(session: Session, flush_context) -> None:
+    """Keep rollups in step with reviews written through the ORM."""
+    reviews_new = [obj for obj in session.new if isinstance(obj, Review)]
+    reviews_deleted = [obj for obj in session.deleted if isinstance(obj, Review)]
+    reviews_changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Review) and any(get_history(obj, name).has_changes() for name in REVIEW_DIMENSIONS + ("sentiment_score",))
+    ]
+    topics_new = [obj for obj in session.new if isinstance(obj, ReviewTopic)]
+    topics_deleted = [obj for obj in session.deleted if isinstance(obj, ReviewTopic)]
+    topics_changed = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, ReviewTopic)
+        and any(get_history(obj, name).has_changes() for name in ("topic_label", "topic_confidence"))
+    ]
+    if not (reviews_new or reviews_deleted or reviews_changed or topics_new or topics_deleted or topics_changed):
+        return
+
+    connection = session.connection()
+    delta = RollupDelta()
+    changed_ids = {obj.id for obj in reviews_changed}
+    for review in reviews_new:
+        delta.add_review(_current_dims(review))
+    for review in reviews_deleted:
+        delta.add_review(_previous_dims(review), sign=-1)
+    for review in reviews_changed:
+        old, new = _previous_dims(review), _current_dims(review)
+        delta.add_review(old, sign=-1)
+        delta.add_review(new)
+        # Topic links that existed before this flush move with the review.
+        fresh = {(link.review_id, link.topic_label) for link in topics_new}
+        links = connection.execute(
+            select(ReviewTopic.topic_label, ReviewTopic.topic_confidence).where(ReviewTopic.review_id == review.id)
+        )
+        for label, confidence in links:
+            if (review.id, label) in fresh:
+                continue
+            delta.add_topic(old, label, confidence, sign=-1)
+            delta.add_topic(new, label, confidence)
+
+    for link in topics_new:
+        dims = _review_dims(session, connection, link.review_id, previous=False)
+        if dims is not None:
+            delta.add_topic(dims, link.topic_label, link.topic_confidence)
+    for link in topics_deleted:
+        dims = _review_dims(session, connection, _previous(link, "review_id"), previous=True)
+        if dims is not None:
+            delta.add_topic(dims, _previous(link, "topic_label"), _previous(link, "topic_confidence"), sign=-1)
+    for link in topics_changed:
+        if link.review_id in changed_ids:
+            continue
+        dims = _review_dims(session, connection, link.review_id, previous=False)
+        if dims is not None:
+            delta.add_topic(dims, _previous(link, "topic_label"), _previous(link, "topic_confidence"), sign=-1)
+            delta.add_topic(dims, link.topic_label, link.topic_confidence)
+    if delta:
+        delta.apply(connection)
+        new_ids = {review.id for review in reviews_new}
+        inserts_only = not (reviews_deleted or reviews_changed or topics_deleted or topics_changed) and all(
+            link.review_id in new_ids for link in topics_new
+        )
+        mark_data_changed(session, inserts_only=inserts_only)
+
+
+def _review_dims(session: Session, connection, review_id, *, previous: bool) -> Optional[Dict[str, Any]]:
+    review = session.identity_map.get(identity_key(Review, review_id))
+    if review is not None:
+        return _previous_dims(review) if previous else _current_dims(review)
+    row = connection.execute(
+        select(
+            Review.source_id,
+            Review.competitor_id,
+            Review.sentiment_label,
+            Review.sentiment_score,
+            Review.published_at,
+        ).where(Review.id == review_id)
+    ).first()
+    return dict(row._mapping) if row is not None else None
+
+
+def _current_dims(review: Review) -> Dict[str, Any]:
+    return {name: getattr(review, name) for name in REVIEW_DIMENSIONS + ("sentiment_score",)}
+
+
+def _previous_dims(review: Review) -> Dict[str, Any]:
+    return {name: _previous(review, name) for name in REVIEW_DIMENSIONS + ("sentiment_score",)}
+
+
+def _previous(obj: Any, name: str) -> Any:
+    history = get_history(obj, name)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, name)
+
+
+# --- Helpers ---------------------------------------------------------------- #
+
+
+def _review_key(dims: Dict[str, Any]) -> ReviewKey:
+    return (
+        _utc_day(dims["published_at"]),
+        dims["source_id"],
+        dims.get("competitor_id") or NO_COMPETITOR,
+        dims["sentiment_label"],
+    )
+
+
+def _utc_day(value: datetime) -> date:
+    return _as_utc(value).date()
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min).replace(tzinfo=timezone.utc)
+
+
+def _decimal(value: Any) -> Decimal:
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _upsert_increments(connection, table, rows: List[Dict[str, Any]], measures: Tuple[str, ...]) -> None:
+    if not rows:
+        return
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key.columns],
+            set_={name: table.c[name] + stmt.excluded[name] for name in measures},
+        )
+        connection.execute(stmt, rows)
+        return
+
+    key_columns = [column.name for column in table.primary_key.columns]
+    for row in rows:
+        match = [table.c[name] == row[name] for name in key_columns]
+        updated = connection.execute(
+            table.update().where(*match).values({name: table.c[name] + row[name] for name in measures})
+        )
+        if not updated.rowcount:
+            connection.execute(insert(table), [row])
@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Annotated, List, Optional
 
 from flask import Blueprint, jsonify, request
 from pydantic import BaseModel, Field, ValidationError
 
-from ..analysis import analyze_sentiment, extract_topics
+from ..analysis_cache import analysis_cache
+from ..models import get_session
 
 bp = Blueprint("analyze", __name__)
 
 
+MAX_BATCH_TEXTS = 1000
+
+
 class AnalyzeRequestModel(BaseModel):
     text: str = Field(min_length=1)
     language: Optional[str] = None
 
 
+class AnalyzeBatchRequestModel(BaseModel):
+    texts: List[Annotated[str, Field(min_length=1)]] = Field(min_length=1, max_length=MAX_BATCH_TEXTS)
+    language: Optional[str] = None
+
+
 def _validation_error_response(error: ValidationError):
     details = [
         {"field": ".".join(map(str, err.get("loc", []))), "issue": err.get("msg")}
@@ -43,11 +52,31 @@ def analyze_text():
     except ValidationError as exc:
         return _validation_error_response(exc)
 
-    sentiment = analyze_sentiment(payload.text)
-    topics = extract_topics(payload.text)
-
+    (result,) = _analyze([payload.text])
     response = {
-        "sentiment": sentiment,
-        "topics": topics,
+        "sentiment": result["sentiment"],
+        "topics": result["topics"],
     }
     return jsonify(response), 200
+
+
+@bp.post("/analyze/batch")
+def analyze_texts():
+    """Analyse up to ``MAX_BATCH_TEXTS`` texts in one vectorized pass."""
+    payload_raw = request.get_json(silent=True) or {}
+    try:
+        payload = AnalyzeBatchRequestModel.model_validate(payload_raw)
+    except ValidationError as exc:
+        return _validation_error_response(exc)
+
+    return jsonify({"results": _analyze(payload.texts)}), 200
+
+
+def _analyze(texts: List[str]):
+    """Run texts through the analysis cache, using the persistent tier when enabled."""
+    if not analysis_cache.persist:
+        return analysis_cache.analyze(texts)
+    session = get_session()
+    results = analysis_cache.analyze(texts, session=session)
+    session.commit()
+    return results
@@ -8,11 +8,22 @@ from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from flask import Blueprint, jsonify, request
-from pydantic import BaseModel, Field, ValidationError
-from sqlalchemy import func, select
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from .. import rollups
+from ..aggregation import summarize_sentiment
+from ..columnar import columnar_store
+from ..pagination import (
+    COUNT_MODES,
+    after_cursor,
+    count_rows,
+    decode_cursor,
+    next_cursor,
+    pagination_payload,
+)
 from ..models import (
     Review,
     ReviewTopic,
@@ -23,6 +34,27 @@ from ..models import (
 bp = Blueprint("competitors", __name__, url_prefix="/competitors")
 
 
+class CompetitorListQueryModel(BaseModel):
+    page: int = Field(default=1, ge=1)
+    page_size: int = Field(default=25, ge=1, le=100)
+    cursor: Optional[str] = None
+    count_mode: str = "exact"
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, value):
+        if value:
+            decode_cursor(value)
+        return value or None
+
+    @field_validator("count_mode")
+    @classmethod
+    def validate_count_mode(cls, value):
+        if value not in COUNT_MODES:
+            raise ValueError(f"count_mode must be one of {', '.join(COUNT_MODES)}")
+        return value
+
+
 class CompetitorCreateModel(BaseModel):
     name: str = Field(min_length=1)
     url: Optional[str] = None
@@ -57,23 +89,34 @@ def _validation_error_response(error: ValidationError):
 @bp.get("")
 def list_competitors():
     """Return paginated competitors."""
-    page = max(int(request.args.get("page", 1)), 1)
-    page_size = max(min(int(request.args.get("page_size", 25)), 100), 1)
+    try:
+        payload = CompetitorListQueryModel.model_validate(request.args.to_dict(flat=True))
+    except ValidationError as exc:
+        return _validation_error_response(exc)
 
     session = get_session()
-    query = session.query(Competitor).order_by(Competitor.created_at.desc())
-    total_items = query.count()
-    offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
+    base_stmt = select(Competitor)
+    total_items, total_exact = count_rows(session, base_stmt, payload.count_mode)
+
+    page_stmt = base_stmt.order_by(Competitor.created_at.desc(), Competitor.id.desc())
+    if payload.cursor:
+        page_stmt = page_stmt.where(
+            after_cursor(Competitor.created_at, Competitor.id, decode_cursor(payload.cursor))
+        )
+    else:
+        page_stmt = page_stmt.offset((payload.page - 1) * payload.page_size)
+    rows = session.execute(page_stmt.limit(payload.page_size + 1)).scalars().all()
 
     response = {
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total_items": total_items,
-            "total_pages": (total_items + page_size - 1) // page_size if page_size else 0,
-        },
-        "items": [_serialize_competitor(item) for item in items],
+        "pagination": pagination_payload(
+            page=payload.page,
+            page_size=payload.page_size,
+            total_items=total_items,
+            exact=total_exact,
+            count_mode=payload.count_mode,
+            cursor=next_cursor(rows, payload.page_size, "created_at"),
+        ),
+        "items": [_serialize_competitor(item) for item in rows[: payload.page_size]],
     }
     return jsonify(response), 200
 
@@ -169,6 +212,14 @@ def delete_competitor(competitor_id: UUID):
     competitor = session.get(Competitor, competitor_id)
     if not competitor:
         return _not_found()
+    # Detach reviews in one statement (as ON DELETE SET NULL would) and move their rollups.
+    session.execute(
+        update(Review)
+        .where(Review.competitor_id == competitor_id)
+        .values(competitor_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    rollups.reassign_competitor(session, competitor_id)
     session.delete(competitor)
     session.commit()
     return ("", 204)
@@ -180,6 +231,7 @@ def compare_competitor(competitor_id: UUID):
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
     filters = []
+    start_dt = end_dt = None
 
     if start_date:
         start_dt = datetime.combine(date.fromisoformat(start_date), time.min).replace(
@@ -200,9 +252,19 @@ def compare_competitor(competitor_id: UUID):
     self_filters = list(filters) + [Review.competitor_id.is_(None)]
     competitor_filters = list(filters) + [Review.competitor_id == competitor_id]
 
-    self_sentiment = _compute_sentiment_summary(session, self_filters)
-    competitor_sentiment = _compute_sentiment_summary(session, competitor_filters)
-    top_topics = _compute_topic_comparison(session, self_filters, competitor_filters)
+    snapshot = columnar_store.snapshot(session)
+    if snapshot is not None:
+        own = snapshot.mask(start=start_dt, end=end_dt, competitor=None)
+        theirs = snapshot.mask(start=start_dt, end=end_dt, competitor=competitor_id)
+        self_sentiment = summarize_sentiment(snapshot.sentiment_counts(own))
+        competitor_sentiment = summarize_sentiment(snapshot.sentiment_counts(theirs))
+        top_topics = _compare_topic_shares(
+            _shares(snapshot.topic_counts(own)), _shares(snapshot.topic_counts(theirs))
+        )
+    else:
+        self_sentiment = _compute_sentiment_summary(session, self_filters)
+        competitor_sentiment = _compute_sentiment_summary(session, competitor_filters)
+        top_topics = _compute_topic_comparison(session, self_filters, competitor_filters)
 
     response = {
         "competitor": _serialize_competitor(competitor),
@@ -270,9 +332,14 @@ def _compute_sentiment_summary(session: Session, filters) -> Dict[str, Any]:
 def _compute_topic_comparison(
     session: Session, self_filters, competitor_filters, limit: int = 5
 ) -> List[Dict[str, Any]]:
-    self_topics = _topic_shares(session, self_filters)
-    competitor_topics = _topic_shares(session, competitor_filters)
+    return _compare_topic_shares(
+        _topic_shares(session, self_filters), _topic_shares(session, competitor_filters), limit
+    )
 
+
+def _compare_topic_shares(
+    self_topics: Dict[str, float], competitor_topics: Dict[str, float], limit: int = 5
+) -> List[Dict[str, Any]]:
     topic_labels = set(self_topics) | set(competitor_topics)
     comparisons = []
     for label in topic_labels:
@@ -288,7 +355,7 @@ def _compute_topic_comparison(
             }
         )
 
-    comparisons.sort(key=lambda item: abs(item["delta"]), reverse=True)
+    comparisons.sort(key=lambda item: (-abs(item["delta"]), item["topic_label"]))
     return comparisons[:limit]
 
 
@@ -303,7 +370,10 @@ def _topic_shares(session: Session, filters) -> Dict[str, float]:
         .group_by(ReviewTopic.topic_label)
     )
     rows = session.execute(stmt).all()
-    totals = {row.topic_label: row.count for row in rows}
+    return _shares({row.topic_label: row.count for row in rows})
+
+
+def _shares(totals: Dict[str, int]) -> Dict[str, float]:
     total_reviews = sum(totals.values())
     if not total_reviews:
         return {}
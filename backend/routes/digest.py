@@ -1,21 +1,54 @@
-"""Digest generation endpoint and shared helpers."""
+"""Digest generation and history endpoints and shared helpers."""
 
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 from typing import Any, Dict, List, Optional
+from uuid import UUID
 
-from flask import Blueprint, jsonify, request
-from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from flask import Blueprint, current_app, jsonify, request, url_for
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from .. import metrics, rollups
+from ..jobs import enqueue_job, get_job, register_job_handler, serialize_job
+from ..aggregation import summarize_sentiment
+from ..columnar import columnar_store
 from ..models import Competitor, Digest, Review, ReviewTopic, get_session
+from ..pagination import (
+    COUNT_MODES,
+    after_cursor,
+    count_rows,
+    decode_cursor,
+    next_cursor,
+    pagination_payload,
+)
 from ..security import require_digest_token
 
 bp = Blueprint("digest", __name__)
 
+DIGEST_JOB_KIND = "digest"
+# Bump when the stored digest payload changes shape or meaning, so older
+# snapshots are regenerated instead of reused.
+DIGEST_FORMAT_VERSION = 3
+
+
+def _parse_datetime(value):
+    if value is None:
+        return value
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        value_str = str(value)
+        if value_str.endswith("Z"):
+            value_str = value_str.replace("Z", "+00:00")
+        dt = datetime.fromisoformat(value_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
 
 class DigestRequestModel(BaseModel):
     timeframe_start: Optional[datetime] = None
@@ -25,18 +58,7 @@ class DigestRequestModel(BaseModel):
     @field_validator("timeframe_start", "timeframe_end", mode="before")
     @classmethod
     def parse_datetime(cls, value):
-        if value is None:
-            return value
-        if isinstance(value, datetime):
-            dt = value
-        else:
-            value_str = str(value)
-            if value_str.endswith("Z"):
-                value_str = value_str.replace("Z", "+00:00")
-            dt = datetime.fromisoformat(value_str)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.astimezone(timezone.utc)
+        return _parse_datetime(value)
 
     @model_validator(mode="after")
     def validate_range(cls, values):
@@ -47,6 +69,34 @@ class DigestRequestModel(BaseModel):
         return values
 
 
+class DigestListQueryModel(BaseModel):
+    page: int = Field(default=1, ge=1)
+    page_size: int = Field(default=25, ge=1, le=100)
+    cursor: Optional[str] = None
+    count_mode: str = "exact"
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @field_validator("start", "end", mode="before")
+    @classmethod
+    def parse_datetime(cls, value):
+        return _parse_datetime(value or None)
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, value):
+        if value:
+            decode_cursor(value)
+        return value or None
+
+    @field_validator("count_mode")
+    @classmethod
+    def validate_count_mode(cls, value):
+        if value not in COUNT_MODES:
+            raise ValueError(f"count_mode must be one of {', '.join(COUNT_MODES)}")
+        return value
+
+
 def _validation_error_response(error: ValidationError):
     details = [
         {"field": ".".join(map(str, err.get("loc", []))), "issue": err.get("msg")}
@@ -79,36 +129,288 @@ def run_digest():
     timeframe_end = payload.timeframe_end or now
     timeframe_start = payload.timeframe_start or (timeframe_end - timedelta(days=7))
 
+    if _wants_async():
+        return _enqueue_digest(timeframe_start, timeframe_end, payload.include_competitors)
+
     session = get_session()
-    digest_payload = assemble_digest(
+    digest_record = store_digest(
         session,
         timeframe_start=timeframe_start,
         timeframe_end=timeframe_end,
         include_competitors=payload.include_competitors,
     )
+    response = serialize_digest(digest_record)
+    session.commit()
+    return jsonify(response), 200
+
+
+@bp.get("/digest/jobs/<uuid:job_id>")
+def get_digest_job(job_id: UUID):
+    """Report the status of a background digest; ``result.digest_url`` points at the stored digest."""
+    require_digest_token(request.headers.get("Authorization"))
+    session = get_session()
+    job = get_job(session, job_id, kind=DIGEST_JOB_KIND)
+    if not job:
+        return (
+            jsonify({"error": "not_found", "message": "Digest job not found.", "details": []}),
+            404,
+        )
+    current_app.extensions["job_workers"].ensure_started()
+    return jsonify(serialize_job(job)), 200
+
+
+def _wants_async() -> bool:
+    """Async mode is the app default when DIGEST_ASYNC is set, or opted into per request."""
+    if "respond-async" in request.headers.get("Prefer", "").lower():
+        return True
+    flag = request.args.get("async")
+    if flag is not None:
+        return flag.lower() in {"1", "true", "yes"}
+    return bool(current_app.config.get("DIGEST_ASYNC"))
+
+
+def _enqueue_digest(timeframe_start: datetime, timeframe_end: datetime, include_competitors: bool):
+    session = get_session()
+    # The timeframe is resolved now so a queued "last 7 days" digest covers the requested week.
+    job_payload = {
+        "timeframe_start": timeframe_start.isoformat(),
+        "timeframe_end": timeframe_end.isoformat(),
+        "include_competitors": include_competitors,
+    }
+    try:
+        job = enqueue_job(session, DIGEST_JOB_KIND, job_payload)
+        session.commit()
+    except SQLAlchemyError as exc:  # pragma: no cover - DB-level guard
+        session.rollback()
+        return (
+            jsonify(
+                {
+                    "error": "database_error",
+                    "message": "Could not queue the digest.",
+                    "details": [{"issue": str(exc)}],
+                }
+            ),
+            500,
+        )
+
+    workers = current_app.extensions["job_workers"]
+    workers.ensure_started()
+    workers.notify()
+
+    status_url = url_for("digest.get_digest_job", job_id=job.id)
+    response = jsonify(
+        {
+            "job_id": str(job.id),
+            "status": job.status,
+            "status_url": status_url,
+            **job_payload,
+            "message": "Digest queued for generation.",
+        }
+    )
+    response.headers["Location"] = status_url
+    return response, 202
+
+
+def _run_digest_job(session: Session, payload_raw: Dict[str, Any]) -> Dict[str, Any]:
+    payload = DigestRequestModel.model_validate(payload_raw)
+    digest = store_digest(
+        session,
+        timeframe_start=payload.timeframe_start,
+        timeframe_end=payload.timeframe_end,
+        include_competitors=payload.include_competitors,
+    )
+    return {
+        "digest_id": str(digest.id),
+        "digest_url": f"/digests/{digest.id}",
+        "timeframe_start": payload.timeframe_start.isoformat(),
+        "timeframe_end": payload.timeframe_end.isoformat(),
+        "highlights": (digest.summary or {}).get("highlights", []),
+    }
+
+
+register_job_handler(DIGEST_JOB_KIND, _run_digest_job)
 
+
+@bp.get("/digests")
+def list_digests():
+    """Return stored digests, newest timeframe first, without regenerating them."""
+    try:
+        payload = DigestListQueryModel.model_validate(request.args.to_dict(flat=True))
+    except ValidationError as exc:
+        return _validation_error_response(exc)
+
+    session = get_session()
+    base_stmt = select(Digest)
+    if payload.start:
+        base_stmt = base_stmt.where(Digest.timeframe_start >= payload.start)
+    if payload.end:
+        base_stmt = base_stmt.where(Digest.timeframe_end <= payload.end)
+    total_items, total_exact = count_rows(session, base_stmt, payload.count_mode)
+
+    page_stmt = base_stmt.order_by(Digest.timeframe_start.desc(), Digest.id.desc())
+    if payload.cursor:
+        page_stmt = page_stmt.where(after_cursor(Digest.timeframe_start, Digest.id, decode_cursor(payload.cursor)))
+    else:
+        page_stmt = page_stmt.offset((payload.page - 1) * payload.page_size)
+    rows = session.execute(page_stmt.limit(payload.page_size + 1)).scalars().all()
+
+    response = {
+        "pagination": pagination_payload(
+            page=payload.page,
+            page_size=payload.page_size,
+            total_items=total_items,
+            exact=total_exact,
+            count_mode=payload.count_mode,
+            cursor=next_cursor(rows, payload.page_size, "timeframe_start"),
+        ),
+        "items": [serialize_digest(item, full=False) for item in rows[: payload.page_size]],
+    }
+    return jsonify(response), 200
+
+
+@bp.get("/digests/<uuid:digest_id>")
+def get_digest(digest_id: UUID):
+    """Return one stored digest exactly as it was generated."""
+    digest = get_session().get(Digest, digest_id)
+    if digest is None:
+        return (
+            jsonify({"error": "not_found", "message": "Digest not found.", "details": []}),
+            404,
+        )
+    return jsonify(serialize_digest(digest)), 200
+
+
+def serialize_digest(digest: Digest, *, full: bool = True) -> Dict[str, Any]:
+    summary = digest.summary or {}
+    payload: Dict[str, Any] = {
+        "digest_id": str(digest.id),
+        "timeframe_start": _as_utc(digest.timeframe_start).isoformat(),
+        "timeframe_end": _as_utc(digest.timeframe_end).isoformat(),
+        "generated_at": _as_utc(digest.generated_at).isoformat(),
+        "highlights": summary.get("highlights", []),
+        "key_metrics": summary.get("key_metrics", {}),
+    }
+    if full:
+        payload["sentiment_snapshot"] = digest.sentiment_snapshot
+        payload["topic_spotlight"] = (digest.topics_snapshot or {}).get("topic_spotlight", [])
+        payload["competitor_summary"] = (digest.competitor_snapshot or {}).get("items", [])
+    return payload
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def store_digest(
+    session: Session,
+    *,
+    timeframe_start: datetime,
+    timeframe_end: datetime,
+    include_competitors: bool = True,
+) -> Digest:
+    """Persist a digest for the timeframe, or return the stored one if its data is unchanged."""
+    fingerprint = data_fingerprint(session, timeframe_start=timeframe_start, timeframe_end=timeframe_end)
+    digest_record = _reusable_digest(
+        session,
+        timeframe_start=timeframe_start,
+        timeframe_end=timeframe_end,
+        include_competitors=include_competitors,
+        fingerprint=fingerprint,
+    )
+    if digest_record is not None:
+        return digest_record
+
+    digest_payload = assemble_digest(
+        session,
+        timeframe_start=timeframe_start,
+        timeframe_end=timeframe_end,
+        include_competitors=include_competitors,
+    )
     digest_record = Digest(
         timeframe_start=timeframe_start,
         timeframe_end=timeframe_end,
-        summary={"highlights": digest_payload["highlights"]},
+        # Set here rather than by the server default so snapshots of one window
+        # order correctly even where CURRENT_TIMESTAMP has second resolution.
+        generated_at=datetime.now(timezone.utc),
+        summary={
+            "highlights": digest_payload["highlights"],
+            "key_metrics": digest_payload["key_metrics"],
+            "data_fingerprint": fingerprint,
+        },
         sentiment_snapshot=digest_payload.get("sentiment_snapshot", {}),
         topics_snapshot={"topic_spotlight": digest_payload.get("topic_spotlight", [])},
         competitor_snapshot={"items": digest_payload.get("competitor_summary", [])}
-        if payload.include_competitors
+        if include_competitors
         else None,
     )
     session.add(digest_record)
     session.flush()
+    return digest_record
+
+
+def data_fingerprint(session: Session, *, timeframe_start: datetime, timeframe_end: datetime) -> Dict[str, Any]:
+    """Cheap summary of everything a digest for this window reads.
+
+    Covers review and topic-link totals for the window and the equally long
+    one before it (for trends), the competitor list and the digest format. The
+    totals come from the same source the digest is assembled from: the
+    columnar snapshot when enabled (no queries), otherwise whole days from
+    the daily rollups plus raw rows for the edges. A stored digest whose
+    fingerprint still matches is served as is instead of being regenerated.
+    Edits that leave sentiment scores and topic tags unchanged (e.g. a
+    reworded body) are not detected.
+    """
+    previous_start = timeframe_start - (timeframe_end - timeframe_start)
+    snapshot = columnar_store.snapshot(session)
+    if snapshot is not None:
+        selected = snapshot.mask(start=previous_start, end=timeframe_end)
+        sentiment = snapshot.sentiment_counts(selected).values()
+        topics = snapshot.topic_totals(selected).values()
+        totals = {
+            "reviews": sum(count for count, _ in sentiment),
+            "score_sum": sum(total for _, total in sentiment),
+            "topic_links": sum(count for count, _ in topics),
+            "topic_confidence_sum": sum(total for _, total in topics),
+        }
+    else:
+        totals = rollups.window_totals(session, rollups.plan_window(session, previous_start, timeframe_end))
+    competitor_count, competitors_updated = session.execute(
+        select(func.count(Competitor.id), func.max(Competitor.updated_at))
+    ).one()
+    return {
+        "format": DIGEST_FORMAT_VERSION,
+        "reviews": int(totals["reviews"]),
+        "score_sum": round(float(totals["score_sum"]), 2),
+        "topic_links": int(totals["topic_links"]),
+        "topic_confidence_sum": round(float(totals["topic_confidence_sum"]), 3),
+        "competitors": int(competitor_count or 0),
+        "competitors_updated_at": _as_utc(competitors_updated).isoformat() if competitors_updated else None,
+    }
 
-    digest_payload["digest_id"] = str(digest_record.id)
-    digest_payload["generated_at"] = digest_record.generated_at.isoformat()
-    digest_payload["timeframe_start"] = timeframe_start.isoformat()
-    digest_payload["timeframe_end"] = timeframe_end.isoformat()
 
-    session.commit()
-    return jsonify(digest_payload), 200
+def _reusable_digest(
+    session: Session,
+    *,
+    timeframe_start: datetime,
+    timeframe_end: datetime,
+    include_competitors: bool,
+    fingerprint: Dict[str, Any],
+) -> Optional[Digest]:
+    stmt = (
+        select(Digest)
+        .where(Digest.timeframe_start == timeframe_start, Digest.timeframe_end == timeframe_end)
+        .order_by(Digest.generated_at.desc(), Digest.id.desc())
+        .limit(1)
+    )
+    digest = session.execute(stmt).scalars().first()
+    if digest is None or (digest.competitor_snapshot is not None) != include_competitors:
+        return None
+    if (digest.summary or {}).get("data_fingerprint") != fingerprint:
+        return None
+    return digest
 
 
+@metrics.DIGEST_SECONDS.time()
 def assemble_digest(
     session: Session,
     *,
@@ -116,27 +418,71 @@ def assemble_digest(
     timeframe_end: datetime,
     include_competitors: bool = True,
 ) -> Dict[str, Any]:
-    """Assemble digest data reused by API route and CLI script."""
+    """Assemble digest data reused by API route and CLI script.
+
+    Counts come from the columnar cache when it is enabled. Otherwise whole
+    UTC days inside the window are read from the daily rollups (when built)
+    and partial days at either edge are aggregated from raw reviews. The
+    query count does not depend on the number of competitors or topics.
+
+    Trends compare against the equally long window ending just before
+    ``timeframe_start``, read from the same per-day aggregates.
+    """
     base_filters = [
         Review.published_at >= timeframe_start,
         Review.published_at <= timeframe_end,
         Review.competitor_id.is_(None),
     ]
-    sentiment_snapshot = _sentiment_summary(session, base_filters)
-    topic_spotlight = _topic_spotlight(session, base_filters, limit=3)
+    previous_start = timeframe_start - (timeframe_end - timeframe_start)
+    previous_end = timeframe_start - timedelta(microseconds=1)
+    snapshot = columnar_store.snapshot(session)
+    if snapshot is not None:
+        own = snapshot.mask(start=timeframe_start, end=timeframe_end, competitor=None)
+        topic_counts = snapshot.topic_counts(own)
+        unique_sources = len(snapshot.source_ids(own))
+
+        window = snapshot.mask(start=timeframe_start, end=timeframe_end)
+        own_sentiment = snapshot.sentiment_counts(own)
+        previous = snapshot.mask(start=previous_start, end=previous_end, competitor=None)
+        previous_topic_counts = snapshot.topic_counts(previous)
+        previous_sentiment = snapshot.sentiment_counts(previous)
+
+        def competitor_counts():
+            return snapshot.sentiment_counts_by_competitor(window)
+
+    else:
+        plan = rollups.plan_window(session, timeframe_start, timeframe_end)
+        topic_counts = rollups.topic_counts(session, plan, competitor=None)
+        unique_sources = len(rollups.source_ids(session, plan, competitor=None))
+
+        own_sentiment = rollups.sentiment_counts(session, plan, competitor=None)
+        previous_plan = rollups.plan_window(session, previous_start, previous_end)
+        previous_topic_counts = rollups.topic_counts(session, previous_plan, competitor=None)
+        previous_sentiment = rollups.sentiment_counts(session, previous_plan, competitor=None)
+
+        def competitor_counts():
+            return rollups.sentiment_counts_by_competitor(session, plan)
+
+    sentiment_snapshot = summarize_sentiment(own_sentiment)
+    previous_snapshot = summarize_sentiment(previous_sentiment)
+    topic_spotlight = _topic_spotlight(session, topic_counts, previous_topic_counts, base_filters, limit=3)
 
     total_reviews = sentiment_snapshot["review_count"]
-    unique_sources = session.execute(
-        select(func.count(func.distinct(Review.source_id))).filter(*base_filters)
-    ).scalar_one_or_none() or 0
+    reviews_change = _relative_change(total_reviews, previous_snapshot["review_count"])
 
     highlights = [
         f"Total reviews: {total_reviews} across {unique_sources} sources.",
         f"Positive/Neutral/Negative split: {sentiment_snapshot['positive']}/{sentiment_snapshot['neutral']}/{sentiment_snapshot['negative']}.",
+        f"Review volume {reviews_change:+.0%} vs the previous period ({previous_snapshot['review_count']} reviews)."
+        if reviews_change is not None
+        else "Review volume: no reviews in the previous period.",
     ]
     if topic_spotlight:
+        top_change = topic_spotlight[0]["change_vs_previous"]
         highlights.append(
-            f"Top topic: {topic_spotlight[0]['topic_label']} ({topic_spotlight[0]['change_vs_previous']} trend)."
+            f"Top topic: {topic_spotlight[0]['topic_label']} ({top_change:+.0%} vs previous period)."
+            if top_change is not None
+            else f"Top topic: {topic_spotlight[0]['topic_label']} (new this period)."
         )
 
     key_metrics = {
@@ -148,14 +494,20 @@ def assemble_digest(
         if total_reviews
         else 0.0,
         "unique_sources": unique_sources,
+        "previous_total_reviews": previous_snapshot["review_count"],
+        "total_reviews_change": reviews_change,
+        "average_sentiment_change": round(
+            sentiment_snapshot["average_score"] - previous_snapshot["average_score"], 2
+        )
+        if previous_snapshot["review_count"]
+        else None,
     }
 
     competitor_summary: List[Dict[str, Any]] = []
     if include_competitors:
         competitor_summary = _competitor_overview(
             session,
-            timeframe_start=timeframe_start,
-            timeframe_end=timeframe_end,
+            competitor_counts(),
             baseline_avg=sentiment_snapshot["average_score"],
         )
 
@@ -169,85 +521,64 @@ def assemble_digest(
     return digest_payload
 
 
-def _sentiment_summary(session: Session, filters) -> Dict[str, Any]:
-    stmt = (
-        select(
-            Review.sentiment_label,
-            func.count(Review.id).label("count"),
-            func.avg(Review.sentiment_score).label("avg_score"),
-        )
-        .filter(*filters)
-        .group_by(Review.sentiment_label)
-    )
-    rows = session.execute(stmt).all()
-    summary = {"positive": 0, "neutral": 0, "negative": 0, "average_score": 0.0, "review_count": 0}
-
-    score_total = 0.0
-    for row in rows:
-        count = row.count or 0
-        avg_score = float(row.avg_score) if isinstance(row.avg_score, (float, Decimal)) else 0.0
-        label = row.sentiment_label.lower()
-        if label in summary:
-            summary[label] = count
-        summary["review_count"] += count
-        score_total += avg_score * count
-
-    if summary["review_count"]:
-        summary["average_score"] = round(score_total / summary["review_count"], 2)
-
-    return summary
+def _relative_change(current: float, previous: float) -> Optional[float]:
+    """Fractional change from ``previous``; ``None`` when there is nothing to compare against."""
+    if not previous:
+        return None
+    return round((current - previous) / previous, 2)
 
 
 def _topic_spotlight(
-    session: Session, filters, limit: int = 3
+    session: Session,
+    counts: Dict[str, int],
+    previous_counts: Dict[str, int],
+    filters,
+    limit: int = 3,
+    quotes_per_topic: int = 2,
 ) -> List[Dict[str, Any]]:
-    stmt = (
-        select(
-            ReviewTopic.topic_label,
-            func.count(ReviewTopic.review_id).label("count"),
-        )
-        .join(Review, Review.id == ReviewTopic.review_id)
-        .filter(*filters)
-        .group_by(ReviewTopic.topic_label)
-        .order_by(func.count(ReviewTopic.review_id).desc())
-        .limit(limit)
+    """The ``limit`` busiest topics with their latest quotes, fetched in one windowed query."""
+    ranked = [label for label, _count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+    if not ranked:
+        return []
+    position = (
+        func.row_number()
+        .over(partition_by=ReviewTopic.topic_label, order_by=(Review.published_at.desc(), Review.id))
+        .label("position")
     )
-    rows = session.execute(stmt).all()
-    spotlight = []
-    for row in rows:
-        quotes_stmt = (
-            select(Review.body)
-            .join(ReviewTopic, ReviewTopic.review_id == Review.id)
-            .filter(ReviewTopic.topic_label == row.topic_label, *filters)
-            .limit(2)
-        )
-        quotes = [text[:140] for text in session.execute(quotes_stmt).scalars().all()]
-        spotlight.append(
-            {
-                "topic_label": row.topic_label,
-                "change_vs_previous": 0.0,  # TODO: compare against prior window
-                "sample_quotes": quotes,
-            }
-        )
-    return spotlight
+    quoted = (
+        select(ReviewTopic.topic_label, Review.body, position)
+        .join(Review, ReviewTopic.review_id == Review.id)
+        .where(ReviewTopic.topic_label.in_(ranked), *filters)
+        .subquery()
+    )
+    quotes_stmt = (
+        select(quoted.c.topic_label, quoted.c.body)
+        .where(quoted.c.position <= quotes_per_topic)
+        .order_by(quoted.c.topic_label, quoted.c.position)
+    )
+    quotes: Dict[str, List[str]] = {label: [] for label in ranked}
+    for topic_label, body in session.execute(quotes_stmt):
+        quotes[topic_label].append(body[:140])
+    return [
+        {
+            "topic_label": topic_label,
+            "change_vs_previous": _relative_change(counts[topic_label], previous_counts.get(topic_label, 0)),
+            "sample_quotes": quotes[topic_label],
+        }
+        for topic_label in ranked
+    ]
 
 
 def _competitor_overview(
     session: Session,
+    counts: Dict[UUID, Dict[str, List[float]]],
     *,
-    timeframe_start: datetime,
-    timeframe_end: datetime,
     baseline_avg: float,
 ) -> List[Dict[str, Any]]:
-    competitors = session.execute(select(Competitor)).scalars().all()
+    competitors = session.execute(select(Competitor.id, Competitor.name)).all()
     snapshot: List[Dict[str, Any]] = []
     for competitor in competitors:
-        filters = [
-            Review.published_at >= timeframe_start,
-            Review.published_at <= timeframe_end,
-            Review.competitor_id == competitor.id,
-        ]
-        sentiment = _sentiment_summary(session, filters)
+        sentiment = summarize_sentiment(counts.get(competitor.id, {}))
         delta = round(sentiment["average_score"] - baseline_avg, 2)
         highlight = (
             f"{sentiment['review_count']} reviews, average {sentiment['average_score']}"
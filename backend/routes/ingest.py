@@ -2,21 +2,26 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from decimal import Decimal
-from typing import Any, Dict, List, Optional
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
 from pydantic import BaseModel, Field, ValidationError, root_validator
-from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
-from ..analysis import analyze_sentiment, extract_topics
-from ..models import Review, ReviewTopic, Source, get_session, upsert_topic
+from ..ingest_engine import bulk_ingest_reviews, ensure_source
+from ..jobs import enqueue_job, get_job, register_job_handler, serialize_job
+from ..models import get_session
 
 bp = Blueprint("ingest", __name__)
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+INGEST_JOB_KIND = "ingest"
+MAX_CHUNK_SIZE = 5000
+MAX_NDJSON_LINE_BYTES = 1024 * 1024
+
 
 class SourceMetadataModel(BaseModel):
     external_id: Optional[str] = None
@@ -44,10 +49,13 @@ class ReviewIngestItemModel(BaseModel):
         return values
 
 
-class ReviewIngestRequestModel(BaseModel):
+class IngestSourceModel(BaseModel):
     source_id: UUID
     overwrite_source_metadata: bool = False
     source_metadata: Optional[SourceMetadataModel] = None
+
+
+class ReviewIngestRequestModel(IngestSourceModel):
     reviews: List[ReviewIngestItemModel]
 
 
@@ -71,77 +79,28 @@ def _validation_error_response(error: ValidationError):
 @bp.post("/ingest")
 def ingest_reviews():
     """Persist incoming reviews with dedupe guarantees."""
+    if request.mimetype == NDJSON_MIMETYPE:
+        return _ingest_ndjson_stream()
+
     payload_raw = request.get_json(silent=True) or {}
     try:
         payload = ReviewIngestRequestModel.model_validate(payload_raw)
     except ValidationError as exc:
         return _validation_error_response(exc)
 
+    if _wants_async():
+        return _enqueue_ingest(payload)
+
     session = get_session()
-    dedupe_count = 0
-    created_ids: List[str] = []
 
     try:
-        source = session.get(Source, payload.source_id)
-        if not source:
-            source = Source(
-                id=payload.source_id,
-                name=payload.source_metadata.name if payload.source_metadata and payload.source_metadata.name else "Unnamed Source",
-                platform=payload.source_metadata.platform if payload.source_metadata else None,
-                external_id=payload.source_metadata.external_id if payload.source_metadata else None,
-                url=payload.source_metadata.url if payload.source_metadata else None,
-            )
-            session.add(source)
-        elif payload.overwrite_source_metadata and payload.source_metadata:
-            source.name = payload.source_metadata.name or source.name
-            source.platform = payload.source_metadata.platform or source.platform
-            source.external_id = payload.source_metadata.external_id or source.external_id
-            source.url = payload.source_metadata.url or source.url
-
-        for review_item in payload.reviews:
-            exists_stmt = select(Review.id).where(
-                Review.source_id == payload.source_id,
-                Review.source_review_id == review_item.source_review_id,
-            )
-            exists = session.execute(exists_stmt).scalar_one_or_none()
-            if exists:
-                dedupe_count += 1
-                continue
-
-            published_at = review_item.published_at
-            if published_at.tzinfo is None:
-                published_at = published_at.replace(tzinfo=timezone.utc)
-
-            sentiment = analyze_sentiment(f"{review_item.title or ''}\n{review_item.body}")
-            topics = extract_topics(review_item.body)
-
-            review = Review(
-                source_id=payload.source_id,
-                source_review_id=review_item.source_review_id,
-                title=review_item.title,
-                body=review_item.body,
-                rating=review_item.rating,
-                language=review_item.language,
-                location=review_item.location,
-                sentiment_label=sentiment["label"],
-                sentiment_score=Decimal(str(sentiment["score"])),
-                published_at=published_at,
-            )
-            session.add(review)
-            session.flush()  # Acquire review.id
-
-            for topic_result in topics:
-                topic = upsert_topic(session, topic_result["topic_label"])
-                review_topic = ReviewTopic(
-                    review_id=review.id,
-                    topic_id=topic.id,
-                    topic_label=topic.topic_label,
-                    topic_confidence=Decimal(str(topic_result["topic_confidence"])),
-                )
-                session.add(review_topic)
-
-            created_ids.append(str(review.id))
-
+        ensure_source(
+            session,
+            payload.source_id,
+            payload.source_metadata,
+            overwrite=payload.overwrite_source_metadata,
+        )
+        result = bulk_ingest_reviews(session, payload.source_id, payload.reviews)
         session.commit()
     except SQLAlchemyError as exc:  # pragma: no cover - DB-level guard
         session.rollback()
@@ -157,9 +116,239 @@ def ingest_reviews():
         )
 
     response_body = {
-        "ingested_count": len(created_ids),
-        "duplicate_count": dedupe_count,
-        "review_ids": created_ids,
+        "ingested_count": result.ingested_count,
+        "duplicate_count": result.duplicate_count,
+        "review_ids": result.review_ids,
         "message": "Reviews accepted for processing.",
     }
     return jsonify(response_body), 202
+
+
+@bp.get("/ingest/jobs/<uuid:job_id>")
+def get_ingest_job(job_id: UUID):
+    """Report the status and outcome of an asynchronous ingest job."""
+    session = get_session()
+    job = get_job(session, job_id, kind=INGEST_JOB_KIND)
+    if not job:
+        return (
+            jsonify({"error": "not_found", "message": "Ingest job not found.", "details": []}),
+            404,
+        )
+    current_app.extensions["job_workers"].ensure_started()
+    return jsonify(serialize_job(job)), 200
+
+
+def _wants_async() -> bool:
+    """Async mode is the app default when INGEST_ASYNC is set, or opted into per request."""
+    if "respond-async" in request.headers.get("Prefer", "").lower():
+        return True
+    flag = request.args.get("async")
+    if flag is not None:
+        return flag.lower() in {"1", "true", "yes"}
+    return bool(current_app.config.get("INGEST_ASYNC"))
+
+
+def _enqueue_ingest(payload: ReviewIngestRequestModel):
+    session = get_session()
+    try:
+        job = enqueue_job(session, INGEST_JOB_KIND, payload.model_dump(mode="json"))
+        session.commit()
+    except SQLAlchemyError as exc:  # pragma: no cover - DB-level guard
+        session.rollback()
+        return (
+            jsonify(
+                {
+                    "error": "database_error",
+                    "message": "Could not queue reviews.",
+                    "details": [{"issue": str(exc)}],
+                }
+            ),
+            500,
+        )
+
+    workers = current_app.extensions["job_workers"]
+    workers.ensure_started()
+    workers.notify()
+
+    status_url = url_for("ingest.get_ingest_job", job_id=job.id)
+    response = jsonify(
+        {
+            "job_id": str(job.id),
+            "status": job.status,
+            "status_url": status_url,
+            "review_count": len(payload.reviews),
+            "message": "Reviews queued for processing.",
+        }
+    )
+    response.headers["Location"] = status_url
+    return response, 202
+
+
+def _run_ingest_job(session, payload_raw: Dict[str, Any]) -> Dict[str, Any]:
+    payload = ReviewIngestRequestModel.model_validate(payload_raw)
+    ensure_source(
+        session,
+        payload.source_id,
+        payload.source_metadata,
+        overwrite=payload.overwrite_source_metadata,
+    )
+    result = bulk_ingest_reviews(session, payload.source_id, payload.reviews)
+    return {
+        "ingested_count": result.ingested_count,
+        "duplicate_count": result.duplicate_count,
+        "review_ids": result.review_ids,
+    }
+
+
+register_job_handler(INGEST_JOB_KIND, _run_ingest_job)
+
+
+def _ingest_ndjson_stream():
+    """Ingest an NDJSON body incrementally, committing one chunk at a time.
+
+    The first line carries the source envelope (``source_id``,
+    ``source_metadata``, ``overwrite_source_metadata``); every following line
+    is a single review item. Progress is streamed back as one NDJSON line per
+    committed chunk followed by a final summary line.
+    """
+    stream = request.stream
+    header_line = _read_ndjson_line(stream)
+    try:
+        if header_line is None:
+            raise ValueError("NDJSON body must start with a source envelope line.")
+        envelope = IngestSourceModel.model_validate_json(header_line)
+    except ValidationError as exc:
+        return _validation_error_response(exc)
+    except ValueError as exc:
+        return (
+            jsonify({"error": "validation_error", "message": str(exc), "details": []}),
+            400,
+        )
+
+    chunk_size = _resolve_chunk_size()
+
+    def generate() -> Iterator[str]:
+        session = get_session()
+        totals = {"ingested_count": 0, "duplicate_count": 0, "rejected_count": 0, "chunks": 0}
+        source_ready = False
+
+        for first_line, last_line, items, rejected in _iter_ndjson_chunks(stream, chunk_size):
+            try:
+                if not source_ready:
+                    ensure_source(
+                        session,
+                        envelope.source_id,
+                        envelope.source_metadata,
+                        overwrite=envelope.overwrite_source_metadata,
+                    )
+                    source_ready = True
+                result = bulk_ingest_reviews(session, envelope.source_id, items)
+                session.commit()
+            except SQLAlchemyError as exc:
+                session.rollback()
+                yield _ndjson(
+                    {
+                        "error": "database_error",
+                        "message": "Could not persist reviews.",
+                        "details": [{"issue": str(exc)}],
+                        "lines": [first_line, last_line],
+                        **totals,
+                    }
+                )
+                return
+
+            totals["chunks"] += 1
+            totals["ingested_count"] += result.ingested_count
+            totals["duplicate_count"] += result.duplicate_count
+            totals["rejected_count"] += len(rejected)
+            yield _ndjson(
+                {
+                    "chunk": totals["chunks"],
+                    "lines": [first_line, last_line],
+                    "ingested_count": result.ingested_count,
+                    "duplicate_count": result.duplicate_count,
+                    "rejected": rejected,
+                    "review_ids": result.review_ids,
+                }
+            )
+
+        yield _ndjson({"done": True, **totals, "message": "Reviews accepted for processing."})
+
+    return Response(stream_with_context(generate()), status=202, mimetype=NDJSON_MIMETYPE)
+
+
+def _resolve_chunk_size() -> int:
+    default = int(current_app.config.get("INGEST_CHUNK_SIZE", 500))
+    try:
+        requested = int(request.args.get("chunk_size", default))
+    except ValueError:
+        requested = default
+    return max(1, min(requested, MAX_CHUNK_SIZE))
+
+
+def _iter_ndjson_chunks(
+    stream, chunk_size: int
+) -> Iterator[Tuple[int, int, List[ReviewIngestItemModel], List[Dict[str, Any]]]]:
+    """Yield ``(first_line, last_line, items, rejected)`` per fixed-size chunk.
+
+    Line numbers are 1-based and count the envelope line. Invalid lines are
+    reported in ``rejected`` instead of failing the whole stream.
+    """
+    items: List[ReviewIngestItemModel] = []
+    rejected: List[Dict[str, Any]] = []
+    line_number = 1
+    first_line = 2
+
+    while True:
+        try:
+            raw: Optional[bytes] = _read_ndjson_line(stream)
+            oversized: Optional[str] = None
+        except ValueError as exc:
+            raw, oversized = b"", str(exc)
+        if raw is None:
+            break
+        line_number += 1
+        if oversized:
+            rejected.append({"line": line_number, "details": [{"issue": oversized}]})
+        elif not raw.strip():
+            continue
+        else:
+            try:
+                items.append(ReviewIngestItemModel.model_validate_json(raw))
+            except ValidationError as exc:
+                rejected.append(
+                    {
+                        "line": line_number,
+                        "details": [
+                            {"field": ".".join(map(str, err.get("loc", []))), "issue": err.get("msg")}
+                            for err in exc.errors()
+                        ],
+                    }
+                )
+
+        if len(items) + len(rejected) >= chunk_size:
+            yield first_line, line_number, items, rejected
+            items, rejected = [], []
+            first_line = line_number + 1
+
+    if items or rejected:
+        yield first_line, line_number, items, rejected
+
+
+def _read_ndjson_line(stream) -> Optional[bytes]:
+    """Read one line, refusing to buffer more than ``MAX_NDJSON_LINE_BYTES``."""
+    line = stream.readline(MAX_NDJSON_LINE_BYTES + 1)
+    if not line:
+        return None
+    if len(line) > MAX_NDJSON_LINE_BYTES and not line.endswith(b"\n"):
+        # Drain the oversized remainder so the next read starts on a new line.
+        while True:
+            rest = stream.readline(MAX_NDJSON_LINE_BYTES)
+            if not rest or rest.endswith(b"\n"):
+                break
+        raise ValueError(f"NDJSON line exceeds {MAX_NDJSON_LINE_BYTES} bytes.")
+    return line
+
+
+def _ndjson(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload) + "\n"
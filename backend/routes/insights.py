@@ -2,17 +2,30 @@
 
 from __future__ import annotations
 
+import hashlib
 from datetime import date, datetime, time, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 from uuid import UUID
 
-from flask import Blueprint, jsonify, request
-from pydantic import BaseModel, Field, ValidationError, model_validator
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
-
-from ..models import Review, ReviewTopic, Source, get_session
+from flask import Blueprint, current_app, jsonify, request
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from .. import rollups
+from ..aggregation import assemble_aggregates, insights_aggregates
+from ..columnar import columnar_store
+from ..models import Review, get_session
+from ..pagination import (
+    COUNT_MODES,
+    after_cursor,
+    count_rows,
+    decode_cursor,
+    next_cursor,
+    pagination_payload,
+)
+from ..response_cache import ResponseCache, response_cache
 
 bp = Blueprint("insights", __name__)
 
@@ -24,6 +37,22 @@ class InsightsQueryModel(BaseModel):
     end_date: Optional[date] = None
     source_id: Optional[UUID] = None
     sentiment: Optional[str] = Field(default=None)
+    cursor: Optional[str] = None
+    count_mode: str = "exact"
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, value):
+        if value:
+            decode_cursor(value)
+        return value or None
+
+    @field_validator("count_mode")
+    @classmethod
+    def validate_count_mode(cls, value):
+        if value not in COUNT_MODES:
+            raise ValueError(f"count_mode must be one of {', '.join(COUNT_MODES)}")
+        return value
 
     @model_validator(mode="after")
     def validate_sentiment(cls, values):
@@ -60,7 +89,35 @@ def get_insights():
         return _validation_error_response(exc)
 
     session = get_session()
+    # Repeat loads are answered from the shared response cache until ingest bumps the generation.
+    cache_scope = ResponseCache.scope_for(session.get_bind().url)
+    cache_key = ResponseCache.key_for(cache_scope, "insights", payload.model_dump(mode="json"))
+    generation = response_cache.generation(cache_scope)
+    cached = response_cache.get(cache_key, generation)
+    if cached is not None:
+        return _conditional_response(cached.body, cached.etag, cache_status="HIT")
+
+    body = jsonify(_build_insights(session, payload)).get_data()
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    response_cache.put(cache_key, generation, etag, body)
+    return _conditional_response(body, etag, cache_status="MISS")
+
+
+def _conditional_response(body: bytes, etag: str, *, cache_status: str):
+    """JSON response with ETag validation (304 on If-None-Match) and client cache hints."""
+    response = current_app.response_class(body, status=200, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = (
+        f"private, max-age={current_app.config.get('INSIGHTS_CACHE_MAX_AGE', 0)}, "
+        f"stale-while-revalidate={current_app.config.get('INSIGHTS_CACHE_STALE_SECONDS', 30)}"
+    )
+    response.headers["X-Cache"] = cache_status
+    return response.make_conditional(request)
+
+
+def _build_insights(session: Session, payload: InsightsQueryModel) -> Dict[str, Any]:
     filters = []
+    start_dt = end_dt = None
 
     if payload.start_date:
         start_dt = datetime.combine(payload.start_date, time.min).replace(tzinfo=timezone.utc)
@@ -73,151 +130,65 @@ def get_insights():
     if payload.sentiment:
         filters.append(Review.sentiment_label == payload.sentiment)
 
-    base_query = session.query(Review).filter(*filters)
-    total_items = base_query.count()
+    base_stmt = select(Review).where(*filters)
     page_size = payload.page_size
     current_page = payload.page
-    offset = (current_page - 1) * page_size
 
-    recent_reviews = (
-        base_query.order_by(Review.published_at.desc()).offset(offset).limit(page_size).all()
+    # Keyset pagination on (published_at, id) when a cursor is given; OFFSET otherwise.
+    page_stmt = base_stmt.order_by(Review.published_at.desc(), Review.id.desc())
+    if payload.cursor:
+        page_stmt = page_stmt.where(
+            after_cursor(Review.published_at, Review.id, decode_cursor(payload.cursor))
+        )
+    else:
+        page_stmt = page_stmt.offset((current_page - 1) * page_size)
+    page_stmt = page_stmt.options(selectinload(Review.topics))
+    rows = session.execute(page_stmt.limit(page_size + 1)).scalars().all()
+    recent_reviews = rows[:page_size]
+
+    # Every /insights filter is day-aligned, so the daily rollups answer them once built.
+    rollup_scope = {
+        "start_day": payload.start_date,
+        "end_day": payload.end_date,
+        "source_id": payload.source_id,
+        "sentiment": payload.sentiment,
+    }
+    snapshot = columnar_store.snapshot(session)
+    if snapshot is not None:
+        selected = snapshot.mask(
+            start=start_dt,
+            end=end_dt,
+            source_id=payload.source_id,
+            sentiment=payload.sentiment,
+        )
+        aggregates = assemble_aggregates(snapshot.aggregate_rows(selected))
+    else:
+        # Trend, breakdowns and the exact total come from one statement over the filtered set.
+        aggregates = insights_aggregates(
+            session, filters, rollup_scope if rollups.rollups_ready(session) else None
+        )
+    total_items, total_exact = count_rows(
+        session, base_stmt, payload.count_mode, known_total=aggregates.total
     )
-
-    sentiment_trend = _build_sentiment_trend(session, filters)
-    topic_distribution = _build_topic_distribution(session, filters)
-    source_breakdown = _build_source_breakdown(session, filters)
     recent_reviews_payload = [_serialize_review(review) for review in recent_reviews]
 
-    pagination = {
-        "page": current_page,
-        "page_size": page_size,
-        "total_items": total_items,
-        "total_pages": (total_items + page_size - 1) // page_size if page_size else 0,
-    }
+    pagination = pagination_payload(
+        page=current_page,
+        page_size=page_size,
+        total_items=total_items,
+        exact=total_exact,
+        count_mode=payload.count_mode,
+        cursor=next_cursor(rows, page_size, "published_at"),
+    )
 
     response = {
         "pagination": pagination,
-        "sentiment_trend": sentiment_trend,
-        "topic_distribution": topic_distribution,
-        "source_breakdown": source_breakdown,
+        "sentiment_trend": aggregates.sentiment_trend,
+        "topic_distribution": aggregates.topic_distribution,
+        "source_breakdown": aggregates.source_breakdown,
         "recent_reviews": recent_reviews_payload,
     }
-    return jsonify(response), 200
-
-
-def _build_sentiment_trend(session: Session, filters):
-    dialect = session.bind.dialect.name if session.bind else "postgresql"
-    if dialect == "postgresql":
-        date_bucket = func.date_trunc("day", Review.published_at)
-    else:
-        date_bucket = func.date(Review.published_at)
-
-    stmt = (
-        select(
-            date_bucket.label("bucket"),
-            Review.sentiment_label,
-            func.count(Review.id).label("review_count"),
-            func.avg(Review.sentiment_score).label("avg_score"),
-        )
-        .filter(*filters)
-        .group_by("bucket", Review.sentiment_label)
-        .order_by("bucket")
-    )
-
-    rows = session.execute(stmt).all()
-
-    trend_map: Dict[str, Dict[str, Any]] = {}
-    for row in rows:
-        bucket_value = row.bucket
-        if isinstance(bucket_value, datetime):
-            bucket_str = bucket_value.date().isoformat()
-        else:
-            bucket_str = str(bucket_value)
-
-        entry = trend_map.setdefault(
-            bucket_str,
-            {"date": bucket_str, "positive": 0, "neutral": 0, "negative": 0, "average_score": 0.0},
-        )
-
-        label = row.sentiment_label.lower()
-        if label == "positive":
-            entry["positive"] += row.review_count
-        elif label == "neutral":
-            entry["neutral"] += row.review_count
-        elif label == "negative":
-            entry["negative"] += row.review_count
-
-        avg_score = float(row.avg_score) if isinstance(row.avg_score, (float, Decimal)) else 0.0
-        entry.setdefault("_score_total", 0.0)
-        entry.setdefault("_count_total", 0)
-        entry["_score_total"] += avg_score * row.review_count
-        entry["_count_total"] += row.review_count
-
-    for entry in trend_map.values():
-        total_count = entry.pop("_count_total", 0)
-        total_score = entry.pop("_score_total", 0.0)
-        entry["average_score"] = round(total_score / total_count, 2) if total_count else 0.0
-
-    if not trend_map:
-        return []
-
-    return [trend_map[key] for key in sorted(trend_map.keys())]
-
-
-def _build_topic_distribution(session: Session, filters):
-    stmt = (
-        select(
-            ReviewTopic.topic_label,
-            func.count(ReviewTopic.review_id).label("review_count"),
-            func.avg(ReviewTopic.topic_confidence).label("avg_confidence"),
-        )
-        .join(Review, Review.id == ReviewTopic.review_id)
-        .filter(*filters)
-        .group_by(ReviewTopic.topic_label)
-        .order_by(func.count(ReviewTopic.review_id).desc())
-    )
-
-    rows = session.execute(stmt).all()
-    return [
-        {
-            "topic_label": row.topic_label,
-            "review_count": row.review_count,
-            "average_confidence": round(
-                float(row.avg_confidence) if isinstance(row.avg_confidence, (float, Decimal)) else 0.0,
-                2,
-            ),
-        }
-        for row in rows
-    ]
-
-
-def _build_source_breakdown(session: Session, filters):
-    stmt = (
-        select(
-            Source.id,
-            Source.name,
-            func.count(Review.id).label("review_count"),
-            func.avg(Review.sentiment_score).label("avg_score"),
-        )
-        .join(Review, Review.source_id == Source.id)
-        .filter(*filters)
-        .group_by(Source.id, Source.name)
-        .order_by(func.count(Review.id).desc())
-    )
-
-    rows = session.execute(stmt).all()
-    return [
-        {
-            "source_id": str(row.id),
-            "source_name": row.name,
-            "review_count": row.review_count,
-            "average_sentiment_score": round(
-                float(row.avg_score) if isinstance(row.avg_score, (float, Decimal)) else 0.0,
-                2,
-            ),
-        }
-        for row in rows
-    ]
+    return response
 
 
 def _serialize_review(review: Review):
@@ -0,0 +1,475 @@
+"""CLI for bulk-loading historical reviews straight into the database.
+
+Reads SAMPLE_DATA.json-shaped JSON, NDJSON or CSV, analyses reviews in
+parallel worker processes and loads them in batches. On PostgreSQL each batch
+is streamed with ``COPY`` into temporary staging tables and merged with
+set-based ``INSERT ... SELECT ... ON CONFLICT DO NOTHING`` statements (daily
+rollups are incremented from the merged rows); other databases fall back to
+``executemany`` inserts through the ingest engine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..analysis import analyze_batch
+from ..dimensions import dimension_cache
+from ..ingest_engine import ensure_source, existing_review_ids, insert_review_rows
+from ..models import Competitor, init_engine, session_scope
+from ..response_cache import mark_data_changed
+from ..rollups import NO_COMPETITOR
+from ..routes.ingest import ReviewIngestItemModel, SourceMetadataModel
+
+ANALYSIS_CHUNK_SIZE = 500
+
+REVIEW_COLUMNS = (
+    "id",
+    "source_id",
+    "competitor_id",
+    "source_review_id",
+    "title",
+    "body",
+    "rating",
+    "language",
+    "location",
+    "sentiment_label",
+    "sentiment_score",
+    "published_at",
+)
+
+STAGING_DDL = (
+    """
+    CREATE TEMP TABLE staging_reviews (
+        ord BIGINT NOT NULL,
+        id UUID NOT NULL,
+        source_id UUID NOT NULL,
+        competitor_id UUID,
+        source_review_id TEXT NOT NULL,
+        title TEXT,
+        body TEXT NOT NULL,
+        rating NUMERIC(2,1),
+        language TEXT,
+        location TEXT,
+        sentiment_label TEXT NOT NULL,
+        sentiment_score NUMERIC(3,2) NOT NULL,
+        published_at TIMESTAMPTZ NOT NULL
+    ) ON COMMIT DROP
+    """,
+    """
+    CREATE TEMP TABLE staging_review_topics (
+        review_id UUID NOT NULL,
+        topic_id UUID NOT NULL,
+        topic_label TEXT NOT NULL,
+        topic_confidence NUMERIC(4,3) NOT NULL
+    ) ON COMMIT DROP
+    """,
+)
+
+MERGE_REVIEWS_SQL = f"""
+    INSERT INTO reviews ({", ".join(REVIEW_COLUMNS)})
+    SELECT DISTINCT ON (source_id, source_review_id) {", ".join(REVIEW_COLUMNS)}
+    FROM staging_reviews
+    ORDER BY source_id, source_review_id, ord
+    ON CONFLICT (source_id, source_review_id) DO NOTHING
+"""
+
+# Staged ids are freshly generated, so only reviews inserted by the merge above join.
+MERGE_REVIEW_TOPICS_SQL = """
+    INSERT INTO review_topics (review_id, topic_id, topic_label, topic_confidence)
+    SELECT s.review_id, s.topic_id, s.topic_label, s.topic_confidence
+    FROM staging_review_topics s
+    JOIN reviews r ON r.id = s.review_id
+    ON CONFLICT DO NOTHING
+"""
+
+
+# Staged reviews that survived the merge are exactly the newly inserted rows.
+MERGE_REVIEW_ROLLUPS_SQL = f"""
+    INSERT INTO review_daily_rollups
+        (day, source_id, competitor_key, sentiment_label, review_count, score_sum)
+    SELECT (r.published_at AT TIME ZONE 'UTC')::date, r.source_id,
+           COALESCE(r.competitor_id, '{NO_COMPETITOR}'::uuid), r.sentiment_label,
+           COUNT(*), SUM(r.sentiment_score)
+    FROM staging_reviews s
+    JOIN reviews r ON r.id = s.id
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (day, source_id, competitor_key, sentiment_label) DO UPDATE
+    SET review_count = review_daily_rollups.review_count + EXCLUDED.review_count,
+        score_sum = review_daily_rollups.score_sum + EXCLUDED.score_sum
+"""
+
+MERGE_TOPIC_ROLLUPS_SQL = f"""
+    INSERT INTO topic_daily_rollups
+        (day, topic_label, source_id, competitor_key, sentiment_label, review_count, confidence_sum)
+    SELECT (r.published_at AT TIME ZONE 'UTC')::date, t.topic_label, r.source_id,
+           COALESCE(r.competitor_id, '{NO_COMPETITOR}'::uuid), r.sentiment_label,
+           COUNT(*), SUM(t.topic_confidence)
+    FROM staging_review_topics t
+    JOIN reviews r ON r.id = t.review_id
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT (day, topic_label, source_id, competitor_key, sentiment_label) DO UPDATE
+    SET review_count = topic_daily_rollups.review_count + EXCLUDED.review_count,
+        confidence_sum = topic_daily_rollups.confidence_sum + EXCLUDED.confidence_sum
+"""
+
+
+@dataclass
+class BackfillRecord:
+    source_id: uuid.UUID
+    competitor_id: Optional[uuid.UUID]
+    item: ReviewIngestItemModel
+
+
+@dataclass
+class BackfillStats:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.inserted / elapsed, 1),
+        }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-load historical reviews.")
+    parser.add_argument("path", help="Input file (.json, .ndjson/.jsonl or .csv); '-' reads NDJSON from stdin.")
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson", "csv"),
+        help="Input format (default: inferred from the file extension).",
+    )
+    parser.add_argument(
+        "--source-id",
+        help="Source UUID for records that do not carry their own source_id.",
+    )
+    parser.add_argument(
+        "--dimensions",
+        help="JSON file with 'sources' and 'competitors' to create first (as written by generate_corpus).",
+    )
+    parser.add_argument(
+        "--source-name",
+        default="Backfill Import",
+        help="Name used when the source has to be created (default: 'Backfill Import').",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10000,
+        help="Reviews per COPY/merge transaction (default: 10000).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Analysis worker processes (default: CPU count; 1 analyses in-process).",
+    )
+    return parser.parse_args(argv)
+
+
+# --- Input readers ---------------------------------------------------------- #
+
+
+def read_records(path: str, fmt: str) -> Tuple[Dict[str, List[Dict[str, Any]]], Iterator[Dict[str, Any]]]:
+    """Return ``(dimensions, review_dicts)`` for the given input."""
+    if fmt == "json":
+        with open(path, encoding="utf-8") as handle:
+            document = json.load(handle)
+        if isinstance(document, list):
+            return {}, iter(document)
+        dimensions = {
+            "sources": document.get("sources", []),
+            "competitors": document.get("competitors", []),
+        }
+        return dimensions, iter(document.get("reviews", []))
+    if fmt == "ndjson":
+        return {}, _read_ndjson(path)
+    return {}, _read_csv(path)
+
+
+def _read_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield {key: value for key, value in row.items() if value not in ("", None)}
+
+
+def _infer_format(path: str) -> str:
+    lowered = path.lower()
+    if path == "-" or lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+def _to_record(raw: Dict[str, Any], default_source: Optional[uuid.UUID]) -> BackfillRecord:
+    source_value = raw.get("source_id") or default_source
+    if not source_value:
+        raise ValueError("source_id is required (pass --source-id for inputs without one)")
+    competitor_value = raw.get("competitor_id")
+    return BackfillRecord(
+        source_id=uuid.UUID(str(source_value)),
+        competitor_id=uuid.UUID(str(competitor_value)) if competitor_value else None,
+        item=ReviewIngestItemModel.model_validate(raw),
+    )
+
+
+# --- Analysis ---------------------------------------------------------------- #
+
+
+def analyze_chunk(texts: List[Tuple[Optional[str], str]]) -> List[Tuple[str, float, List[Dict[str, Any]]]]:
+    """Analyse ``(title, body)`` pairs; runs inside worker processes."""
+    analyses = analyze_batch([body for _, body in texts], titles=[title for title, _ in texts])
+    return [
+        (analysis["sentiment"]["label"], analysis["sentiment"]["score"], analysis["topics"])
+        for analysis in analyses
+    ]
+
+
+def _submit_analysis(pool: Optional[ProcessPoolExecutor], records: List[BackfillRecord]) -> List[Future]:
+    futures = []
+    for start in range(0, len(records), ANALYSIS_CHUNK_SIZE):
+        texts = [(record.item.title, record.item.body) for record in records[start : start + ANALYSIS_CHUNK_SIZE]]
+        if pool is None:
+            future: Future = Future()
+            future.set_result(analyze_chunk(texts))
+        else:
+            future = pool.submit(analyze_chunk, texts)
+        futures.append(future)
+    return futures
+
+
+def _build_rows(
+    records: List[BackfillRecord], futures: List[Future]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    analyses = [result for future in futures for result in future.result()]
+    review_rows: List[Dict[str, Any]] = []
+    topic_rows: List[Dict[str, Any]] = []
+    for record, (label, score, topics) in zip(records, analyses):
+        review_id = uuid.uuid4()
+        item = record.item
+        published_at = item.published_at
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        review_rows.append(
+            {
+                "id": review_id,
+                "source_id": record.source_id,
+                "competitor_id": record.competitor_id,
+                "source_review_id": item.source_review_id,
+                "title": item.title,
+                "body": item.body,
+                "rating": Decimal(str(item.rating)) if item.rating is not None else None,
+                "language": item.language,
+                "location": item.location,
+                "sentiment_label": label,
+                "sentiment_score": Decimal(str(score)),
+                "published_at": published_at,
+            }
+        )
+        for topic in topics:
+            topic_rows.append(
+                {
+                    "review_id": review_id,
+                    "topic_label": topic["topic_label"],
+                    "topic_confidence": Decimal(str(topic["topic_confidence"])),
+                }
+            )
+    return review_rows, topic_rows
+
+
+# --- Loaders ----------------------------------------------------------------- #
+
+
+def load_batch(session: Session, review_rows: List[Dict[str, Any]], topic_rows: List[Dict[str, Any]]) -> int:
+    """Load one analysed batch; returns the number of reviews inserted."""
+    if session.get_bind().dialect.name == "postgresql":
+        return _copy_merge(session, review_rows, topic_rows)
+    return _executemany_merge(session, review_rows, topic_rows)
+
+
+def _copy_merge(session: Session, review_rows: List[Dict[str, Any]], topic_rows: List[Dict[str, Any]]) -> int:
+    topic_ids = dimension_cache.topic_ids(session, {row["topic_label"] for row in topic_rows})
+    cursor = session.connection().connection.driver_connection.cursor()
+    try:
+        for ddl in STAGING_DDL:
+            cursor.execute(ddl)
+        with cursor.copy(f"COPY staging_reviews (ord, {', '.join(REVIEW_COLUMNS)}) FROM STDIN") as copy:
+            for ordinal, row in enumerate(review_rows):
+                copy.write_row((ordinal, *(row[column] for column in REVIEW_COLUMNS)))
+        with cursor.copy(
+            "COPY staging_review_topics (review_id, topic_id, topic_label, topic_confidence) FROM STDIN"
+        ) as copy:
+            for row in topic_rows:
+                copy.write_row(
+                    (row["review_id"], topic_ids[row["topic_label"]], row["topic_label"], row["topic_confidence"])
+                )
+    finally:
+        cursor.close()
+
+    inserted = session.execute(text(MERGE_REVIEWS_SQL)).rowcount
+    session.execute(text(MERGE_REVIEW_TOPICS_SQL))
+    if inserted:
+        session.execute(text(MERGE_REVIEW_ROLLUPS_SQL))
+        session.execute(text(MERGE_TOPIC_ROLLUPS_SQL))
+        mark_data_changed(session)
+    return inserted
+
+
+def _executemany_merge(
+    session: Session, review_rows: List[Dict[str, Any]], topic_rows: List[Dict[str, Any]]
+) -> int:
+    by_source: Dict[uuid.UUID, Dict[str, Dict[str, Any]]] = {}
+    for row in review_rows:
+        by_source.setdefault(row["source_id"], {}).setdefault(row["source_review_id"], row)
+
+    fresh: List[Dict[str, Any]] = []
+    for source_id, rows in by_source.items():
+        existing = existing_review_ids(session, source_id, list(rows))
+        fresh.extend(row for key, row in rows.items() if key not in existing)
+    return len(insert_review_rows(session, fresh, topic_rows))
+
+
+def _load_dimensions(session: Session, dimensions: Dict[str, List[Dict[str, Any]]]) -> None:
+    for source in dimensions.get("sources", []):
+        ensure_source(session, uuid.UUID(str(source["id"])), SourceMetadataModel.model_validate(source))
+
+    competitors = dimensions.get("competitors", [])
+    if not competitors:
+        return
+    known = set(session.execute(select(Competitor.id)).scalars())
+    for competitor in competitors:
+        competitor_id = uuid.UUID(str(competitor["id"]))
+        if competitor_id in known:
+            continue
+        values = {
+            "id": competitor_id,
+            "name": competitor["name"],
+            "url": competitor.get("url"),
+            "description": competitor.get("description"),
+            "tags": competitor.get("tags") or [],
+        }
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(pg_insert(Competitor.__table__).values(values).on_conflict_do_nothing())
+        else:
+            session.add(Competitor(**values))
+    session.flush()
+
+
+# --- Driver -------------------------------------------------------------------- #
+
+
+def _batches(
+    raw_records: Iterable[Dict[str, Any]],
+    default_source: Optional[uuid.UUID],
+    batch_size: int,
+    stats: BackfillStats,
+) -> Iterator[List[BackfillRecord]]:
+    batch: List[BackfillRecord] = []
+    for index, raw in enumerate(raw_records, start=1):
+        stats.read += 1
+        try:
+            batch.append(_to_record(raw, default_source))
+        except (ValidationError, ValueError) as exc:
+            stats.rejected += 1
+            print(f"record {index}: rejected ({exc})".replace("\n", " "), file=sys.stderr)
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_backfill(args: argparse.Namespace) -> BackfillStats:
+    fmt = args.format or _infer_format(args.path)
+    default_source = uuid.UUID(args.source_id) if args.source_id else None
+    dimensions, raw_records = read_records(args.path, fmt)
+    if args.dimensions:
+        with open(args.dimensions, encoding="utf-8") as handle:
+            extra = json.load(handle)
+        for key in ("sources", "competitors"):
+            dimensions[key] = [*dimensions.get(key, []), *extra.get(key, [])]
+    stats = BackfillStats()
+
+    with session_scope() as session:
+        _load_dimensions(session, dimensions)
+        if default_source:
+            ensure_source(session, default_source, SourceMetadataModel(name=args.source_name))
+
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        previous: Optional[Tuple[List[BackfillRecord], List[Future]]] = None
+        # Analysis of batch N+1 overlaps with the database load of batch N.
+        for batch in _batches(raw_records, default_source, args.batch_size, stats):
+            futures = _submit_analysis(pool, batch)
+            if previous:
+                _load(previous, stats)
+            previous = (batch, futures)
+        if previous:
+            _load(previous, stats)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return stats
+
+
+def _load(pending: Tuple[List[BackfillRecord], List[Future]], stats: BackfillStats) -> None:
+    records, futures = pending
+    review_rows, topic_rows = _build_rows(records, futures)
+    with session_scope() as session:
+        inserted = load_batch(session, review_rows, topic_rows)
+    stats.inserted += inserted
+    stats.duplicates += len(review_rows) - inserted
+    print(json.dumps({"progress": stats.as_dict()}), file=sys.stderr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL must be set to run the backfill script.")
+
+    init_engine(database_url)
+    stats = run_backfill(args)
+    print(json.dumps(stats.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""CLI that microbenchmarks the analyzers used on the ingest path.
+
+Measures ``_tokenize``, ``analyze_sentiment``, ``extract_topics``,
+``analyze_batch`` and every registered analyzer backend that can be built
+without configuration (``--backends``), over two corpora at several body
+lengths:
+
+* ``synthetic``: lexicon-based bodies from ``generate_corpus``.
+* ``sample``: SAMPLE_DATA.json review bodies, concatenated to length.
+
+The phrase analyzer is also run with lexicons padded to ``--lexicon-sizes``
+entries to show how matching cost grows with lexicon size. Each case reports
+the best of ``--repeat`` timed runs as reviews per second and microseconds per
+review, and one ``tracemalloc`` run as peak traced bytes per review.
+
+The JSON report goes to stdout (and ``--output``). ``--compare`` takes an
+earlier report, prints the speed ratio per case and exits with status 1 when
+a case is more than ``--threshold`` slower.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..analysis import (
+    PhraseLexicon,
+    _tokenize,
+    analyze_batch,
+    analyze_sentiment,
+    extract_topics,
+)
+from ..analyzers import available_analyzers, create_analyzer
+from .generate_corpus import CorpusSpec, build_templates
+
+SAMPLE_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "SAMPLE_DATA.json")
+CORPORA = ("synthetic", "sample")
+
+Case = Callable[[List[str]], Any]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmark the review analyzers.")
+    parser.add_argument("--reviews", type=int, default=2000, help="Texts per corpus and length (default: 2000).")
+    parser.add_argument(
+        "--lengths", type=int, nargs="+", default=[10, 50, 200, 1000], help="Body lengths in words."
+    )
+    parser.add_argument("--corpora", nargs="+", choices=CORPORA, default=list(CORPORA))
+    parser.add_argument(
+        "--backends",
+        nargs="*",
+        help="Registered analyzer backends to include (default: every one that builds without config).",
+    )
+    parser.add_argument(
+        "--lexicon-sizes",
+        type=int,
+        nargs="*",
+        default=[1_000, 10_000, 100_000],
+        help="Padded phrase-lexicon sizes to benchmark (default: 1000 10000 100000).",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case; the best is kept (default: 5).")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the synthetic corpus.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown in --compare mode (0.2 = 20%%)."
+    )
+    return parser.parse_args(argv)
+
+
+# --- Corpora ------------------------------------------------------------------ #
+
+
+def synthetic_texts(count: int, words: int, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    vocabulary = " ".join(build_templates(CorpusSpec(reviews=count, seed=seed), rng).bodies).split()
+    starts = rng.integers(0, len(vocabulary) - words, size=count) if len(vocabulary) > words else np.zeros(count, int)
+    return [" ".join(vocabulary[start : start + words]) for start in starts.tolist()]
+
+
+def sample_texts(count: int, words: int, path: str = SAMPLE_DATA_PATH) -> List[str]:
+    with open(path, encoding="utf-8") as handle:
+        bodies = [review["body"].split() for review in json.load(handle)["reviews"]]
+    texts = []
+    for index in range(count):
+        text: List[str] = []
+        offset = index
+        while len(text) < words:
+            text.extend(bodies[offset % len(bodies)])
+            offset += 1
+        texts.append(" ".join(text[:words]))
+    return texts
+
+
+def padded_lexicon(size: int, seed: int) -> PhraseLexicon:
+    """The default lexicon plus synthetic one- and two-word entries up to ``size`` phrases."""
+    base = PhraseLexicon.default()
+    rng = np.random.default_rng(seed)
+    sentiment = {" ".join(phrase): weight for phrase, weight in zip(base.phrases, base._weights) if weight}
+    topics: Dict[str, List[str]] = {label: [] for label in base.topic_labels}
+    for phrase, topic_indexes in zip(base.phrases, base._topics):
+        for topic_index in topic_indexes:
+            topics[base.topic_labels[topic_index]].append(" ".join(phrase))
+    for index in range(max(size - len(base.phrases), 0)):
+        phrase = f"lexterm{index}" if index % 2 else f"lexterm{index} lexterm{index + 1}"
+        if index % 3:
+            sentiment[phrase] = float(rng.choice([-1.0, 1.0]))
+        else:
+            topics[base.topic_labels[index % len(base.topic_labels)]].append(phrase)
+    return PhraseLexicon(sentiment, topics)
+
+
+# --- Cases -------------------------------------------------------------------- #
+
+
+def build_cases(args: argparse.Namespace) -> Dict[str, Case]:
+    cases: Dict[str, Case] = {
+        "tokenize": lambda texts: [_tokenize(text) for text in texts],
+        "analyze_sentiment": lambda texts: [analyze_sentiment(text) for text in texts],
+        "extract_topics": lambda texts: [extract_topics(text) for text in texts],
+        "analyze_batch": analyze_batch,
+    }
+    names = args.backends if args.backends is not None else available_analyzers()
+    for name in names:
+        try:
+            backend = create_analyzer(name)
+        except (RuntimeError, ValueError) as exc:
+            if args.backends is not None:
+                raise SystemExit(f"Cannot build analyzer {name!r}: {exc}")
+            print(f"skipping analyzer {name!r}: {exc}", file=sys.stderr)
+            continue
+        cases[f"backend:{name}"] = backend.analyze_batch
+    for size in args.lexicon_sizes:
+        cases[f"phrase[lexicon={size}]"] = padded_lexicon(size, args.seed).analyze_batch
+    return cases
+
+
+def measure(case: Case, texts: List[str], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` throughput plus peak traced memory of one extra run."""
+    case(texts[: min(len(texts), 50)])  # warm lazily built lexicons and caches
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case(texts)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        case(texts)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "reviews_per_second": round(len(texts) / best, 1),
+        "us_per_review": round(best / len(texts) * 1_000_000, 3),
+        "peak_bytes_per_review": round(peak / len(texts), 1),
+    }
+
+
+def compare(results: List[Dict[str, Any]], previous: List[Dict[str, Any]], threshold: float) -> List[str]:
+    """Print the speed ratio per case and return the cases slower than ``threshold``."""
+    earlier = {(row["case"], row["corpus"], row["words"]): row for row in previous}
+    regressions = []
+    for row in results:
+        before = earlier.get((row["case"], row["corpus"], row["words"]))
+        if not before:
+            continue
+        ratio = row["reviews_per_second"] / before["reviews_per_second"]
+        label = f"{row['case']} {row['corpus']} {row['words']}w"
+        print(f"{label:<48} {ratio:6.2f}x", file=sys.stderr)
+        if ratio < 1 / (1 + threshold):
+            regressions.append(f"{label}: {ratio:.2f}x the previous throughput")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    cases = build_cases(args)
+    results: List[Dict[str, Any]] = []
+    for corpus in args.corpora:
+        for words in args.lengths:
+            if corpus == "synthetic":
+                texts = synthetic_texts(args.reviews, words, args.seed)
+            else:
+                texts = sample_texts(args.reviews, words)
+            for name, case in cases.items():
+                row = {"case": name, "corpus": corpus, "words": words, **measure(case, texts, args.repeat)}
+                print(
+                    f"{name:<28} {corpus:<9} {words:>5}w {row['reviews_per_second']:>12,.0f}/s "
+                    f"{row['us_per_review']:>10.1f}us {row['peak_bytes_per_review']:>10,.0f}B",
+                    file=sys.stderr,
+                )
+                results.append(row)
+
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "reviews": args.reviews,
+        "results": results,
+    }
+    regressions: List[str] = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle)["results"], args.threshold)
+        report["regressions"] = regressions
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""CLI that benchmarks API endpoint latency against a stored baseline.
+
+Seeds the database with a ``generate_corpus`` corpus (``--reviews 10k``,
+``100k`` or ``1M`` over the last 180 days) unless it already holds reviews,
+then drives ``/ingest``, ``/insights``,
+``/competitors/<id>/comparison``, ``/digest/run`` and ``/analyze`` through the
+Flask test client, or a running server with ``--base-url``. p50/p95/p99
+latency and throughput are reported per endpoint and compared with the
+baseline recorded for the same corpus size; the exit status is 1 when an
+endpoint's p50 or p95 is more than ``--threshold`` slower than its baseline.
+
+Without ``--database-url``/``DATABASE_URL`` a temporary SQLite database is
+used. The insights response cache is off unless ``INSIGHTS_CACHE_ENABLED`` is
+set, so repeated requests measure the query path rather than cache hits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+
+from ..models import Base, Competitor, Review, Source, init_engine, session_scope
+from .generate_corpus import CorpusSpec, parse_count, write_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "endpoints.json")
+SCENARIOS = ("ingest", "insights", "comparison", "digest", "analyze")
+INGEST_BATCH_SIZE = 100
+CORPUS_DAYS = 180
+
+Request = Tuple[str, str, Optional[Dict[str, Any]], Dict[str, str]]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints against a stored baseline.")
+    parser.add_argument("--reviews", type=parse_count, default=10_000, help="Corpus size, e.g. 10k, 100k, 1M.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Database to seed/benchmark.")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process test client.")
+    parser.add_argument("--iterations", type=int, default=50, help="Measured requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint.")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, help="Endpoints to benchmark (default: all).")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the synthetic corpus.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25%%)."
+    )
+    parser.add_argument("--write-baseline", action="store_true", help="Record these results as the baseline.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    parser.add_argument(
+        "--digest-token",
+        default=os.environ.get("TOKEN_DIGEST_RUN", "benchmark-token"),
+        help="Bearer token for /digest/run.",
+    )
+    return parser.parse_args(argv)
+
+
+class ClientDriver:
+    def __init__(self, app) -> None:
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]], headers: Dict[str, str]) -> int:
+        return self.client.open(path, method=method, json=payload, headers=headers).status_code
+
+
+class HttpDriver:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]], headers: Dict[str, str]) -> int:
+        data = json.dumps(payload).encode() if payload is not None else None
+        headers = {**headers, "Content-Type": "application/json"} if data is not None else headers
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[int], Request]
+    items_per_request: int = 1
+
+
+def build_scenarios(session, digest_token: str) -> List[Scenario]:
+    source_ids = [str(value) for value in session.execute(select(Source.id).order_by(Source.name)).scalars()]
+    competitor_ids = [
+        str(value) for value in session.execute(select(Competitor.id).order_by(Competitor.name)).scalars()
+    ]
+    bodies = list(session.execute(select(Review.body).limit(200)).scalars()) or ["The dashboard is fast"]
+    today = datetime.now(timezone.utc).date()
+    run_id = uuid.uuid4().hex[:8]
+    windows = [7, 30, 90]
+    sentiments = [None, "Negative", "Positive"]
+
+    def ingest(iteration: int) -> Request:
+        published = datetime.now(timezone.utc).isoformat()
+        reviews = [
+            {
+                "source_review_id": f"bench-{run_id}-{iteration}-{index}",
+                "body": bodies[(iteration * INGEST_BATCH_SIZE + index) % len(bodies)],
+                "published_at": published,
+            }
+            for index in range(INGEST_BATCH_SIZE)
+        ]
+        return "POST", "/ingest", {"source_id": source_ids[iteration % len(source_ids)], "reviews": reviews}, {}
+
+    def insights(iteration: int) -> Request:
+        start = today - timedelta(days=windows[iteration % len(windows)])
+        query = f"start_date={start.isoformat()}&end_date={today.isoformat()}"
+        sentiment = sentiments[(iteration // len(windows)) % len(sentiments)]
+        if sentiment:
+            query += f"&sentiment={sentiment}"
+        return "GET", f"/insights?{query}", None, {}
+
+    def comparison(iteration: int) -> Request:
+        competitor_id = competitor_ids[iteration % len(competitor_ids)]
+        start = today - timedelta(days=windows[iteration % len(windows)])
+        return "GET", f"/competitors/{competitor_id}/comparison?start_date={start.isoformat()}", None, {}
+
+    def digest(iteration: int) -> Request:
+        return "POST", "/digest/run", {}, {"Authorization": f"Bearer {digest_token}"}
+
+    def analyze(iteration: int) -> Request:
+        return "POST", "/analyze", {"text": f"{bodies[iteration % len(bodies)]} #{iteration}"}, {}
+
+    scenarios = [
+        Scenario("ingest", ingest, INGEST_BATCH_SIZE),
+        Scenario("insights", insights),
+        Scenario("comparison", comparison),
+        Scenario("digest", digest),
+        Scenario("analyze", analyze),
+    ]
+    if not competitor_ids:
+        scenarios = [scenario for scenario in scenarios if scenario.name != "comparison"]
+    return scenarios
+
+
+def measure(driver, scenario: Scenario, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Run one scenario sequentially and summarise its latency distribution."""
+    for iteration in range(warmup):
+        driver.request(*scenario.build(iteration))
+
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    for iteration in range(warmup, warmup + iterations):
+        method, path, payload, headers = scenario.build(iteration)
+        request_started = time.perf_counter()
+        status = driver.request(method, path, payload, headers)
+        latencies.append(time.perf_counter() - request_started)
+        if status >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "requests_per_second": round(iterations / elapsed, 2),
+        "items_per_second": round(iterations * scenario.items_per_request / elapsed, 2),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Describe every endpoint whose p50 or p95 regressed beyond ``threshold``."""
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} of {result['iterations']} requests failed")
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            limit = reference[metric] * (1 + threshold)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]:.1f} exceeds baseline {reference[metric]:.1f} "
+                    f"by more than {threshold:.0%}"
+                )
+    return regressions
+
+
+def _load_baselines(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _in_process_app(database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    for name, value in (
+        ("ALLOWED_ORIGIN", "http://localhost"),
+        ("AUTH_TOKEN_SECRET", "benchmark-secret"),
+        ("JOB_WORKERS", "0"),
+        ("INSIGHTS_CACHE_ENABLED", "false"),
+    ):
+        os.environ.setdefault(name, value)
+    from ..app import create_app
+
+    return create_app()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    database_url = args.database_url
+    if not database_url:
+        if args.base_url:
+            raise SystemExit("--base-url needs --database-url (or DATABASE_URL) for the server's database.")
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='cv-bench-'), 'bench.db')}"
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with session_scope() as session:
+        existing = session.execute(select(func.count(Review.id))).scalar_one()
+    if existing == 0:
+        seed_started = time.perf_counter()
+        today = datetime.now(timezone.utc).date()
+        spec = CorpusSpec(reviews=args.reviews, seed=args.seed, start_date=today - timedelta(days=CORPUS_DAYS - 1))
+        write_database(session_scope, spec, progress=False)
+        print(f"Seeded {args.reviews} reviews in {time.perf_counter() - seed_started:.1f}s", file=sys.stderr)
+    elif existing < args.reviews * 0.9:
+        print(f"Reusing existing database with {existing} reviews (fewer than --reviews).", file=sys.stderr)
+    with session_scope() as session:
+        scenarios = build_scenarios(session, args.digest_token)
+
+    os.environ.setdefault("TOKEN_DIGEST_RUN", args.digest_token)
+    driver = HttpDriver(args.base_url) if args.base_url else ClientDriver(_in_process_app(database_url))
+    results = {
+        scenario.name: measure(driver, scenario, args.iterations, args.warmup)
+        for scenario in scenarios
+        if not args.only or scenario.name in args.only
+    }
+
+    baselines = _load_baselines(args.baseline)
+    scale = str(args.reviews)
+    regressions = compare(results, baselines.get(scale, {}), args.threshold)
+    report = {"reviews": args.reviews, "results": results, "regressions": regressions}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.write_baseline:
+        baselines[scale] = {
+            name: {metric: result[metric] for metric in ("p50_ms", "p95_ms", "p99_ms", "requests_per_second")}
+            for name, result in results.items()
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baselines, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,539 @@
+"""CLI that generates large synthetic review corpora for capacity planning.
+
+Reviews are drawn from seeded, configurable distributions over sources
+(Zipf-skewed), competitors, sentiment, topics, publication dates and body
+lengths. Bodies come from a pool of a few thousand templates built from the
+analyzer lexicon and analysed once up front, so the stored sentiment and
+topics match what ingest would have computed without running the analyzer
+per row. Per-row values are drawn with NumPy in batches.
+
+Output goes either straight to ``DATABASE_URL`` or to an NDJSON file that
+``backend.scripts.backfill`` can load (with the sources and competitors in a
+``.dimensions.json`` file next to it):
+
+* PostgreSQL: reviews and topic links are streamed with ``COPY`` and the daily
+  rollups are rebuilt for the generated date range at the end.
+* Other databases: batched ``executemany`` inserts, then the same rebuild.
+
+The same ``--seed`` always produces the same corpus. Re-running into a
+database that already holds it needs a different ``--prefix`` because
+``source_review_id`` values are derived from it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..analysis import (
+    CLAUSE_BREAK_TERMS,
+    INTENSIFIER_TERMS,
+    NEGATION_TERMS,
+    NEGATIVE_TERMS,
+    POSITIVE_TERMS,
+    TOPIC_KEYWORDS,
+    analyze_batch,
+)
+from ..dimensions import dimension_cache
+from ..models import Competitor, Review, ReviewTopic, Source, init_engine, session_scope
+from ..response_cache import mark_data_changed
+from ..rollups import mark_ready, rebuild_rollups
+
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+GENERAL_TOPIC = "General Feedback"
+BODY_LENGTHS = (8, 16, 32, 64, 128, 256)
+TEMPLATE_VARIANTS = 16
+# Share of body words that carry sentiment; the keyword analyzer labels a
+# review Positive/Negative above a net density of 0.15.
+SENTIMENT_DENSITY = 0.25
+TOPIC_DENSITY = 0.1
+
+FILLER_WORDS = (
+    "the", "team", "product", "we", "use", "it", "every", "day", "and", "our", "after", "update",
+    "with", "for", "when", "our", "tool", "account", "weekly", "report", "manager", "setup", "month",
+    "customers", "data", "reviews", "feature", "workflow", "onboarding", "plan", "pricing", "then",
+    "also", "overall", "usually", "company", "process", "release", "version", "users",
+)
+
+REVIEW_COLUMNS = (
+    "id",
+    "source_id",
+    "competitor_id",
+    "source_review_id",
+    "title",
+    "body",
+    "rating",
+    "language",
+    "location",
+    "sentiment_label",
+    "sentiment_score",
+    "published_at",
+)
+TOPIC_COLUMNS = ("review_id", "topic_id", "topic_label", "topic_confidence")
+
+
+def parse_count(value: str) -> int:
+    """Parse ``10000``, ``10k`` or ``1M``."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    suffix = value[-1:].lower()
+    try:
+        if suffix in multipliers:
+            return int(float(value[:-1]) * multipliers[suffix])
+        return int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid count: {value!r}") from exc
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Parse ``label=weight,label=weight`` (labels are case-insensitive)."""
+    weights: Dict[str, float] = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        label, _, weight = part.rpartition("=")
+        try:
+            weights[label.strip().lower()] = float(weight)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(f"invalid weight in {part!r}") from exc
+        if not label.strip() or weights[label.strip().lower()] < 0:
+            raise argparse.ArgumentTypeError(f"invalid weight in {part!r}")
+    return weights
+
+
+@dataclass
+class CorpusSpec:
+    reviews: int
+    seed: int = 7
+    sources: int = 5
+    source_skew: float = 1.0
+    competitors: int = 3
+    competitor_share: float = 0.2
+    sentiment_weights: Dict[str, float] = field(
+        default_factory=lambda: {"positive": 0.5, "neutral": 0.2, "negative": 0.3}
+    )
+    topic_weights: Dict[str, float] = field(default_factory=dict)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    recent_bias: float = 0.0
+    body_words: float = 30.0
+    prefix: Optional[str] = None
+    batch_size: int = 50_000
+
+    @property
+    def topics(self) -> List[str]:
+        return [*TOPIC_KEYWORDS, GENERAL_TOPIC]
+
+    @property
+    def window(self) -> Tuple[datetime, datetime]:
+        end_day = self.end_date or datetime.now(timezone.utc).date()
+        start_day = self.start_date or end_day - timedelta(days=364)
+        return (
+            datetime.combine(start_day, dt_time.min, tzinfo=timezone.utc),
+            datetime.combine(end_day + timedelta(days=1), dt_time.min, tzinfo=timezone.utc),
+        )
+
+    @property
+    def id_prefix(self) -> str:
+        return self.prefix or f"synthetic-{self.seed}"
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic review corpus.")
+    parser.add_argument("--reviews", type=parse_count, required=True, help="Number of reviews, e.g. 500k or 5M.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    parser.add_argument("--sources", type=int, default=5, help="Number of sources (default: 5).")
+    parser.add_argument(
+        "--source-skew",
+        type=float,
+        default=1.0,
+        help="Zipf exponent of review volume across sources; 0 spreads evenly (default: 1.0).",
+    )
+    parser.add_argument("--competitors", type=int, default=3, help="Number of competitors (default: 3).")
+    parser.add_argument(
+        "--competitor-share",
+        type=float,
+        default=0.2,
+        help="Fraction of reviews about a competitor (default: 0.2).",
+    )
+    parser.add_argument(
+        "--sentiment",
+        type=parse_weights,
+        default="positive=0.5,neutral=0.2,negative=0.3",
+        help="Sentiment weights (default: positive=0.5,neutral=0.2,negative=0.3).",
+    )
+    parser.add_argument(
+        "--topics",
+        type=parse_weights,
+        default="",
+        help="Topic weights, e.g. 'Performance=3,Integrations=2'; unlisted topics weigh 1.",
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First publication day (default: a year ago).")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last publication day (default: today).")
+    parser.add_argument(
+        "--recent-bias",
+        type=float,
+        default=0.0,
+        help="Skew publication dates towards the end date; 0 is uniform (default: 0).",
+    )
+    parser.add_argument("--body-words", type=float, default=30.0, help="Median body length in words (default: 30).")
+    parser.add_argument("--prefix", help="source_review_id prefix (default: synthetic-<seed>).")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per batch (default: 50000).")
+    parser.add_argument("--output", help="Write NDJSON to this file instead of the database.")
+    return parser.parse_args(argv)
+
+
+def spec_from_args(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        reviews=args.reviews,
+        seed=args.seed,
+        sources=args.sources,
+        source_skew=args.source_skew,
+        competitors=args.competitors,
+        competitor_share=args.competitor_share,
+        sentiment_weights=args.sentiment,
+        topic_weights=args.topics,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        recent_bias=args.recent_bias,
+        body_words=args.body_words,
+        prefix=args.prefix,
+        batch_size=args.batch_size,
+    )
+
+
+# --- Templates --------------------------------------------------------------- #
+
+
+@dataclass
+class TemplatePool:
+    """Analysed bodies indexed by ``((sentiment * topics + topic) * lengths + length) * variants + variant``."""
+
+    bodies: List[str]
+    labels: List[str]
+    scores: List[float]
+    topics: List[List[Tuple[str, float]]]
+
+
+def build_templates(spec: CorpusSpec, rng: np.random.Generator) -> TemplatePool:
+    lexicon = POSITIVE_TERMS | NEGATIVE_TERMS | NEGATION_TERMS | INTENSIFIER_TERMS | CLAUSE_BREAK_TERMS
+    topic_terms = {term for terms in TOPIC_KEYWORDS.values() for term in terms}
+    filler = [word for word in FILLER_WORDS if word not in lexicon and word not in topic_terms]
+    sentiment_terms = {
+        "Positive": sorted(POSITIVE_TERMS - topic_terms),
+        "Neutral": [],
+        "Negative": sorted(NEGATIVE_TERMS - topic_terms),
+    }
+
+    # Topic keywords that are also sentiment terms ("slow", "fast") only go into bodies of that sentiment.
+    off_sentiment = {
+        "Positive": NEGATIVE_TERMS,
+        "Neutral": POSITIVE_TERMS | NEGATIVE_TERMS,
+        "Negative": POSITIVE_TERMS,
+    }
+    bodies: List[str] = []
+    for sentiment in SENTIMENTS:
+        for topic in spec.topics:
+            keywords = sorted(set(TOPIC_KEYWORDS.get(topic, ())) - off_sentiment[sentiment])
+            for length in BODY_LENGTHS:
+                for _ in range(TEMPLATE_VARIANTS):
+                    sentiment_count = math.ceil(length * SENTIMENT_DENSITY) if sentiment_terms[sentiment] else 0
+                    topic_count = max(1, round(length * TOPIC_DENSITY)) if keywords else 0
+                    words = list(rng.choice(filler, size=max(length - sentiment_count - topic_count, 1)))
+                    if sentiment_count:
+                        words += list(rng.choice(sentiment_terms[sentiment], size=sentiment_count))
+                    if topic_count:
+                        words += list(rng.choice(keywords, size=topic_count))
+                    rng.shuffle(words)
+                    bodies.append(" ".join(words).capitalize() + ".")
+
+    analyses = analyze_batch(bodies)
+    return TemplatePool(
+        bodies=bodies,
+        labels=[analysis["sentiment"]["label"] for analysis in analyses],
+        scores=[analysis["sentiment"]["score"] for analysis in analyses],
+        topics=[
+            [(topic["topic_label"], topic["topic_confidence"]) for topic in analysis["topics"]]
+            for analysis in analyses
+        ],
+    )
+
+
+# --- Sampling ------------------------------------------------------------------ #
+
+
+@dataclass
+class Batch:
+    offset: int
+    ids: List[uuid.UUID]
+    template: np.ndarray
+    source: np.ndarray
+    competitor: np.ndarray  # -1 for our own product
+    rating: np.ndarray
+    published_us: np.ndarray  # microseconds since the epoch
+
+
+def _probabilities(labels: Sequence[str], weights: Dict[str, float], default: float) -> np.ndarray:
+    values = np.array([weights.get(label.lower(), default) for label in labels], dtype=float)
+    if values.sum() <= 0:
+        raise SystemExit(f"At least one of {', '.join(labels)} needs a positive weight.")
+    return values / values.sum()
+
+
+def sample_batches(spec: CorpusSpec, rng: np.random.Generator) -> Iterator[Batch]:
+    topics = spec.topics
+    sentiment_p = _probabilities(SENTIMENTS, spec.sentiment_weights, 0.0)
+    topic_p = _probabilities(topics, spec.topic_weights, 1.0)
+    ranks = np.arange(1, spec.sources + 1, dtype=float)
+    source_p = ranks**-spec.source_skew / (ranks**-spec.source_skew).sum()
+    start, end = spec.window
+    start_us = int(start.timestamp() * 1_000_000)
+    span_us = int((end - start).total_seconds() * 1_000_000) - 1
+    log_lengths = np.log(BODY_LENGTHS)
+    ratings = np.array([[4.0, 5.0], [3.0, 3.0], [1.0, 2.0]])
+
+    for offset in range(0, spec.reviews, spec.batch_size):
+        size = min(spec.batch_size, spec.reviews - offset)
+        sentiment = rng.choice(len(SENTIMENTS), size=size, p=sentiment_p)
+        topic = rng.choice(len(topics), size=size, p=topic_p)
+        words = rng.lognormal(math.log(spec.body_words), 0.6, size=size)
+        length = np.abs(np.log(words)[:, None] - log_lengths[None, :]).argmin(axis=1)
+        variant = rng.integers(0, TEMPLATE_VARIANTS, size=size)
+        template = ((sentiment * len(topics) + topic) * len(BODY_LENGTHS) + length) * TEMPLATE_VARIANTS + variant
+
+        competitor = np.full(size, -1)
+        if spec.competitors:
+            about_competitor = rng.random(size) < spec.competitor_share
+            competitor[about_competitor] = rng.integers(0, spec.competitors, size=int(about_competitor.sum()))
+        # u ** (1 + bias) concentrates mass near 0, i.e. near the end of the window.
+        age = rng.random(size) ** (1.0 + spec.recent_bias)
+        raw_ids = rng.bytes(16 * size)
+        yield Batch(
+            offset=offset,
+            ids=[uuid.UUID(bytes=raw_ids[index : index + 16], version=4) for index in range(0, 16 * size, 16)],
+            template=template,
+            source=rng.choice(spec.sources, size=size, p=source_p),
+            competitor=competitor,
+            rating=ratings[sentiment, rng.integers(0, 2, size=size)],
+            published_us=start_us + span_us - (age * span_us).astype(np.int64),
+        )
+
+
+# --- Writers ------------------------------------------------------------------ #
+
+
+@dataclass
+class GenerateStats:
+    reviews: int = 0
+    topic_links: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "reviews": self.reviews,
+            "topic_links": self.topic_links,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(self.reviews / elapsed, 1),
+        }
+
+
+def _datetimes(published_us: np.ndarray) -> List[datetime]:
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return [epoch + timedelta(microseconds=value) for value in published_us.tolist()]
+
+
+def ensure_dimensions(session: Session, spec: CorpusSpec) -> Tuple[List[uuid.UUID], List[uuid.UUID]]:
+    """Create (or reuse by name) the generated sources and competitors."""
+    source_names = [f"Synthetic Source {index + 1}" for index in range(spec.sources)]
+    competitor_names = [f"Synthetic Rival {index + 1}" for index in range(spec.competitors)]
+    sources = {row.name: row for row in session.execute(select(Source).where(Source.name.in_(source_names))).scalars()}
+    competitors = {
+        row.name: row
+        for row in session.execute(select(Competitor).where(Competitor.name.in_(competitor_names))).scalars()
+    }
+    for name in source_names:
+        if name not in sources:
+            sources[name] = Source(name=name, platform="synthetic")
+            session.add(sources[name])
+    for name in competitor_names:
+        if name not in competitors:
+            competitors[name] = Competitor(name=name, tags=["synthetic"])
+            session.add(competitors[name])
+    session.flush()
+    return [sources[name].id for name in source_names], [competitors[name].id for name in competitor_names]
+
+
+def write_database(session_factory, spec: CorpusSpec, *, progress: bool = True) -> GenerateStats:
+    """Generate ``spec`` into the configured database and rebuild the rollups it touches."""
+    rng = np.random.default_rng(spec.seed)
+    pool = build_templates(spec, rng)
+    stats = GenerateStats()
+
+    with session_factory() as session:
+        first_id = f"{spec.id_prefix}-0"
+        if session.execute(select(Review.id).where(Review.source_review_id == first_id).limit(1)).first():
+            raise SystemExit(f"Reviews with prefix {spec.id_prefix!r} already exist; pass a different --prefix.")
+        was_empty = session.execute(select(Review.id).limit(1)).first() is None
+        source_ids, competitor_ids = ensure_dimensions(session, spec)
+        topic_ids = dimension_cache.topic_ids(session, {label for labels in pool.topics for label, _ in labels})
+
+    for batch in sample_batches(spec, rng):
+        review_rows, topic_rows = _rows(spec, pool, batch, source_ids, competitor_ids, topic_ids)
+        with session_factory() as session:
+            if session.get_bind().dialect.name == "postgresql":
+                _copy_rows(session, review_rows, topic_rows)
+            else:
+                session.execute(insert(Review.__table__), [dict(zip(REVIEW_COLUMNS, row)) for row in review_rows])
+                session.execute(insert(ReviewTopic.__table__), [dict(zip(TOPIC_COLUMNS, row)) for row in topic_rows])
+        stats.reviews += len(review_rows)
+        stats.topic_links += len(topic_rows)
+        if progress:
+            print(json.dumps({"progress": stats.as_dict()}), file=sys.stderr)
+
+    start, end = spec.window
+    with session_factory() as session:
+        rebuild_rollups(session, start=start.date(), end=(end - timedelta(days=1)).date())
+        if was_empty:
+            # Every review is inside the rebuilt days, so the rollups are complete.
+            mark_ready(session)
+        mark_data_changed(session)
+    return stats
+
+
+def _rows(
+    spec: CorpusSpec,
+    pool: TemplatePool,
+    batch: Batch,
+    source_ids: List[uuid.UUID],
+    competitor_ids: List[uuid.UUID],
+    topic_ids: Dict[str, uuid.UUID],
+) -> Tuple[List[tuple], List[tuple]]:
+    review_rows: List[tuple] = []
+    topic_rows: List[tuple] = []
+    published = _datetimes(batch.published_us)
+    prefix = spec.id_prefix
+    for index, (review_id, template, source, competitor, rating) in enumerate(
+        zip(
+            batch.ids,
+            batch.template.tolist(),
+            batch.source.tolist(),
+            batch.competitor.tolist(),
+            batch.rating.tolist(),
+        )
+    ):
+        review_rows.append(
+            (
+                review_id,
+                source_ids[source],
+                competitor_ids[competitor] if competitor >= 0 else None,
+                f"{prefix}-{batch.offset + index}",
+                None,
+                pool.bodies[template],
+                rating,
+                "en",
+                None,
+                pool.labels[template],
+                pool.scores[template],
+                published[index],
+            )
+        )
+        for label, confidence in pool.topics[template]:
+            topic_rows.append((review_id, topic_ids[label], label, confidence))
+    return review_rows, topic_rows
+
+
+def _copy_rows(session: Session, review_rows: List[tuple], topic_rows: List[tuple]) -> None:
+    cursor = session.connection().connection.driver_connection.cursor()
+    try:
+        with cursor.copy(f"COPY reviews ({', '.join(REVIEW_COLUMNS)}) FROM STDIN") as copy:
+            for row in review_rows:
+                copy.write_row(row)
+        with cursor.copy(f"COPY review_topics ({', '.join(TOPIC_COLUMNS)}) FROM STDIN") as copy:
+            for row in topic_rows:
+                copy.write_row(row)
+    finally:
+        cursor.close()
+
+
+def write_ndjson(path: str, spec: CorpusSpec, *, progress: bool = True) -> GenerateStats:
+    """Write ``spec`` as backfill-compatible NDJSON plus ``<path stem>.dimensions.json``."""
+    rng = np.random.default_rng(spec.seed)
+    pool = build_templates(spec, rng)
+    stats = GenerateStats()
+    id_rng = np.random.default_rng(spec.seed + 1)
+    source_ids = [uuid.UUID(bytes=id_rng.bytes(16), version=4) for _ in range(spec.sources)]
+    competitor_ids = [uuid.UUID(bytes=id_rng.bytes(16), version=4) for _ in range(spec.competitors)]
+    dimensions = {
+        "sources": [
+            {"id": str(source_id), "name": f"Synthetic Source {index + 1}", "platform": "synthetic"}
+            for index, source_id in enumerate(source_ids)
+        ],
+        "competitors": [
+            {"id": str(competitor_id), "name": f"Synthetic Rival {index + 1}", "tags": ["synthetic"]}
+            for index, competitor_id in enumerate(competitor_ids)
+        ],
+    }
+    with open(dimensions_path(path), "w", encoding="utf-8") as handle:
+        json.dump(dimensions, handle, indent=2)
+
+    bodies = [json.dumps(body) for body in pool.bodies]
+    source_values = [f'"{source_id}"' for source_id in source_ids]
+    competitor_values = [f'"{competitor_id}"' for competitor_id in competitor_ids]
+    prefix = spec.id_prefix
+    with open(path, "w", encoding="utf-8") as handle:
+        for batch in sample_batches(spec, rng):
+            timestamps = np.datetime_as_string(batch.published_us.astype("datetime64[us]"), unit="s").tolist()
+            lines = [
+                f'{{"source_id":{source_values[source]},'
+                f'"competitor_id":{competitor_values[competitor] if competitor >= 0 else "null"},'
+                f'"source_review_id":"{prefix}-{batch.offset + index}","body":{bodies[template]},'
+                f'"rating":{rating},"language":"en","published_at":"{timestamps[index]}Z"}}\n'
+                for index, (template, source, competitor, rating) in enumerate(
+                    zip(batch.template.tolist(), batch.source.tolist(), batch.competitor.tolist(), batch.rating.tolist())
+                )
+            ]
+            handle.writelines(lines)
+            stats.reviews += len(lines)
+            if progress:
+                print(json.dumps({"progress": stats.as_dict()}), file=sys.stderr)
+    return stats
+
+
+def dimensions_path(path: str) -> str:
+    stem, _ = os.path.splitext(path)
+    return f"{stem}.dimensions.json"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    spec = spec_from_args(args)
+    if spec.reviews <= 0 or spec.sources <= 0 or spec.batch_size <= 0:
+        raise SystemExit("--reviews, --sources and --batch-size must be positive.")
+    if spec.window[0] >= spec.window[1]:
+        raise SystemExit("--start-date must not be after --end-date.")
+
+    if args.output:
+        stats = write_ndjson(args.output, spec)
+    else:
+        database_url = os.environ.get("DATABASE_URL")
+        if not database_url:
+            raise SystemExit("DATABASE_URL must be set (or pass --output to write NDJSON).")
+        init_engine(database_url)
+        stats = write_database(session_scope, spec)
+    print(json.dumps(stats.as_dict()))
+
+
+if __name__ == "__main__":
+    main()
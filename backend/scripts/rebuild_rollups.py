@@ -0,0 +1,50 @@
+"""CLI to recompute the daily review/topic rollups from raw rows.
+
+Run once after creating the rollup tables on an existing database, and any
+time the rollups need repairing (for example after manual SQL edits to
+``reviews``). The rebuild runs in a single transaction.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from datetime import date
+from typing import Optional, Sequence
+
+from ..models import init_engine, session_scope
+from ..rollups import rebuild_rollups
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild daily rollup tables from reviews.")
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        help="First UTC day to rebuild (YYYY-MM-DD, default: earliest).",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        help="Last UTC day to rebuild, inclusive (YYYY-MM-DD, default: latest).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.start_date and args.end_date and args.start_date > args.end_date:
+        raise SystemExit("--start-date must not be after --end-date.")
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL must be set to rebuild rollups.")
+
+    init_engine(database_url)
+    with session_scope() as session:
+        counts = rebuild_rollups(session, start=args.start_date, end=args.end_date)
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
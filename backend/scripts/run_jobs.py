@@ -0,0 +1,62 @@
+"""CLI worker that drains the background job queue outside the web process."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import time
+
+from ..models import init_engine
+from ..jobs import run_next_job
+from ..routes import digest  # noqa: F401 - registers the digest job handler
+from ..routes import ingest  # noqa: F401 - registers the ingest job handler
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process queued background jobs.")
+    parser.add_argument(
+        "--kind",
+        action="append",
+        help="Only process jobs of this kind (repeatable, default: all registered kinds).",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds to sleep when the queue is empty (default: 2).",
+    )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Exit once the queue is empty instead of polling forever.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL must be set to run the job worker.")
+
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
+    init_engine(database_url)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:cli"
+
+    processed = 0
+    while True:
+        job_id = run_next_job(worker_id, kinds=args.kind)
+        if job_id is not None:
+            processed += 1
+            continue
+        if args.drain:
+            break
+        time.sleep(args.poll_interval)
+
+    print(f"Processed {processed} job(s).")
+
+
+if __name__ == "__main__":
+    main()
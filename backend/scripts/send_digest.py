@@ -1,17 +1,35 @@
-"""CLI helper to generate and print digest payloads."""
+"""CLI helper to generate and print digest payloads.
+
+One timeframe (``--start``/``--end``) prints a single digest as before.
+``--step`` splits the range into consecutive windows (e.g. a year of weekly
+digests) and ``--window START/END`` adds explicit timeframes; multiple
+digests are generated ``--jobs`` at a time on a thread pool, each thread with
+its own session and pooled connection, and streamed as NDJSON in window
+order. ``--persist`` stores them as ``Digest`` rows (reusing unchanged
+snapshots, like ``/digest/run``). A throughput summary goes to stderr.
+"""
 
 from __future__ import annotations
 
 import argparse
 import json
 import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..models import init_engine, session_scope
-from ..routes.digest import assemble_digest
+from ..routes.digest import assemble_digest, serialize_digest, store_digest
+
+Window = Tuple[datetime, datetime]
 
+STEP_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate digest JSON from Neon data.")
     parser.add_argument(
         "--start",
@@ -21,17 +39,35 @@ def parse_args() -> argparse.Namespace:
         "--end",
         help="ISO timestamp or date for the timeframe end (default: now).",
     )
+    parser.add_argument(
+        "--step",
+        type=parse_step,
+        help="Split --start..--end into consecutive windows of this length, e.g. 7d, 1w, 12h.",
+    )
+    parser.add_argument(
+        "--window",
+        action="append",
+        default=[],
+        metavar="START/END",
+        help="Explicit timeframe to generate; repeat for several.",
+    )
     parser.add_argument(
         "--no-competitors",
         action="store_true",
         help="Exclude competitor summary from the digest.",
     )
+    parser.add_argument(
+        "--persist",
+        action="store_true",
+        help="Store the digests in the digests table (unchanged snapshots are reused).",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Digests generated concurrently (default: 1).")
     parser.add_argument(
         "--pretty",
         action="store_true",
-        help="Pretty-print the resulting JSON.",
+        help="Pretty-print the resulting JSON (single digest only).",
     )
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def parse_timestamp(value: str) -> datetime:
@@ -43,32 +79,99 @@ def parse_timestamp(value: str) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def main() -> None:
-    args = parse_args()
-    database_url = os.environ.get("DATABASE_URL")
-    if not database_url:
-        raise SystemExit("DATABASE_URL must be set to run the digest script.")
+def parse_step(value: str) -> timedelta:
+    match = re.fullmatch(r"(\d+)([mhdw])", value.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise argparse.ArgumentTypeError(f"invalid step {value!r}; use e.g. 7d, 1w or 12h")
+    return timedelta(**{STEP_UNITS[match.group(2)]: int(match.group(1))})
 
-    init_engine(database_url)
 
-    now = datetime.now(timezone.utc)
+def plan_windows(args: argparse.Namespace, now: datetime) -> List[Window]:
+    """The timeframes to generate, in output order."""
+    windows: List[Window] = []
+    for value in args.window:
+        start, separator, end = value.partition("/")
+        if not separator:
+            raise SystemExit(f"--window {value!r} must look like START/END.")
+        windows.append((parse_timestamp(start), parse_timestamp(end)))
+    if args.window and not (args.start or args.end or args.step):
+        return _checked(windows)
+
     timeframe_end = parse_timestamp(args.end) if args.end else now
-    timeframe_start = (
-        parse_timestamp(args.start)
-        if args.start
-        else timeframe_end - timedelta(days=7)
-    )
+    timeframe_start = parse_timestamp(args.start) if args.start else timeframe_end - timedelta(days=7)
+    if not args.step:
+        return _checked(windows + [(timeframe_start, timeframe_end)])
+    cursor = timeframe_start
+    while cursor < timeframe_end:
+        windows.append((cursor, min(cursor + args.step, timeframe_end)))
+        cursor += args.step
+    return _checked(windows)
+
+
+def _checked(windows: List[Window]) -> List[Window]:
+    for start, end in windows:
+        if start >= end:
+            raise SystemExit(f"Timeframe {start.isoformat()}..{end.isoformat()} must end after it starts.")
+    return windows
 
+
+def generate(window: Window, *, include_competitors: bool, persist: bool) -> Dict[str, Any]:
+    """Build one digest in its own session (one pooled connection per worker thread)."""
+    timeframe_start, timeframe_end = window
     with session_scope() as session:
+        if persist:
+            return serialize_digest(
+                store_digest(
+                    session,
+                    timeframe_start=timeframe_start,
+                    timeframe_end=timeframe_end,
+                    include_competitors=include_competitors,
+                )
+            )
         digest = assemble_digest(
             session,
             timeframe_start=timeframe_start,
             timeframe_end=timeframe_end,
-            include_competitors=not args.no_competitors,
+            include_competitors=include_competitors,
         )
+    digest["timeframe_start"] = timeframe_start.isoformat()
+    digest["timeframe_end"] = timeframe_end.isoformat()
+    return digest
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL must be set to run the digest script.")
+    if args.jobs < 1:
+        raise SystemExit("--jobs must be at least 1.")
+
+    windows = plan_windows(args, datetime.now(timezone.utc))
+    # Each worker thread holds one connection; keep the pool at least that large.
+    init_engine(database_url, pool_size=max(5, args.jobs))
+
+    def build(window: Window) -> Dict[str, Any]:
+        return generate(window, include_competitors=not args.no_competitors, persist=args.persist)
+
+    started = time.perf_counter()
+    if len(windows) == 1 and not (args.step or args.window):
+        indent = 2 if args.pretty else None
+        print(json.dumps(build(windows[0]), indent=indent, sort_keys=bool(args.pretty)))
+    else:
+        with ThreadPoolExecutor(max_workers=min(args.jobs, len(windows)) or 1) as pool:
+            for digest in pool.map(build, windows):
+                print(json.dumps(digest), flush=True)
+    elapsed = time.perf_counter() - started
 
-    indent = 2 if args.pretty else None
-    print(json.dumps(digest, indent=indent, sort_keys=bool(args.pretty)))
+    summary = {
+        "digests": len(windows),
+        "jobs": args.jobs,
+        "persisted": args.persist,
+        "seconds": round(elapsed, 3),
+        "digests_per_second": round(len(windows) / elapsed, 2) if elapsed else None,
+    }
+    print(json.dumps(summary), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -53,32 +53,41 @@ def verify_auth_token(token: str) -> Dict[str, Any]:
     return data
 
 
+def authenticate_request(*, admin: bool = False) -> User:
+    """Resolve the active user from the request's bearer token.
+
+    Sets ``g.current_user``/``g.auth_payload``; raises 401/403 otherwise.
+    """
+    header = request.headers.get("Authorization")
+    token = extract_bearer_token(header)
+    if not token:
+        raise Unauthorized(description="Authentication required.")
+
+    payload = verify_auth_token(token)
+    user_id = payload.get("sub")
+    if not user_id:
+        raise Unauthorized(description="Invalid token payload.")
+
+    session = get_session()
+    user = session.get(User, user_id)
+    if not user or not user.is_active:
+        raise Unauthorized(description="User is not active.")
+
+    if admin and not user.is_admin:
+        raise Forbidden(description="Admin privileges required.")
+
+    g.current_user = user
+    g.auth_payload = payload
+    return user
+
+
 def require_auth(*, admin: bool = False) -> Callable[[F], F]:
     """Decorator for routes that require an authenticated (optionally admin) user."""
 
     def decorator(fn: F) -> F:
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            header = request.headers.get("Authorization")
-            token = extract_bearer_token(header)
-            if not token:
-                raise Unauthorized(description="Authentication required.")
-
-            payload = verify_auth_token(token)
-            user_id = payload.get("sub")
-            if not user_id:
-                raise Unauthorized(description="Invalid token payload.")
-
-            session = get_session()
-            user = session.get(User, user_id)
-            if not user or not user.is_active:
-                raise Unauthorized(description="User is not active.")
-
-            if admin and not user.is_admin:
-                raise Forbidden(description="Admin privileges required.")
-
-            g.current_user = user
-            g.auth_payload = payload
+            authenticate_request(admin=admin)
             return fn(*args, **kwargs)
 
         return cast(F, wrapper)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from backend import query_stats
+
+
+@pytest.fixture()
+def query_budget():
+    """Assert that a block stays within a database query budget.
+
+    Usage::
+
+        with query_budget(6, max_repeats=2) as stats:
+            client.get("/insights")
+
+    ``max_repeats`` bounds how often one statement shape may run, which
+    catches per-row (N+1) queries even when the total is within budget.
+    """
+
+    @contextmanager
+    def budget(max_queries: int, *, max_repeats: Optional[int] = None):
+        with query_stats.capture() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries exceeded the budget of {max_queries}:\n" + "\n".join(stats.statements)
+        )
+        if max_repeats is not None:
+            repeated = stats.repeated(max_repeats + 1)
+            assert not repeated, f"statements repeated more than {max_repeats} times: {repeated}"
+
+    return budget
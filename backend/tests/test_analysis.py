@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from backend.analysis import (
+    NEGATIVE_TERMS,
+    POSITIVE_TERMS,
+    TOPIC_KEYWORDS,
+    PhraseLexicon,
+    analyze_batch,
+    analyze_phrases,
+    analyze_sentiment,
+    extract_topics,
+)
+from backend.analysis_cache import AnalysisCache, cache_key
+from backend.analyzers import (
+    AnalyzerError,
+    HTTPModelAnalyzer,
+    KeywordAnalyzer,
+    MicroBatchScheduler,
+    PhraseAnalyzer,
+    configure_analyzer,
+    get_analyzer,
+)
+from backend.app import create_app
+from backend.models import AnalysisCacheEntry, Base, init_engine, session_scope
+
+SAMPLE_DATA = Path(__file__).resolve().parents[2] / "SAMPLE_DATA.json"
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    db_path = tmp_path / "analysis.db"
+    database_url = f"sqlite:///{db_path}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _corpus():
+    reviews = json.loads(SAMPLE_DATA.read_text())["reviews"]
+    pairs = [(review.get("title"), review["body"]) for review in reviews]
+
+    rng = random.Random(7)
+    vocabulary = sorted(POSITIVE_TERMS | NEGATIVE_TERMS | {k for kw in TOPIC_KEYWORDS.values() for k in kw})
+    filler = ["the", "team", "it's", "we", "really", "app", "and", "then", "123", "!!"]
+    for _ in range(300):
+        words = rng.choices(vocabulary + filler * 3, k=rng.randint(0, 40))
+        title = " ".join(rng.choices(vocabulary + filler, k=rng.randint(0, 4))) or None
+        pairs.append((title, " ".join(word.upper() if rng.random() < 0.1 else word for word in words)))
+    pairs.append((None, ""))
+    pairs.append(("", "1234 ... ???"))
+    return pairs
+
+
+def test_analyze_batch_matches_single_text_functions():
+    pairs = _corpus()
+    results = analyze_batch([body for _, body in pairs], titles=[title for title, _ in pairs])
+
+    for (title, body), result in zip(pairs, results):
+        assert result["sentiment"] == analyze_sentiment(f"{title or ''}\n{body}")
+        assert result["topics"] == extract_topics(body)
+
+
+def test_analyze_batch_without_titles_scores_text_only():
+    texts = [body for _, body in _corpus()]
+    for text, result in zip(texts, analyze_batch(texts)):
+        assert result["sentiment"] == analyze_sentiment(text)
+        assert result["topics"] == extract_topics(text)
+
+
+def test_analyze_batch_endpoint(client):
+    response = client.post("/analyze/batch", json={"texts": ["Love the fast dashboard", "Sync is broken"]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results[0]["sentiment"]["label"] == "Positive"
+    assert results[1]["topics"][0]["topic_label"] == "Integrations"
+
+    invalid = client.post("/analyze/batch", json={"texts": []})
+    assert invalid.status_code == 400
+
+
+def test_analysis_cache_hits_lru_and_persistent_tier(app):
+    cache = AnalysisCache(max_entries=2, ttl_seconds=60, persist=True)
+    calls = []
+
+    def compute(texts, titles):
+        calls.append(list(texts))
+        return analyze_batch(texts, titles)
+
+    with session_scope() as session:
+        first = cache.analyze(["Love it", "love   IT", "Slow sync"], session=session, compute=compute)
+    assert calls == [["Love it", "Slow sync"]]
+    assert first[0] == first[1] == {"sentiment": analyze_sentiment("Love it"), "topics": extract_topics("Love it")}
+
+    cache.analyze(["Email digest"], compute=compute)
+    assert cache.stats()["evictions"] == 1
+
+    with session_scope() as session:
+        again = cache.analyze(["Love it"], session=session, compute=compute)
+    assert again[0] == first[0]
+    assert len(calls) == 2
+    assert cache.stats()["persistent_hits"] == 1
+
+    cache.analyze(["Love it"], compute=compute, version="other-analyzer")
+    assert len(calls) == 3
+
+
+def test_analysis_cache_prunes_expired_and_outdated_persistent_rows(app):
+    cache = AnalysisCache(max_entries=10, ttl_seconds=60, persist=True)
+    version = get_analyzer().version()
+    result = {"sentiment": analyze_sentiment("ok"), "topics": []}
+    with session_scope() as session:
+        session.add_all(
+            [
+                AnalysisCacheEntry(
+                    cache_key=cache_key(version, "expired"),
+                    analyzer_version=version,
+                    result=result,
+                    created_at=datetime.now(timezone.utc) - timedelta(hours=1),
+                ),
+                AnalysisCacheEntry(cache_key=cache_key("old", "outdated"), analyzer_version="old", result=result),
+                AnalysisCacheEntry(cache_key=cache_key(version, "fresh"), analyzer_version=version, result=result),
+            ]
+        )
+
+    with session_scope() as session:
+        cache.analyze(["Love it"], session=session)
+    with session_scope() as session:
+        keys = set(session.execute(select(AnalysisCacheEntry.cache_key)).scalars())
+    assert keys == {cache_key(version, "fresh"), cache_key(version, "Love it")}
+    assert cache.stats()["pruned"] == 2
+
+    # Custom analyzers never prune the active analyzer's rows, and pruning is throttled.
+    with session_scope() as session:
+        cache.analyze(["Slow sync"], session=session, compute=analyze_batch, version="custom")
+    assert cache.stats()["pruned"] == 2
+
+
+@pytest.fixture()
+def model_server():
+    """Local stand-in for a remote model: answers with keyword analysis, or fails on demand."""
+    state = {"requests": [], "fail": False, "rewrite": None}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802 - http.server naming
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            state["requests"].append(len(body["items"]))
+            if state["fail"]:
+                self.send_response(503)
+                self.end_headers()
+                return
+            results = analyze_batch(
+                [item["text"] for item in body["items"]], [item["title"] for item in body["items"]]
+            )
+            if state["rewrite"]:
+                results = [state["rewrite"](result) for result in results]
+            payload = json.dumps({"results": results}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}/analyze"
+    yield state
+    server.shutdown()
+
+
+def test_micro_batching_scheduler_coalesces_concurrent_calls(model_server):
+    scheduler = MicroBatchScheduler(
+        HTTPModelAnalyzer(model_server["url"], timeout=2), max_batch_size=32, max_wait_ms=100
+    )
+    texts = [f"Love the fast dashboard {index}" for index in range(12)]
+    results = [None] * len(texts)
+
+    def call(index):
+        (results[index],) = scheduler.analyze_batch([texts[index]])
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.close()
+
+    assert sum(model_server["requests"]) == len(texts)
+    assert len(model_server["requests"]) < len(texts)
+    assert results == analyze_batch(texts)
+
+
+def test_micro_batching_scheduler_retries_then_falls_back(model_server):
+    model_server["fail"] = True
+    scheduler = MicroBatchScheduler(
+        HTTPModelAnalyzer(model_server["url"], timeout=2),
+        max_wait_ms=1,
+        max_retries=2,
+        backoff_seconds=0.01,
+    )
+    (result,) = scheduler.analyze_batch(["Support was slow"])
+    scheduler.close()
+
+    assert len(model_server["requests"]) == 3
+    assert result["degraded"] is True
+    assert result["sentiment"] == analyze_sentiment("Support was slow")
+    assert scheduler.stats["fallbacks"] == 1
+
+    cache = AnalysisCache()
+    cache.analyze(["Support was slow"], compute=lambda texts, titles: [result], version="http:test")
+    assert cache.stats()["entries"] == 0
+
+
+def test_http_analyzer_normalizes_labels_and_rejects_invalid_results(model_server):
+    model_server["rewrite"] = lambda result: {**result, "sentiment": {**result["sentiment"], "label": "positive"}}
+    backend = HTTPModelAnalyzer(model_server["url"], timeout=2)
+    (result,) = backend.analyze_batch(["Love it"])
+    assert result["sentiment"]["label"] == "Positive"
+
+    model_server["rewrite"] = lambda result: {**result, "sentiment": {"label": "Mixed", "score": 0.1}}
+    with pytest.raises(AnalyzerError, match="Mixed"):
+        backend.analyze_batch(["Love it"])
+    model_server["rewrite"] = lambda result: {**result, "sentiment": {"label": "Positive", "score": 4.2}}
+    with pytest.raises(AnalyzerError, match="score"):
+        backend.analyze_batch(["Love it"])
+
+    scheduler = MicroBatchScheduler(backend, max_wait_ms=1, max_retries=1, backoff_seconds=0.01)
+    (fallback,) = scheduler.analyze_batch(["Support was slow"])
+    scheduler.close()
+    assert fallback["degraded"] is True
+    assert fallback["sentiment"] == analyze_sentiment("Support was slow")
+
+
+def test_configure_analyzer_selects_registered_backend(model_server):
+    backend = configure_analyzer({"ANALYZER_BACKEND": "http", "ANALYZER_HTTP_URL": model_server["url"]})
+    try:
+        assert get_analyzer() is backend
+        assert backend.version() == f"http:{model_server['url']}"
+    finally:
+        configure_analyzer({"ANALYZER_BACKEND": "keyword"})
+    assert isinstance(get_analyzer(), KeywordAnalyzer)
+    with pytest.raises(RuntimeError):
+        configure_analyzer({"ANALYZER_BACKEND": "missing"})
+
+
+def test_phrase_lexicon_matches_multi_word_phrases_leftmost_longest():
+    lexicon = PhraseLexicon({"helpful": 1, "not helpful": -1}, {"Integrations": ["hubspot", "hubspot sync"]})
+    tokens = "the hubspot sync was not helpful".split()
+
+    found = {(start, end, " ".join(lexicon.phrases[index])) for start, end, index in lexicon.find(tokens)}
+    assert found == {(1, 2, "hubspot"), (1, 3, "hubspot sync"), (4, 6, "not helpful"), (5, 6, "helpful")}
+
+    result = lexicon.analyze("The HubSpot sync was not helpful")
+    assert result["sentiment"] == {"label": "Negative", "score": -0.17}
+    assert result["topics"] == [{"topic_label": "Integrations", "topic_confidence": 0.67}]
+
+
+def test_phrase_lexicon_applies_negation_and_intensifier_windows():
+    lexicon = PhraseLexicon({"fast": 1, "slow": -1}, {})
+
+    assert lexicon.analyze("fast")["sentiment"]["score"] == 1.0
+    assert lexicon.analyze("not really fast")["sentiment"]["score"] == -0.5
+    assert lexicon.analyze("it is very fast")["sentiment"]["score"] == 0.38
+    # Negation does not cross a clause break or reach past its window.
+    assert lexicon.analyze("not great but fast")["sentiment"]["score"] == 0.25
+    assert lexicon.analyze("never mind the setup fast")["sentiment"]["score"] == 0.2
+    # A negator only affects the next match.
+    assert lexicon.analyze("not slow fast")["sentiment"]["score"] == 0.67
+
+
+def test_phrase_lexicon_results_do_not_depend_on_unrelated_entries():
+    texts = [body for _, body in _corpus()]
+    baseline = analyze_phrases(texts)
+
+    rng = random.Random(11)
+    sentiment = {"too slow": -1.0, "works great": 1.0}
+    sentiment.update({term: 1.0 for term in POSITIVE_TERMS})
+    sentiment.update({term: -1.0 for term in NEGATIVE_TERMS - POSITIVE_TERMS})
+    for _ in range(5000):
+        sentiment["zz" + " ".join(rng.choice("qwxyz") * rng.randint(2, 6) for _ in range(2))] = 1.0
+    topics = {label: set(keywords) for label, keywords in TOPIC_KEYWORDS.items()}
+    topics["Integrations"] |= {"hubspot sync", "salesforce sync", "csv export"}
+    topics["Email Digests"] |= {"weekly digest", "daily email"}
+    topics["Support Response"] |= {"customer support", "response time"}
+    topics["Performance"] |= {"load time", "too slow"}
+
+    assert PhraseLexicon(sentiment, topics).analyze_batch(texts) == baseline
+
+
+def test_configure_analyzer_loads_phrase_lexicon_file(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps({"negative": ["too slow"], "topics": {"Performance": ["load time"]}}))
+    backend = configure_analyzer({"ANALYZER_BACKEND": "phrase", "ANALYZER_PHRASE_LEXICON": str(path)})
+    try:
+        assert isinstance(backend, PhraseAnalyzer)
+        (result,) = backend.analyze_batch(["Load time is too slow"])
+        assert result["sentiment"]["label"] == "Negative"
+        assert result["topics"] == [{"topic_label": "Performance", "topic_confidence": 0.7}]
+    finally:
+        configure_analyzer({"ANALYZER_BACKEND": "keyword"})
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+
+from backend.scripts import benchmark_analyzer, benchmark_endpoints
+
+
+def test_endpoint_benchmark_records_baseline_and_flags_regressions(monkeypatch, tmp_path, capsys):
+    database_url = f"sqlite:///{tmp_path / 'bench.db'}"
+    baseline = tmp_path / "baseline.json"
+    for name, value in (
+        ("DATABASE_URL", database_url),
+        ("ALLOWED_ORIGIN", "http://localhost"),
+        ("AUTH_TOKEN_SECRET", "test-secret-key"),
+        ("TOKEN_DIGEST_RUN", "bench-token"),
+        ("JOB_WORKERS", "0"),
+        ("INSIGHTS_CACHE_ENABLED", "false"),
+    ):
+        monkeypatch.setenv(name, value)
+    args = ["--reviews", "300", "--iterations", "3", "--warmup", "0", "--baseline", str(baseline)]
+
+    assert benchmark_endpoints.main([*args, "--write-baseline"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert set(report["results"]) == set(benchmark_endpoints.SCENARIOS)
+    assert all(result["errors"] == 0 for result in report["results"].values())
+    assert report["results"]["ingest"]["items_per_second"] > report["results"]["ingest"]["requests_per_second"]
+
+    recorded = json.loads(baseline.read_text())
+    assert set(recorded["300"]["insights"]) == {"p50_ms", "p95_ms", "p99_ms", "requests_per_second"}
+    recorded["300"]["insights"].update(p50_ms=0.001, p95_ms=0.001)
+    baseline.write_text(json.dumps(recorded))
+
+    assert benchmark_endpoints.main([*args, "--only", "insights"]) == 1
+    regressions = json.loads(capsys.readouterr().out)["regressions"]
+    assert regressions and all(line.startswith("insights: p") for line in regressions)
+
+
+def test_analyzer_benchmark_reports_every_case_and_flags_regressions(tmp_path, capsys):
+    args = ["--reviews", "20", "--lengths", "5", "40", "--repeat", "1", "--lexicon-sizes", "500"]
+    output = tmp_path / "analyzers.json"
+
+    assert benchmark_analyzer.main([*args, "--output", str(output)]) == 0
+    report = json.loads(capsys.readouterr().out)
+    cases = {row["case"] for row in report["results"]}
+    assert {"tokenize", "analyze_sentiment", "extract_topics", "analyze_batch", "phrase[lexicon=500]"} <= cases
+    assert "backend:keyword" in cases
+    assert {(row["corpus"], row["words"]) for row in report["results"]} == {
+        (corpus, words) for corpus in benchmark_analyzer.CORPORA for words in (5, 40)
+    }
+    assert all(row["reviews_per_second"] > 0 and row["peak_bytes_per_review"] >= 0 for row in report["results"])
+
+    previous = json.loads(output.read_text())
+    for row in previous["results"]:
+        row["reviews_per_second"] *= 1000
+    output.write_text(json.dumps(previous))
+    assert benchmark_analyzer.main([*args, "--compare", str(output)]) == 1
+    assert json.loads(capsys.readouterr().out)["regressions"]
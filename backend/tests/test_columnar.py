@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, text
+
+from backend import response_cache as response_cache_module
+from backend import rollups
+from backend.app import create_app
+from backend.columnar import columnar_store
+from backend.models import Base, Competitor, Review, ReviewTopic, Source, init_engine, session_scope, upsert_topic
+from backend.response_cache import response_cache
+from backend.routes.digest import assemble_digest, data_fingerprint
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'columnar.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("INSIGHTS_CACHE_ENABLED", "false")
+    monkeypatch.setenv("COLUMNAR_CACHE_ENABLED", "true")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    rollups.ready_state.clear()
+    application = create_app()
+    yield application
+    columnar_store.configure(enabled=False)
+    rollups.ready_state.clear()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _ingest(client, source_id, count, prefix="r"):
+    bodies = [
+        "Love the dashboard charts, so fast",
+        "Support response was slow and the sync is broken",
+        "Email digest summary is great",
+        "The mobile app is slow",
+    ]
+    reviews = [
+        {
+            "source_review_id": f"{prefix}-{index}",
+            "body": bodies[index % len(bodies)],
+            "published_at": (datetime(2025, 3, 1, 6, tzinfo=timezone.utc) + timedelta(hours=9 * index)).isoformat(),
+        }
+        for index in range(count)
+    ]
+    response = client.post("/ingest", json={"source_id": str(source_id), "reviews": reviews})
+    assert response.status_code == 202
+
+
+def _seed(client):
+    _ingest(client, uuid.uuid4(), 12)
+    with session_scope() as session:
+        competitor = Competitor(name="Rival")
+        source = Source(name="G2")
+        session.add_all([competitor, source])
+        session.flush()
+        for index, (label, score) in enumerate([("Negative", "-0.40"), ("Positive", "0.60")]):
+            review = Review(
+                source_id=source.id,
+                competitor_id=competitor.id,
+                source_review_id=f"c-{index}",
+                body="Rival dashboard",
+                sentiment_label=label,
+                sentiment_score=Decimal(score),
+                published_at=datetime(2025, 3, 2, 12 + index, tzinfo=timezone.utc),
+            )
+            session.add(review)
+            session.flush()
+            topic = upsert_topic(session, "Dashboard UX")
+            session.add(
+                ReviewTopic(
+                    review_id=review.id,
+                    topic_id=topic.id,
+                    topic_label=topic.topic_label,
+                    topic_confidence=Decimal("0.700"),
+                )
+            )
+    return competitor.id
+
+
+def _answers(client, competitor_id):
+    start = datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+    end = datetime(2025, 3, 4, 3, tzinfo=timezone.utc)
+    with session_scope() as session:
+        digest = assemble_digest(session, timeframe_start=start, timeframe_end=end)
+        digest["data_fingerprint"] = data_fingerprint(session, timeframe_start=start, timeframe_end=end)
+    insights = [
+        client.get(f"/insights{query}").get_json()
+        for query in ("", "?start_date=2025-03-02&end_date=2025-03-03", "?sentiment=Negative")
+    ]
+    for payload in insights:
+        payload.pop("recent_reviews")
+    comparison = client.get(f"/competitors/{competitor_id}/comparison?start_date=2025-03-01").get_json()
+    comparison["top_topics"].sort(key=lambda item: item["topic_label"])
+    return insights, comparison, digest
+
+
+def test_columnar_answers_match_sql(app, client):
+    competitor_id = _seed(client)
+
+    with session_scope() as session:
+        snapshot = columnar_store.snapshot(session)
+    assert snapshot is not None and snapshot.size == 14
+    from_columns = _answers(client, competitor_id)
+
+    columnar_store.configure(enabled=False)
+    from_sql = _answers(client, competitor_id)
+    assert from_columns == from_sql
+    assert from_columns[0][0]["pagination"]["total_items"] == 14
+
+
+def test_columnar_appends_inserts_and_resyncs_after_edits(app, client):
+    _seed(client)
+    with session_scope() as session:
+        before = columnar_store.snapshot(session)
+
+    _ingest(client, uuid.uuid4(), 3, prefix="late")
+    with session_scope() as session:
+        appended = columnar_store.snapshot(session)
+    assert appended.size == before.size + 3
+    assert before.size == 14, "earlier snapshots are not mutated by appends"
+
+    with session_scope() as session:
+        review = session.execute(select(Review).where(Review.source_review_id == "late-0")).scalar_one()
+        review.sentiment_label = "Negative"
+        review.sentiment_score = Decimal("-0.90")
+    with session_scope() as session:
+        edited = columnar_store.snapshot(session)
+        assert edited.sentiment_counts(edited.mask())["Negative"][1] == pytest.approx(
+            float(session.execute(text("SELECT SUM(sentiment_score) FROM reviews WHERE sentiment_label = 'Negative'")).scalar())
+        )
+
+    # Raw SQL bypasses the change listeners; the periodic consistency check catches it.
+    with session_scope() as session:
+        session.execute(text("DELETE FROM review_topics"))
+        session.execute(text("DELETE FROM reviews WHERE source_review_id LIKE 'late-%'"))
+    columnar_store.verify_seconds = 0
+    with session_scope() as session:
+        resynced = columnar_store.snapshot(session)
+    assert resynced.size == 14
+    assert resynced.topic_counts(resynced.mask()) == {}
+
+
+def test_columnar_cache_disables_itself_past_max_rows(app, client):
+    _seed(client)
+    columnar_store.configure(enabled=True, max_rows=5)
+    with session_scope() as session:
+        assert columnar_store.snapshot(session) is None
+    assert columnar_store.enabled is False
+    assert client.get("/insights").get_json()["pagination"]["total_items"] == 14
+
+
+def test_snapshot_catches_up_with_commits_from_other_workers(app, client, monkeypatch, tmp_path):
+    response_cache.configure(enabled=True, path=str(tmp_path / "responses.sqlite3"))
+    _ingest(client, uuid.uuid4(), 1)
+    first = client.get("/insights")
+    assert first.headers["X-Cache"] == "MISS" and first.get_json()["pagination"]["total_items"] == 1
+
+    # Another worker's commit bumps the shared generation but never reaches this process's listeners.
+    monkeypatch.setattr(response_cache_module, "_data_change_listeners", [])
+    _ingest(client, uuid.uuid4(), 2, prefix="other")
+
+    refreshed = client.get("/insights")
+    body = refreshed.get_json()
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert body["pagination"]["total_items"] == 3 == len(body["recent_reviews"])
+    assert sum(item["review_count"] for item in body["source_breakdown"]) == 3
+    cached = client.get("/insights")
+    assert cached.headers["X-Cache"] == "HIT" and cached.get_json() == body
+
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    with session_scope() as session:
+        digest = assemble_digest(session, timeframe_start=start, timeframe_end=start + timedelta(days=7))
+    assert digest["key_metrics"]["total_reviews"] == 3
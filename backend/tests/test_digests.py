@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from backend.app import create_app
+from backend.jobs import run_next_job
+from backend.models import Base, Digest, ReviewTopic, init_engine, session_scope
+from backend.routes.digest import DIGEST_FORMAT_VERSION
+from backend.scripts import send_digest
+
+AUTH = {"Authorization": "Bearer test-token"}
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'digests.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("INSIGHTS_CACHE_ENABLED", "false")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _ingest(client, review_id, published_at):
+    payload = {
+        "source_id": "11111111-1111-1111-1111-111111111111",
+        "reviews": [
+            {"source_review_id": review_id, "body": "Love the dashboard charts", "published_at": published_at.isoformat()}
+        ],
+    }
+    assert client.post("/ingest", json=payload).status_code == 202
+
+
+def _run(client, week, **extra):
+    body = {
+        "timeframe_start": (START + timedelta(days=7 * week)).isoformat(),
+        "timeframe_end": (START + timedelta(days=7 * week + 7)).isoformat(),
+        **extra,
+    }
+    response = client.post("/digest/run", json=body, headers=AUTH)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_digest_run_reuses_a_snapshot_until_the_data_changes(client):
+    _ingest(client, "r-1", START + timedelta(days=1))
+    first = _run(client, 0)
+    assert first["key_metrics"]["total_reviews"] == 1
+    assert first["key_metrics"]["total_reviews_change"] is None
+    assert first["key_metrics"]["average_sentiment_change"] is None
+    assert "Review volume: no reviews in the previous period." in first["highlights"]
+    assert first["topic_spotlight"] and all(topic["change_vs_previous"] is None for topic in first["topic_spotlight"])
+
+    assert _run(client, 0) == first
+    assert _run(client, 0, include_competitors=False)["digest_id"] != first["digest_id"]
+
+    _ingest(client, "r-2", START + timedelta(days=2))
+    refreshed = _run(client, 0)
+    assert refreshed["digest_id"] != first["digest_id"]
+    assert refreshed["key_metrics"]["total_reviews"] == 2
+
+
+def test_digest_run_regenerates_after_retagging_or_a_format_change(client):
+    _ingest(client, "r-1", START + timedelta(days=1))
+    first = _run(client, 0)
+    with session_scope() as session:
+        for link in session.execute(select(ReviewTopic)).scalars():
+            link.topic_confidence = Decimal("0.123")
+    retagged = _run(client, 0)
+    assert retagged["digest_id"] != first["digest_id"]
+    assert _run(client, 0)["digest_id"] == retagged["digest_id"]
+
+    with session_scope() as session:
+        digest = session.execute(select(Digest).where(Digest.id == uuid.UUID(retagged["digest_id"]))).scalar_one()
+        fingerprint = dict(digest.summary["data_fingerprint"], format=DIGEST_FORMAT_VERSION - 1)
+        digest.summary = dict(digest.summary, data_fingerprint=fingerprint)
+    assert _run(client, 0)["digest_id"] != retagged["digest_id"]
+
+
+def test_digest_history_is_served_from_stored_snapshots(client):
+    _ingest(client, "r-1", START + timedelta(days=1))
+    runs = [_run(client, week) for week in range(5)]
+
+    stored = client.get(f"/digests/{runs[0]['digest_id']}")
+    assert stored.status_code == 200 and stored.get_json() == runs[0]
+    assert client.get("/digests/00000000-0000-0000-0000-000000000000").status_code == 404
+
+    first_page = client.get("/digests?page_size=2&cursor=").get_json()
+    assert first_page["pagination"]["total_items"] == 5
+    seen = [item["digest_id"] for item in first_page["items"]]
+    cursor = first_page["pagination"]["next_cursor"]
+    while cursor:
+        page = client.get(f"/digests?page_size=2&cursor={cursor}").get_json()
+        seen.extend(item["digest_id"] for item in page["items"])
+        cursor = page["pagination"]["next_cursor"]
+    assert seen == [run["digest_id"] for run in reversed(runs)]
+    assert "competitor_summary" not in first_page["items"][0]
+
+    window = {"start": (START + timedelta(days=7)).isoformat(), "end": (START + timedelta(days=21)).isoformat()}
+    filtered = client.get("/digests", query_string=window).get_json()
+    assert [item["digest_id"] for item in filtered["items"]] == [runs[2]["digest_id"], runs[1]["digest_id"]]
+    assert client.get("/digests?start=yesterday").status_code == 400
+
+
+def test_send_digest_generates_windows_in_parallel(client, capsys):
+    for day in range(0, 28, 3):
+        _ingest(client, f"r-{day}", START + timedelta(days=day, hours=5))
+    args = ["--start", START.isoformat(), "--end", (START + timedelta(days=28)).isoformat(), "--step", "7d"]
+
+    send_digest.main([*args, "--jobs", "3", "--persist"])
+    captured = capsys.readouterr()
+    persisted = [json.loads(line) for line in captured.out.splitlines()]
+    assert [digest["timeframe_start"] for digest in persisted] == [
+        (START + timedelta(days=7 * week)).isoformat() for week in range(4)
+    ]
+    assert sum(digest["key_metrics"]["total_reviews"] for digest in persisted) == 10
+    summary = json.loads(captured.err.strip().splitlines()[-1])
+    assert summary["digests"] == 4 and summary["digests_per_second"] > 0
+
+    listed = client.get("/digests").get_json()["items"]
+    assert sorted(item["digest_id"] for item in listed) == sorted(digest["digest_id"] for digest in persisted)
+    send_digest.main([*args, "--jobs", "2", "--persist"])
+    assert [json.loads(line)["digest_id"] for line in capsys.readouterr().out.splitlines()] == [
+        digest["digest_id"] for digest in persisted
+    ]
+
+    window = f"{START.isoformat()}/{(START + timedelta(days=7)).isoformat()}"
+    send_digest.main(["--window", window, "--window", window, "--jobs", "2", "--no-competitors"])
+    streamed = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(streamed) == 2 and streamed[0]["key_metrics"] == persisted[0]["key_metrics"]
+    assert streamed[0]["competitor_summary"] == []
+
+
+def test_async_digest_is_generated_by_a_worker(client):
+    _ingest(client, "r-1", START + timedelta(days=1))
+    body = {"timeframe_start": START.isoformat(), "timeframe_end": (START + timedelta(days=7)).isoformat()}
+
+    response = client.post("/digest/run", json=body, headers={**AUTH, "Prefer": "respond-async"})
+    assert response.status_code == 202
+    queued = response.get_json()
+    assert queued["status"] == "queued" and response.headers["Location"] == queued["status_url"]
+    assert client.get("/digests").get_json()["items"] == []
+    assert client.get(queued["status_url"]).status_code == 401
+    assert client.get(queued["status_url"], headers=AUTH).get_json()["status"] == "queued"
+
+    assert str(run_next_job("test-worker")) == queued["job_id"]
+    finished = client.get(queued["status_url"], headers=AUTH).get_json()
+    assert finished["status"] == "succeeded"
+    digest = client.get(finished["result"]["digest_url"]).get_json()
+    assert digest["digest_id"] == finished["result"]["digest_id"]
+    assert digest["key_metrics"]["total_reviews"] == 1
+    assert _run(client, 0)["digest_id"] == digest["digest_id"]
+
+    assert client.get(f"/digest/jobs/{uuid.uuid4()}", headers=AUTH).status_code == 404
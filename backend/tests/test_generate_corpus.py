@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import func, select
+
+from backend.models import Base, Review, ReviewDailyRollup, ReviewTopic, init_engine, session_scope
+from backend.scripts import generate_corpus
+from backend.scripts.generate_corpus import CorpusSpec, write_database
+
+
+def test_generated_corpus_follows_the_requested_distributions(monkeypatch, tmp_path):
+    engine = init_engine(f"sqlite:///{tmp_path / 'corpus.db'}")
+    Base.metadata.create_all(bind=engine)
+    spec = CorpusSpec(
+        reviews=3000,
+        sources=4,
+        competitors=2,
+        competitor_share=0.5,
+        sentiment_weights={"positive": 0.2, "negative": 0.8},
+        topic_weights={"performance": 5},
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 1, 31),
+        batch_size=1000,
+    )
+    stats = write_database(session_scope, spec, progress=False)
+    assert stats.reviews == 3000
+
+    with session_scope() as session:
+        labels = Counter(dict(session.execute(select(Review.sentiment_label, func.count()).group_by(Review.sentiment_label)).all()))
+        topics = Counter(dict(session.execute(select(ReviewTopic.topic_label, func.count()).group_by(ReviewTopic.topic_label)).all()))
+        competitor_reviews = session.execute(select(func.count()).where(Review.competitor_id.is_not(None))).scalar()
+        first, last = session.execute(select(func.min(Review.published_at), func.max(Review.published_at))).one()
+        rolled_up = session.execute(select(func.sum(ReviewDailyRollup.review_count))).scalar()
+
+    assert labels["Neutral"] == 0 and 0.75 < labels["Negative"] / 3000 < 0.85
+    assert topics.most_common(1)[0][0] == "Performance"
+    assert 0.45 < competitor_reviews / 3000 < 0.55
+    assert first.date() >= date(2025, 1, 1) and last.date() <= date(2025, 1, 31)
+    assert rolled_up == 3000
+
+
+def test_ndjson_output_is_reproducible(tmp_path, capsys):
+    paths = [tmp_path / "first.ndjson", tmp_path / "second.ndjson"]
+    for path in paths:
+        generate_corpus.main(["--reviews", "500", "--seed", "3", "--end-date", "2025-06-30", "--output", str(path)])
+    assert paths[0].read_text() == paths[1].read_text()
+
+    records = [json.loads(line) for line in paths[0].read_text().splitlines()]
+    dimensions = json.loads((tmp_path / "first.dimensions.json").read_text())
+    assert len(records) == 500
+    assert {record["source_id"] for record in records} <= {source["id"] for source in dimensions["sources"]}
+    assert all(record["published_at"].endswith("Z") and record["body"] for record in records)
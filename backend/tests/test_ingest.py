@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, event, func, select
+
+from backend import models
+from backend.app import create_app
+from backend.dimensions import dimension_cache
+from backend.jobs import run_next_job
+from backend.scripts import backfill
+from backend.models import (
+    Base,
+    Review,
+    ReviewTopic,
+    Source,
+    Topic,
+    get_session,
+    init_engine,
+    session_scope,
+)
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    db_path = tmp_path / "ingest.db"
+    database_url = f"sqlite:///{db_path}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _review(review_id: str, body: str, title: str | None = None) -> dict:
+    return {
+        "source_review_id": review_id,
+        "title": title,
+        "body": body,
+        "rating": 4,
+        "published_at": "2025-03-01T12:00:00Z",
+    }
+
+
+def test_ingest_dedupes_within_batch_and_against_database(client):
+    source_id = str(uuid.uuid4())
+    payload = {
+        "source_id": source_id,
+        "source_metadata": {"name": "App Store", "platform": "app_store"},
+        "reviews": [
+            _review("r-1", "Love the dashboard charts, so fast", title="Great"),
+            _review("r-2", "Support response was slow and the sync is broken"),
+            _review("r-1", "Duplicate inside the same batch"),
+        ],
+    }
+
+    response = client.post("/ingest", json=payload)
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["ingested_count"] == 2
+    assert body["duplicate_count"] == 1
+    assert len(body["review_ids"]) == 2
+
+    with session_scope() as session:
+        first = session.get(Review, uuid.UUID(body["review_ids"][0]))
+        assert first.source_review_id == "r-1"
+        assert first.sentiment_label == "Positive"
+        labels = set(session.execute(select(ReviewTopic.topic_label)).scalars())
+        assert {"Dashboard UX", "Performance", "Support Response", "Integrations"} <= labels
+
+    repeat = client.post("/ingest", json=payload)
+    assert repeat.status_code == 202
+    repeat_body = repeat.get_json()
+    assert repeat_body["ingested_count"] == 0
+    assert repeat_body["duplicate_count"] == 3
+    assert repeat_body["review_ids"] == []
+
+
+def test_ingest_reuses_existing_topics(client):
+    source_id = str(uuid.uuid4())
+    for batch in (["a-1", "a-2"], ["a-3"]):
+        response = client.post(
+            "/ingest",
+            json={
+                "source_id": source_id,
+                "reviews": [_review(review_id, "Email digest summary") for review_id in batch],
+            },
+        )
+        assert response.status_code == 202
+
+    with session_scope() as session:
+        topic_count = session.execute(
+            select(func.count()).select_from(Topic).where(Topic.topic_label == "Email Digests")
+        ).scalar_one()
+        link_count = session.execute(select(func.count()).select_from(ReviewTopic)).scalar_one()
+    assert topic_count == 1
+    assert link_count == 3
+
+
+def test_ingest_rejects_invalid_payload(client):
+    response = client.post("/ingest", json={"source_id": "not-a-uuid", "reviews": []})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "validation_error"
+
+
+def test_dimension_cache_publishes_topics_only_after_commit(app, query_budget):
+    session = get_session()
+    resolved = dimension_cache.topic_ids(session, ["Rolled Back Topic"])
+    assert "Rolled Back Topic" in resolved
+    session.rollback()
+    session.close()
+    with session_scope() as session:
+        again = dimension_cache.topic_ids(session, ["Rolled Back Topic"])["Rolled Back Topic"]
+        stored = session.execute(select(Topic.id).where(Topic.topic_label == "Rolled Back Topic")).scalar_one()
+    assert again == stored != resolved["Rolled Back Topic"]
+
+    with session_scope() as session:
+        committed = dimension_cache.topic_ids(session, ["Committed Topic"])
+    with query_budget(0), session_scope() as session:
+        assert dimension_cache.topic_ids(session, ["Committed Topic"]) == committed
+
+
+def test_ingest_recovers_after_a_cached_source_is_deleted_elsewhere(client):
+    @event.listens_for(models.engine, "connect")
+    def enforce_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    models.engine.dispose()
+    source_id = str(uuid.uuid4())
+    payload = {"source_id": source_id, "reviews": [_review("fk-1", "The mobile app is slow")]}
+    assert client.post("/ingest", json=payload).status_code == 202
+    with session_scope() as session:
+        session.execute(delete(Source).where(Source.id == uuid.UUID(source_id)))
+        session.execute(delete(Topic))
+
+    assert client.post("/ingest", json=payload).status_code == 500
+    response = client.post("/ingest", json=payload)
+    assert response.status_code == 202 and response.get_json()["ingested_count"] == 1
+    event.remove(models.engine, "connect", enforce_foreign_keys)
+
+
+def test_ndjson_stream_commits_in_chunks(client):
+    source_id = str(uuid.uuid4())
+    lines = [json.dumps({"source_id": source_id, "source_metadata": {"name": "Export"}})]
+    for index in range(5):
+        lines.append(json.dumps(_review(f"n-{index}", "The mobile app is slow")))
+    lines.insert(3, "{not json")
+    lines.append(json.dumps(_review("n-0", "Repeat of the first review")))
+    body = "\n".join(lines) + "\n"
+
+    response = client.post(
+        "/ingest?chunk_size=3",
+        data=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 202
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    chunks, summary = events[:-1], events[-1]
+    assert [chunk["chunk"] for chunk in chunks] == [1, 2, 3]
+    assert chunks[0]["rejected"][0]["line"] == 4
+    assert summary["done"] is True
+    assert summary["ingested_count"] == 5
+    assert summary["duplicate_count"] == 1
+    assert summary["rejected_count"] == 1
+
+    with session_scope() as session:
+        assert session.execute(select(func.count()).select_from(Review)).scalar_one() == 5
+
+
+def test_ndjson_stream_requires_envelope(client):
+    response = client.post(
+        "/ingest",
+        data=json.dumps(_review("x-1", "No envelope")) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+
+
+def test_async_ingest_queues_job_and_reports_status(client):
+    payload = {
+        "source_id": str(uuid.uuid4()),
+        "reviews": [_review("j-1", "Great integration"), _review("j-2", "Slow digest email")],
+    }
+    response = client.post("/ingest", json=payload, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["status"] == "queued"
+    assert response.headers["Location"] == body["status_url"]
+
+    with session_scope() as session:
+        assert session.execute(select(func.count()).select_from(Review)).scalar_one() == 0
+
+    queued = client.get(body["status_url"]).get_json()
+    assert queued["status"] == "queued"
+
+    assert str(run_next_job("test-worker")) == body["job_id"]
+    assert run_next_job("test-worker") is None
+
+    finished = client.get(body["status_url"]).get_json()
+    assert finished["status"] == "succeeded"
+    assert finished["attempts"] == 1
+    assert finished["result"]["ingested_count"] == 2
+
+    missing = client.get(f"/ingest/jobs/{uuid.uuid4()}")
+    assert missing.status_code == 404
+
+
+def test_backfill_cli_loads_ndjson_with_fallback_loader(app, tmp_path):
+    source_id = uuid.uuid4()
+    path = tmp_path / "history.ndjson"
+    rows = [_review(f"b-{index}", "Support response was helpful") for index in range(7)]
+    rows.append(_review("b-0", "Duplicate of the first line"))
+    rows.append({"source_review_id": "b-bad", "body": ""})
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+
+    args = backfill.parse_args([str(path), "--source-id", str(source_id), "--batch-size", "3", "--workers", "1"])
+    stats = backfill.run_backfill(args).as_dict()
+
+    assert stats["read"] == 9
+    assert stats["inserted"] == 7
+    assert stats["duplicates"] == 1
+    assert stats["rejected"] == 1
+    with session_scope() as session:
+        assert session.execute(select(func.count()).select_from(ReviewTopic)).scalar_one() == 7
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
+from backend import pagination
+from backend.aggregation import _aggregate_statement
 from backend.app import create_app
 from backend.models import (
     Base,
+    Competitor,
     Review,
     ReviewTopic,
     Source,
@@ -25,6 +29,7 @@ def app(monkeypatch, tmp_path):
     monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
     monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
     monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("INSIGHTS_CACHE_PATH", str(tmp_path / "response-cache.sqlite3"))
 
     engine = init_engine(database_url)
     Base.metadata.create_all(bind=engine)
@@ -90,3 +95,117 @@ def test_insights_empty_dataset(app, client):
     assert payload["sentiment_trend"] == []
     assert payload["topic_distribution"] == []
     assert payload["source_breakdown"] == []
+
+
+def _seed_many_reviews(count: int):
+    with session_scope() as session:
+        source = Source(name="Play Store", platform="google_play")
+        session.add(source)
+        session.flush()
+        base = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        for index in range(count):
+            session.add(
+                Review(
+                    source_id=source.id,
+                    source_review_id=f"p-{index}",
+                    body=f"Review number {index}",
+                    sentiment_label="Neutral",
+                    sentiment_score=Decimal("0.00"),
+                    # Groups of three share a timestamp to exercise the id tie-breaker.
+                    published_at=base + timedelta(hours=index // 3),
+                )
+            )
+
+
+def test_insights_cursor_pagination_walks_every_review_once(app, client):
+    _seed_many_reviews(20)
+
+    offset_ids = []
+    for page in (1, 2, 3):
+        body = client.get(f"/insights?page={page}&page_size=7").get_json()
+        offset_ids.extend(review["review_id"] for review in body["recent_reviews"])
+
+    cursor_ids = []
+    url = "/insights?page_size=7&count_mode=none"
+    while url:
+        body = client.get(url).get_json()
+        assert body["pagination"]["total_items"] is None
+        cursor_ids.extend(review["review_id"] for review in body["recent_reviews"])
+        cursor = body["pagination"]["next_cursor"]
+        url = f"/insights?page_size=7&count_mode=none&cursor={cursor}" if cursor else None
+
+    assert len(cursor_ids) == 20
+    assert cursor_ids == offset_ids
+
+
+def test_insights_aggregates_come_from_one_statement(app, client, query_budget):
+    _seed_basic_reviews()
+    _seed_many_reviews(20)
+
+    # Page of reviews, their topics (one batched load) and the combined aggregate.
+    with query_budget(3, max_repeats=1) as stats:
+        body = client.get("/insights?page_size=5").get_json()
+
+    assert sum("count(" in statement.lower() for statement in stats.statements) == 0
+    assert sum("filtered" in statement for statement in stats.statements) == 1
+    total = body["pagination"]["total_items"]
+    assert total == 21
+    assert sum(item["review_count"] for item in body["source_breakdown"]) == total
+    assert sum(day["positive"] + day["neutral"] + day["negative"] for day in body["sentiment_trend"]) == total
+    assert body["topic_distribution"] == [
+        {"topic_label": "Dashboard UX", "review_count": 1, "average_confidence": 0.9}
+    ]
+
+    compiled = str(_aggregate_statement("postgresql", [], None).compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS" in compiled
+
+
+def test_insights_capped_count_and_invalid_cursor(app, client, monkeypatch):
+    _seed_many_reviews(12)
+    monkeypatch.setattr(pagination, "COUNT_CAP", 5)
+
+    capped = client.get("/insights?count_mode=capped").get_json()["pagination"]
+    assert capped["total_items"] == 5
+    assert capped["total_items_exact"] is False
+    exact = client.get("/insights").get_json()["pagination"]
+    assert exact["total_items"] == 12
+    assert exact["total_items_exact"] is True
+
+    assert client.get("/insights?cursor=not-a-cursor").status_code == 400
+    assert client.get("/insights?count_mode=sometimes").status_code == 400
+
+
+def test_competitors_cursor_pagination(app, client):
+    with session_scope() as session:
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for index in range(5):
+            session.add(Competitor(name=f"Rival {index}", created_at=base + timedelta(days=index)))
+
+    first = client.get("/competitors?page_size=2").get_json()
+    assert [item["name"] for item in first["items"]] == ["Rival 4", "Rival 3"]
+    cursor = first["pagination"]["next_cursor"]
+    second = client.get(f"/competitors?page_size=2&cursor={cursor}").get_json()
+    assert [item["name"] for item in second["items"]] == ["Rival 2", "Rival 1"]
+    assert second["pagination"]["total_items"] == 5
+
+
+def test_insights_response_cache_serves_hits_without_database(app, client, query_budget):
+    _seed_basic_reviews()
+
+    first = client.get("/insights?page_size=25")
+    assert first.headers["X-Cache"] == "MISS"
+    assert "stale-while-revalidate=" in first.headers["Cache-Control"]
+    etag = first.headers["ETag"]
+
+    with query_budget(0):
+        second = client.get("/insights?page=1&page_size=25")
+        not_modified = client.get("/insights", headers={"If-None-Match": etag})
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert not_modified.status_code == 304
+
+    _seed_many_reviews(1)
+    refreshed = client.get("/insights", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert refreshed.get_json()["pagination"]["total_items"] == 2
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from backend import jobs, models
+from backend.app import create_app
+from backend.models import Base, Job, Review, init_engine, session_scope
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _queue_ingest(client) -> str:
+    review = {"source_review_id": "j-1", "body": "Great integration", "published_at": "2025-03-01T12:00:00Z"}
+    payload = {"source_id": str(uuid.uuid4()), "reviews": [review]}
+    response = client.post("/ingest", json=payload, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    return response.get_json()["job_id"]
+
+
+def _review_count() -> int:
+    with session_scope() as session:
+        return session.execute(select(func.count()).select_from(Review)).scalar_one()
+
+
+def test_a_run_that_lost_its_lease_is_discarded(client):
+    job_id = uuid.UUID(_queue_ingest(client))
+    first, second = Session(bind=models.engine), Session(bind=models.engine)
+
+    stale = jobs.claim_next_job(first, "worker-1")
+    assert stale.id == job_id
+    with session_scope() as session:
+        session.execute(update(Job).values(heartbeat_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+    reclaimed = jobs.claim_next_job(second, "worker-2")
+    assert reclaimed.id == job_id and reclaimed.attempts == 2
+
+    jobs.run_job(first, stale)
+    assert _review_count() == 0
+    with session_scope() as session:
+        job = session.get(Job, job_id)
+        assert (job.status, job.locked_by) == ("running", "worker-2")
+
+    jobs.run_job(second, reclaimed)
+    assert _review_count() == 1
+    with session_scope() as session:
+        assert session.get(Job, job_id).status == "succeeded"
+    first.close()
+    second.close()
+
+
+def test_heartbeat_renews_the_lease_while_the_handler_runs(app):
+    jobs.register_job_handler("test-sleep", lambda session, payload: time.sleep(0.5) or {"slept": True})
+    with session_scope() as session:
+        job_id = jobs.enqueue_job(session, "test-sleep", {}).id
+
+    session = Session(bind=models.engine)
+    job = jobs.claim_next_job(session, "worker-1", kinds=["test-sleep"])
+    claimed_at = job.heartbeat_at
+    jobs.run_job(session, job, lease_seconds=0.3)
+    session.close()
+
+    with session_scope() as session:
+        finished = session.get(Job, job_id)
+        assert finished.status == "succeeded" and finished.result == {"slept": True}
+        assert finished.heartbeat_at > claimed_at
+
+
+def test_failed_jobs_are_retried_after_a_backoff(app):
+    def fail(session, payload):
+        raise RuntimeError("boom")
+
+    jobs.register_job_handler("test-fail", fail)
+    with session_scope() as session:
+        job_id = jobs.enqueue_job(session, "test-fail", {}).id
+
+    before = datetime.now(timezone.utc)
+    assert jobs.run_next_job("worker-1", kinds=["test-fail"]) == job_id
+    with session_scope() as session:
+        job = session.get(Job, job_id)
+        assert (job.status, job.error, job.attempts) == ("queued", "boom", 1)
+        run_after = job.run_after.replace(tzinfo=job.run_after.tzinfo or timezone.utc)
+        assert run_after >= before + timedelta(seconds=jobs.RETRY_BACKOFF_SECONDS)
+    assert jobs.run_next_job("worker-1", kinds=["test-fail"]) is None
+
+    with session_scope() as session:
+        session.execute(update(Job).values(run_after=before))
+    assert jobs.run_next_job("worker-1", kinds=["test-fail"]) == job_id
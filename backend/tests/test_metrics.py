@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+from backend import metrics
+from backend.app import create_app
+from backend.models import Base, init_engine
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'metrics.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("INSIGHTS_CACHE_ENABLED", "false")
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _samples(text):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def _value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_metrics_report_routes_ingest_and_pool(client):
+    before = _samples(client.get("/metrics").get_data(as_text=True))
+    reviews = [
+        {
+            "source_review_id": f"m-{index}",
+            "body": "The dashboard is slow",
+            "published_at": datetime(2025, 3, 1, index, tzinfo=timezone.utc).isoformat(),
+        }
+        for index in range(3)
+    ]
+    payload = {"source_id": str(uuid.uuid4()), "reviews": reviews + reviews[:1]}
+    assert client.post("/ingest", json=payload).status_code == 202
+    assert client.get("/insights").status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    after = _samples(response.get_data(as_text=True))
+
+    def delta(name, **labels):
+        return _value(after, name, **labels) - _value(before, name, **labels)
+
+    assert delta("http_request_duration_seconds_count", method="GET", route="/insights", status="200") == 1
+    assert delta("http_request_duration_seconds_count", method="POST", route="/ingest", status="202") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == 1
+    assert delta("ingest_reviews_total", outcome="inserted") == 3
+    assert delta("ingest_reviews_total", outcome="duplicate") == 1
+    assert delta("analyzer_reviews_total", backend="keyword") == 1, "identical bodies are analysed once"
+    # The scrape itself is the only request in flight.
+    assert _value(after, "http_requests_in_flight") == 1
+    assert ("db_pool_checked_out_connections", ()) in after
+
+
+def test_metrics_token_is_required_when_configured(app, client):
+    app.config["METRICS_TOKEN"] = "scrape-token"
+    assert client.get("/metrics").status_code == 401
+    authorized = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert authorized.status_code == 200
+
+
+def test_multiprocess_scrape_sums_every_worker(monkeypatch, tmp_path):
+    worker = (
+        "from backend import metrics\n"
+        "metrics.REQUEST_SECONDS.labels('GET', '/insights', '200').observe(0.2)\n"
+        "metrics.observe_ingest(5, 1)\n"
+    )
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", worker],
+            cwd=REPO_ROOT,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""},
+            check=True,
+        )
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    samples = _samples(metrics.render().decode())
+    assert _value(samples, "http_request_duration_seconds_count", method="GET", route="/insights", status="200") == 2
+    assert _value(samples, "ingest_reviews_total", outcome="inserted") == 10
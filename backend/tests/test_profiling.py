@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pstats
+
+import pytest
+
+from backend.app import create_app
+from backend.models import Base, init_engine
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'profiling.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("INSIGHTS_CACHE_ENABLED", "false")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path / "profiles"))
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _token(client, email):
+    payload = {"email": email, "password": "supersafe123", "display_name": email.split("@")[0]}
+    response = client.post("/auth/register", json=payload)
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
+
+
+def test_admin_can_profile_a_request(app, client, tmp_path):
+    admin = _token(client, "owner@example.com")
+
+    plain = client.get("/insights")
+    assert plain.status_code == 200 and "X-Profile-Id" not in plain.headers
+
+    response = client.get("/insights?sentiment=Negative", headers={**admin, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    summary = client.get(f"/admin/profiles/{profile_id}", headers=admin).get_json()
+    assert summary["path"] == "/insights?sentiment=Negative"
+    assert summary["status"] == 200
+    assert summary["query_count"] == len(summary["queries"]) > 0
+    assert all(query["statement"] and query["duration_ms"] >= 0 for query in summary["queries"])
+
+    pstats.Stats(str(tmp_path / "profiles" / f"{profile_id.replace('-', '')}.prof"))
+    text = client.get(f"/admin/profiles/{profile_id}?format=text", headers=admin).get_data(as_text=True)
+    assert "cumulative" in text and "insights" in text
+    collapsed = client.get(f"/admin/profiles/{profile_id}?format=collapsed", headers=admin)
+    assert collapsed.status_code == 200
+    for line in collapsed.get_data(as_text=True).splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+
+def test_profiling_requires_an_admin(client):
+    _token(client, "owner@example.com")
+    member = _token(client, "member@example.com")
+
+    assert client.get("/insights?profile=1").status_code == 401
+    assert client.get("/insights?profile=1", headers=member).status_code == 403
+    assert client.get("/admin/profiles/00000000-0000-0000-0000-000000000000", headers=member).status_code == 403
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from backend.app import create_app
+from backend.models import Base, Competitor, Review, Source, get_session, init_engine, session_scope
+from backend.query_stats import fingerprint
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'query-stats.db'}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("QUERY_REPEAT_THRESHOLD", "3")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    application = create_app()
+
+    @application.get("/test/per-row")
+    def per_row():
+        session = get_session()
+        names = [
+            session.execute(select(Source.name).where(Source.id == source_id)).scalar_one()
+            for source_id in session.execute(select(Source.id)).scalars().all()
+        ]
+        return {"names": names}
+
+    yield application
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def test_server_timing_reports_queries_and_flags_repeated_statements(app, client, caplog):
+    with session_scope() as session:
+        session.add_all([Source(name=f"Source {index}") for index in range(4)])
+
+    with caplog.at_level(logging.WARNING, logger="backend.query_stats"):
+        response = client.get("/test/per-row")
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert 'desc="5 queries"' in timing and "app;dur=" in timing
+    assert response.headers["Timing-Allow-Origin"] == "http://localhost"
+    warnings = [record.getMessage() for record in caplog.records]
+    assert len(warnings) == 1 and "ran 4 times" in warnings[0]
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT a FROM t WHERE id IN (?, ?, ?) AND b = 'x''y' LIMIT 25") == (
+        "SELECT a FROM t WHERE id IN (?) AND b = ? LIMIT ?"
+    )
+
+
+def test_competitor_endpoints_stay_within_query_budget(app, client, query_budget):
+    with session_scope() as session:
+        competitors = [Competitor(name=f"Rival {index}") for index in range(30)]
+        session.add_all(competitors)
+    competitor_id = competitors[0].id
+
+    with query_budget(2):
+        assert client.get("/competitors?page_size=25").status_code == 200
+    with query_budget(5, max_repeats=2):
+        assert client.get(f"/competitors/{competitor_id}/comparison").status_code == 200
+
+
+def _add_competitor_reviews(source_id, start, count):
+    with session_scope() as session:
+        for index in range(start, start + count):
+            competitor = Competitor(name=f"Tracked {index}")
+            session.add(competitor)
+            session.flush()
+            session.add(
+                Review(
+                    source_id=source_id,
+                    competitor_id=competitor.id,
+                    source_review_id=f"tracked-{index}",
+                    body="Their dashboard is slow",
+                    sentiment_label="Negative",
+                    sentiment_score=Decimal("-0.50"),
+                    published_at=datetime.now(timezone.utc) - timedelta(hours=index + 1),
+                )
+            )
+
+
+def test_digest_query_count_does_not_grow_with_competitors(client, query_budget):
+    bodies = ["Love the dashboard charts", "Support was slow", "Email digest is great", "Mobile app crashes"]
+    source_id = uuid.uuid4()
+    reviews = [
+        {
+            "source_review_id": f"own-{index}",
+            "body": bodies[index % len(bodies)],
+            "published_at": (datetime.now(timezone.utc) - timedelta(hours=index + 1)).isoformat(),
+        }
+        for index in range(12)
+    ]
+    assert client.post("/ingest", json={"source_id": str(source_id), "reviews": reviews}).status_code == 202
+    _add_competitor_reviews(source_id, 0, 2)
+    headers = {"Authorization": "Bearer test-token"}
+
+    with query_budget(21, max_repeats=2) as few:
+        assert client.post("/digest/run", json={}, headers=headers).status_code == 200
+    _add_competitor_reviews(source_id, 2, 40)
+    with query_budget(few.count, max_repeats=2):
+        response = client.post("/digest/run", json={}, headers=headers)
+
+    payload = response.get_json()
+    assert len(payload["competitor_summary"]) == 42
+    assert all(item["highlight"] == "1 reviews, average -0.5" for item in payload["competitor_summary"])
+    spotlight = payload["topic_spotlight"]
+    assert spotlight and all(1 <= len(topic["sample_quotes"]) <= 2 for topic in spotlight)
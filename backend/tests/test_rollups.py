@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from backend import rollups
+from backend.app import create_app
+from backend.models import (
+    AppState,
+    Base,
+    Competitor,
+    Review,
+    ReviewDailyRollup,
+    ReviewTopic,
+    Source,
+    TopicDailyRollup,
+    init_engine,
+    session_scope,
+    upsert_topic,
+)
+from backend.routes.digest import assemble_digest, data_fingerprint
+from backend.scripts import rebuild_rollups
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    db_path = tmp_path / "rollups.db"
+    database_url = f"sqlite:///{db_path}"
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setenv("ALLOWED_ORIGIN", "http://localhost")
+    monkeypatch.setenv("TOKEN_DIGEST_RUN", "test-token")
+    monkeypatch.setenv("AUTH_TOKEN_SECRET", "test-secret-key")
+    monkeypatch.setenv("JOB_WORKERS", "0")
+    monkeypatch.setenv("INSIGHTS_CACHE_ENABLED", "false")
+
+    engine = init_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    rollups.ready_state.clear()
+    application = create_app()
+    yield application
+    rollups.ready_state.clear()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def _ingest(client, source_id, reviews):
+    response = client.post("/ingest", json={"source_id": str(source_id), "reviews": reviews})
+    assert response.status_code == 202
+
+
+def _seed(client):
+    source_id = uuid.uuid4()
+    bodies = [
+        "Love the dashboard charts, so fast",
+        "Support response was slow and the sync is broken",
+        "Email digest summary is great",
+        "The mobile app is slow",
+    ]
+    _ingest(
+        client,
+        source_id,
+        [
+            {
+                "source_review_id": f"r-{index}",
+                "body": bodies[index % len(bodies)],
+                "published_at": (datetime(2025, 3, 1, 6, tzinfo=timezone.utc) + timedelta(hours=9 * index)).isoformat(),
+            }
+            for index in range(12)
+        ],
+    )
+
+    with session_scope() as session:
+        competitor = Competitor(name="Rival")
+        other = Source(name="G2")
+        session.add_all([competitor, other])
+        session.flush()
+        review = Review(
+            source_id=other.id,
+            competitor_id=competitor.id,
+            source_review_id="c-1",
+            body="Rival dashboard is confusing",
+            sentiment_label="Negative",
+            sentiment_score=Decimal("-0.40"),
+            published_at=datetime(2025, 3, 2, 12, tzinfo=timezone.utc),
+        )
+        session.add(review)
+        session.flush()
+        topic = upsert_topic(session, "Dashboard UX")
+        session.add(
+            ReviewTopic(
+                review_id=review.id,
+                topic_id=topic.id,
+                topic_label=topic.topic_label,
+                topic_confidence=Decimal("0.700"),
+            )
+        )
+
+    with session_scope() as session:
+        edited = session.execute(select(Review).where(Review.source_review_id == "r-1")).scalar_one()
+        edited.sentiment_label = "Neutral"
+        edited.sentiment_score = Decimal("0.00")
+        edited.published_at = datetime(2025, 3, 4, 1, tzinfo=timezone.utc)
+        removed = session.execute(select(Review).where(Review.source_review_id == "r-2")).scalar_one()
+        session.delete(removed)
+    return source_id, competitor.id
+
+
+def _rollup_rows():
+    with session_scope() as session:
+        reviews = {
+            (row.day, row.source_id, row.competitor_key, row.sentiment_label): (row.review_count, float(row.score_sum))
+            for row in session.execute(select(ReviewDailyRollup)).scalars()
+            if row.review_count
+        }
+        topics = {
+            (row.day, row.topic_label, row.source_id, row.competitor_key, row.sentiment_label): (
+                row.review_count,
+                round(float(row.confidence_sum), 3),
+            )
+            for row in session.execute(select(TopicDailyRollup)).scalars()
+            if row.review_count
+        }
+    return reviews, topics
+
+
+def _raw(app, fn):
+    url = app.config["DATABASE_URL"]
+    rollups.ready_state.set(url, False)
+    try:
+        return fn()
+    finally:
+        rollups.ready_state.set(url, True)
+
+
+def test_rollups_track_ingest_and_orm_writes_and_match_rebuild(app, client):
+    _seed(client)
+    incremental = _rollup_rows()
+    assert incremental[0]
+
+    rebuild_rollups.main([])
+    assert _rollup_rows() == incremental
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["", "?start_date=2025-03-02&end_date=2025-03-03", "?sentiment=Negative", "?start_date=2025-03-04"],
+)
+def test_insights_from_rollups_match_raw_scans(app, client, query):
+    source_id, _ = _seed(client)
+    url = f"/insights{query}" + (f"&source_id={source_id}" if "sentiment" in query else "")
+
+    from_rollups = client.get(url).get_json()
+    from_raw = _raw(app, lambda: client.get(url).get_json())
+    assert from_rollups["sentiment_trend"] == from_raw["sentiment_trend"]
+    assert from_rollups["source_breakdown"] == from_raw["source_breakdown"]
+    assert sorted(from_rollups["topic_distribution"], key=lambda item: item["topic_label"]) == sorted(
+        from_raw["topic_distribution"], key=lambda item: item["topic_label"]
+    )
+
+
+def test_digest_combines_rollup_days_with_raw_edges(app, client):
+    _seed(client)
+    start = datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+    end = datetime(2025, 3, 4, 3, tzinfo=timezone.utc)
+
+    with session_scope() as session:
+        plan = rollups.plan_window(session, start, end)
+        assert plan.days == (datetime(2025, 3, 2).date(), datetime(2025, 3, 3).date())
+        from_rollups = assemble_digest(session, timeframe_start=start, timeframe_end=end)
+        fingerprint = data_fingerprint(session, timeframe_start=start, timeframe_end=end)
+    with session_scope() as session:
+        from_raw = _raw(app, lambda: assemble_digest(session, timeframe_start=start, timeframe_end=end))
+        raw_fingerprint = _raw(app, lambda: data_fingerprint(session, timeframe_start=start, timeframe_end=end))
+    assert from_rollups == from_raw
+    assert from_rollups["key_metrics"]["total_reviews"] > 0
+    assert fingerprint == raw_fingerprint and fingerprint["topic_links"] > 0
+
+
+def test_digest_trends_compare_with_the_preceding_window(app, client):
+    _seed(client)
+    start = datetime(2025, 3, 3, 3, tzinfo=timezone.utc)
+    end = datetime(2025, 3, 5, 20, tzinfo=timezone.utc)
+    previous_start = start - (end - start)
+
+    with session_scope() as session:
+        current = assemble_digest(session, timeframe_start=start, timeframe_end=end)
+        previous = assemble_digest(
+            session, timeframe_start=previous_start, timeframe_end=start - timedelta(microseconds=1)
+        )
+        from_raw = _raw(app, lambda: assemble_digest(session, timeframe_start=start, timeframe_end=end))
+
+    metrics = current["key_metrics"]
+    assert metrics["previous_total_reviews"] == previous["key_metrics"]["total_reviews"] > 0
+    expected = round((metrics["total_reviews"] - metrics["previous_total_reviews"]) / metrics["previous_total_reviews"], 2)
+    assert metrics["total_reviews_change"] == expected
+    assert metrics["average_sentiment_change"] == round(
+        metrics["average_sentiment"] - previous["key_metrics"]["average_sentiment"], 2
+    )
+    assert any(topic["change_vs_previous"] != 0.0 for topic in current["topic_spotlight"])
+    assert current == from_raw
+
+
+def test_deleting_competitor_moves_its_rollups(app, client):
+    _, competitor_id = _seed(client)
+    before = _rollup_rows()
+
+    assert client.delete(f"/competitors/{competitor_id}").status_code == 204
+    after = _rollup_rows()
+    assert not any(key[2] == competitor_id for key in after[0])
+
+    rebuild_rollups.main([])
+    assert _rollup_rows() == after
+    assert sum(count for count, _ in after[0].values()) == sum(count for count, _ in before[0].values())
+
+
+def test_partial_rebuild_does_not_mark_unbuilt_rollups_ready(app, client):
+    _seed(client)
+    with session_scope() as session:
+        session.delete(session.get(AppState, rollups.READY_STATE_KEY))
+    rollups.ready_state.clear()
+
+    rebuild_rollups.main(["--start-date", "2025-03-02", "--end-date", "2025-03-03"])
+    with session_scope() as session:
+        assert not rollups.rollups_ready(session)
+        rollups.mark_ready(session)
+        session.rollback()
+    with session_scope() as session:
+        assert not rollups.rollups_ready(session)
+
+    rebuild_rollups.main([])
+    with session_scope() as session:
+        assert rollups.rollups_ready(session)
+        assert session.get(AppState, rollups.READY_STATE_KEY) is not None
@@ -0,0 +1,28 @@
+"""Gunicorn settings for the API (``gunicorn -c gunicorn.conf.py app:app``)."""
+
+import glob
+import os
+import tempfile
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = 120
+
+# Workers share metrics through files in this directory (see backend/metrics.py).
+# It has to be in the environment before prometheus_client is first imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "customer-voice-metrics"))
+
+
+def on_starting(server):
+    """Start every master process with an empty metrics directory."""
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)